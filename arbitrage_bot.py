@@ -5,7 +5,7 @@ This bot performs arbitrage between decentralized and centralized exchanges for
 It monitors price differences and executes trades when profitable opportunities are found.
 
 Known Issues and Limitations:
-- Rate limiting: Both DEX and CEX APIs have rate limits that may affect operation frequency
+- Rate limiting: Requests are throttled per venue; configured limits must match the actual API quotas
 - Network congestion: High blockchain congestion can delay transaction confirmations
 - Liquidity dependency: Requires sufficient liquidity on both exchanges
 - Price impact: Large trades may cause significant price impact, affecting profitability
@@ -13,7 +13,8 @@ Known Issues and Limitations:
 - Balance requirements: Requires maintaining balance on both DEX and CEX
 - Transaction fees: Network fees and exchange fees affect minimum profitable trade size
 - State management: Bot state may need manual cleanup if process is killed unexpectedly
-- Recovery: Manual intervention may be needed if a trading cycle is interrupted
+- Recovery: Interrupted trading cycles resume at their last checkpointed stage; a crash
+  between an exchange action and its checkpoint may still need manual intervention
 
 Configuration:
     Environment variables required - see .env.example
@@ -27,7 +28,8 @@ import os
 import sys
 import time
 import asyncio
-import requests
+import functools
+import itertools
 import json
 import logging
 import pid
@@ -38,9 +40,29 @@ from urllib.parse import urlsplit
 from base64 import b64encode
 from hashlib import sha256
 from hmac import HMAC
+from http_client import VenueClient, HTTPError
+from state_journal import StateJournal, apply_record
+from state_store import SQLiteBotState
+from tx_archive import TransactionArchive
+from rate_limiter import TokenBucket, PRIORITY_CRITICAL, PRIORITY_BACKGROUND
+from market_data import GleecMarketData
+from order_stream import GleecOrderStream, FINAL_STATUSES
+from order_gateway import OrderGateway, LiquidityCheck, SUBMITTING
+from repricer import OrderRepricer
+from scheduler import OpportunityScheduler
+from order_book import OrderBook
+from quote_cache import QuoteCache
+from sizing import DexCurveCache, optimize_buy_cex_sell_dex, optimize_buy_dex_sell_cex
+from trade_cycle import (
+    CycleDriver, stage_age, TERMINAL_STAGES, NEW, ORDER_PLACED, FILLED, WITHDRAW_REQUESTED,
+    WITHDRAWN, DEX_SUBMITTED, DEX_CONFIRMED, TRANSFER_SUBMITTED, DEPOSITED, LEGS_SUBMITTED,
+    DONE, FAILED, cycle_flow
+)
+from rebalancer import TransferBatcher, Rebalancer
+from chain_context import ChainManager
+from inventory import reserved, GLEEC_USDT, GLEEC_SHARDS, CARDANO_ADA, CARDANO_SHARDS
 from pycardano import (
-    Network, BlockFrostChainContext, PaymentSigningKey, StakeSigningKey,
-    PaymentVerificationKey, VerificationKeyWitness, PaymentKeyPair, Address,
+    Network, VerificationKeyWitness, Address,
     TransactionBuilder, TransactionWitnessSet, TransactionOutput, Transaction, Value, MultiAsset,
     AssetName
 )
@@ -77,6 +99,21 @@ STAKE_VERIFICATION_KEY_JSON = os.getenv('STAKE_VERIFICATION_KEY_JSON')
 if None in [SIGNING_KEY_JSON, VERIFICATION_KEY_JSON, STAKE_SIGNING_KEY_JSON, STAKE_VERIFICATION_KEY_JSON]:
     raise ValueError("Missing required signing key environment variables")
 
+# Wallet keys and the Blockfrost chain context are loaded once and shared
+PROTOCOL_PARAMS_TTL = float(os.getenv('PROTOCOL_PARAMS_TTL', '600'))  # Seconds protocol parameters are reused
+UTXO_REFRESH_INTERVAL = float(os.getenv('UTXO_REFRESH_INTERVAL', '20'))  # Seconds between on-chain UTxO refreshes
+UTXO_PENDING_TTL = float(os.getenv('UTXO_PENDING_TTL', '600'))  # Seconds before an unconfirmed tx's inputs are released
+chain = ChainManager(
+    BLOCKFROST_PROJECT_ID,
+    NETWORK,
+    SIGNING_KEY_JSON,
+    STAKE_SIGNING_KEY_JSON,
+    params_ttl=PROTOCOL_PARAMS_TTL,
+    address=CARDANO_ADDRESS,
+    utxo_refresh=UTXO_REFRESH_INTERVAL,
+    utxo_pending_ttl=UTXO_PENDING_TTL
+)
+
 # Token IDs
 ADA_TOKEN_ID = 'ADA'  # ADA token ID as per DexHunter API
 TOKEN_POLICY_ID = 'ea153b5d4864af15a1079a94a0e2486d6376fa28aafad272d15b243a'
@@ -86,6 +123,14 @@ TOKEN_ID = f"{TOKEN_POLICY_ID}{TOKEN_ASSET_NAME}"  # Concatenate without dot
 # Trade quantity (configurable via environment variable)
 TRADE_QUANTITY = int(os.getenv('TRADE_QUANTITY', '500'))  # Default to 100 if not set
 
+# Trade sizing: search sizes between MIN and MAX for the highest expected profit
+TRADE_SIZING_ENABLED = os.getenv('TRADE_SIZING_ENABLED', 'true').lower() == 'true'
+MIN_TRADE_QUANTITY = float(os.getenv('MIN_TRADE_QUANTITY', '10'))
+MAX_TRADE_QUANTITY = float(os.getenv('MAX_TRADE_QUANTITY', str(TRADE_QUANTITY * 4)))
+TRADE_FIXED_COST_USDT = float(os.getenv('TRADE_FIXED_COST_USDT', '0'))  # Withdrawal and network fees per cycle
+ADA_FEE_RESERVE = float(os.getenv('ADA_FEE_RESERVE', '5'))  # ADA kept back for transaction fees
+DEX_CURVE_TTL = float(os.getenv('DEX_CURVE_TTL', '15'))  # Seconds a DEX price-impact curve is reused
+
 # State file for tracking bot state
 STATE_FILE = 'bot_state.json'
 
@@ -103,9 +148,8 @@ def save_state(state):
 def verify_environment():
     """Verify all required environment variables and keys are properly set."""
     try:
-        # Test that keys can be loaded
-        PaymentSigningKey.from_json(SIGNING_KEY_JSON)
-        StakeSigningKey.from_json(STAKE_SIGNING_KEY_JSON)
+        # Test that keys can be loaded (they are parsed once and reused)
+        chain.load_keys()
         
         # Verify address has stake component
         address = Address.from_primitive(CARDANO_ADDRESS)
@@ -120,13 +164,62 @@ def verify_environment():
 # DEXHunter API Base URL
 DEXHUNTER_API_BASE_URL = os.getenv('DEXHUNTER_API_BASE_URL', 'https://api-us.dexhunterv3.app')
 
+# DEX swap slippage tolerance (Percentage)
+DEX_SLIPPAGE = 2
+
+# Quote cache: DexHunter quotes older than QUOTE_MAX_AGE seconds are fetched again
+QUOTE_MAX_AGE = float(os.getenv('QUOTE_MAX_AGE', '5'))
+QUOTE_CACHE_SIZE = int(os.getenv('QUOTE_CACHE_SIZE', '256'))
+
 # Arbitrage Threshold (Percentage)
 ARBITRAGE_THRESHOLD = float(os.getenv('ARBITRAGE_THRESHOLD', '1.0'))  # Default to 1.0%
 
+# Polling intervals (seconds)
+PRICE_CHECK_INTERVAL = float(os.getenv('PRICE_CHECK_INTERVAL', '60'))  # Slowest poll, spread far from threshold
+PRICE_CHECK_MIN_INTERVAL = float(os.getenv('PRICE_CHECK_MIN_INTERVAL', '5'))  # Fastest poll, spread near threshold
+EVALUATION_DEBOUNCE = float(os.getenv('EVALUATION_DEBOUNCE', '0.25'))
+MIN_EVALUATION_INTERVAL = float(os.getenv('MIN_EVALUATION_INTERVAL', '2'))
+PENDING_CHECK_INTERVAL = float(os.getenv('PENDING_CHECK_INTERVAL', '30'))
+CYCLE_POLL_INTERVAL = float(os.getenv('CYCLE_POLL_INTERVAL', '5'))  # Seconds between trade-cycle stage checks
+MAX_CONCURRENT_CYCLES = int(os.getenv('MAX_CONCURRENT_CYCLES', '3'))  # Trade cycles allowed in flight at once
+
+# Inventory mode: trade both legs at once from SHARDS/ADA on Cardano and SHARDS/USDT on Gleec
+TRADING_MODE = os.getenv('TRADING_MODE', 'transfer').lower()  # 'transfer' or 'inventory'
+INVENTORY_TARGET_GLEEC_SHARE = float(os.getenv('INVENTORY_TARGET_GLEEC_SHARE', '0.5'))  # Share of SHARDS kept on Gleec
+INVENTORY_REBALANCE_BAND = float(os.getenv('INVENTORY_REBALANCE_BAND', '0.25'))  # Drift from the target share before rebalancing
+INVENTORY_MIN_REBALANCE = float(os.getenv('INVENTORY_MIN_REBALANCE', str(TRADE_QUANTITY)))  # Smallest SHARDS transfer made
+REBALANCE_CHECK_INTERVAL = float(os.getenv('REBALANCE_CHECK_INTERVAL', '300'))  # Seconds between inventory checks
+TRANSFER_BATCH_WINDOW = float(os.getenv('TRANSFER_BATCH_WINDOW', '2'))  # Seconds to collect SHARDS transfers into one tx
+TRANSFER_BATCH_MAX_OUTPUTS = int(os.getenv('TRANSFER_BATCH_MAX_OUTPUTS', '10'))  # Recipients per batch transaction
+CONSOLIDATE_UTXO_COUNT = int(os.getenv('CONSOLIDATE_UTXO_COUNT', '10'))  # Merge small UTxOs into the change above this count
+CHAIN_UNCONFIRMED_TX = os.getenv('CHAIN_UNCONFIRMED_TX', 'false').lower() == 'true'  # Send DEX-bought SHARDS before the swap confirms
+
 class BotState:
-    def __init__(self, state_file='bot_state.json'):
+    """
+    Bot state persisted as a JSON snapshot plus an append-only journal.
+
+    Every change is applied in memory and appended to '<state_file>.journal';
+    the snapshot is only rewritten when the journal is compacted (every
+    STATE_COMPACT_EVERY records, on startup after replay, or on save_state()).
+
+    Only the latest `history_size` completed transactions are kept in the
+    state; once twice as many have accumulated the older half is rolled out
+    to the compressed archive (see tx_archive.py).
+    """
+
+    def __init__(self, state_file='bot_state.json', compact_every=1000, fsync_interval=0.2,
+                 history_size=500, archive=None):
         self.state_file = state_file
+        self.compact_every = compact_every
+        self.history_size = max(history_size, 1)
+        self.archive = archive or TransactionArchive()
         self.state = self.load_state()
+        self.journal = StateJournal(f"{state_file}.journal", fsync_interval=fsync_interval)
+        replayed = self.journal.replay(self.state)
+        if replayed or self.journal.torn:
+            logging.info(f"Replayed {replayed} state journal records")
+            self.save_state()
+        self._roll_out_history()
         
     def load_state(self):
         try:
@@ -138,46 +231,115 @@ class BotState:
                 'active_orders': {},
                 'pending_transfers': {},
                 'active_withdrawals': {},
+                'trade_cycles': {},
                 'completed_transactions': []
             }
             
     def save_state(self):
-        with open(self.state_file, 'w') as f:
+        """Write a full snapshot atomically and truncate the journal (compaction)."""
+        tmp_file = f"{self.state_file}.tmp"
+        self.state['journal_sequence'] = self.journal.sequence
+        with open(tmp_file, 'w') as f:
             json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.state_file)
+        self.journal.truncate()
+
+    def _record(self, record):
+        """Apply a change in memory and journal it, compacting when the journal grows large."""
+        apply_record(self.state, record)
+        self.journal.append(record)
+        if self.journal.records >= self.compact_every:
+            self.save_state()
+
+    def flush(self):
+        """fsync journal records appended since the last batch."""
+        self.journal.sync()
+
+    def _update(self, section, key, status, details):
+        self._record({
+            'op': 'set',
+            'section': section,
+            'key': key,
+            'value': {
+                'status': status,
+                'details': details,
+                'timestamp': time.time()
+            }
+        })
             
     def update_order(self, order_id, status, details):
-        self.state['active_orders'][order_id] = {
-            'status': status,
-            'details': details,
-            'timestamp': time.time()
-        }
-        self.save_state()
+        self._update('active_orders', order_id, status, details)
         
     def update_transfer(self, tx_id, status, details):
-        self.state['pending_transfers'][tx_id] = {
-            'status': status,
-            'details': details,
-            'timestamp': time.time()
-        }
-        self.save_state()
+        self._update('pending_transfers', tx_id, status, details)
         
     def update_withdrawal(self, withdrawal_id, status, details):
-        self.state['active_withdrawals'][withdrawal_id] = {
-            'status': status,
-            'details': details,
-            'timestamp': time.time()
-        }
-        self.save_state()
+        self._update('active_withdrawals', withdrawal_id, status, details)
+
+    def update_cycle(self, cycle_id, stage, details):
+        """Checkpoint a trade cycle (see trade_cycle.py)."""
+        self._update('trade_cycles', cycle_id, stage, details)
+
+    def get_active_cycles(self):
+        """Return {cycle_id: entry} for trade cycles that have not finished."""
+        return {k: v for k, v in self.state.get('trade_cycles', {}).items()
+                if v['status'] not in TERMINAL_STAGES}
+
+    def remove(self, section, key):
+        """Remove an order, transfer or withdrawal entry."""
+        if key in self.state.get(section, {}):
+            self._record({'op': 'delete', 'section': section, 'key': key})
         
     def complete_transaction(self, tx_hash, tx_type='unknown'):
         """Complete a transaction with type tracking."""
-        self.state['completed_transactions'].append({
-            'tx_hash': tx_hash,
-            'type': tx_type,
-            'timestamp': time.time(),
-            'dex_sell_completed': False
+        self._record({
+            'op': 'append',
+            'section': 'completed_transactions',
+            'value': {
+                'tx_hash': tx_hash,
+                'type': tx_type,
+                'timestamp': time.time(),
+                'dex_sell_completed': False
+            }
         })
-        self.save_state()
+        self._roll_out_history()
+
+    def _roll_out_history(self):
+        """Archive the oldest completed transactions once the history holds twice history_size."""
+        completed = self.state.get('completed_transactions', [])
+        if len(completed) < 2 * self.history_size:
+            return
+        try:
+            self.archive.archive(completed[:-self.history_size])
+        except OSError as e:
+            logging.error(f"Error archiving completed transactions: {e}")
+            return
+        self._record({'op': 'trim', 'section': 'completed_transactions', 'keep': self.history_size})
+
+    def update_transaction(self, tx_hash, **fields):
+        """Update fields of the most recent completed transaction with this hash."""
+        self._record({'op': 'update_tx', 'tx_hash': tx_hash, 'fields': fields})
+
+    def get_entry(self, section, key):
+        """Return one order, transfer or withdrawal entry, or None."""
+        return self.state.get(section, {}).get(key)
+
+    def get_entries(self, section):
+        """Return all entries of a section as {key: entry}."""
+        return dict(self.state.get(section, {}))
+
+    def get_transaction_history(self, page=0, page_size=20):
+        """Return one page of completed transactions, newest first, reading into the archive."""
+        history = itertools.chain(
+            reversed(self.state.get('completed_transactions', [])),
+            self.archive.iter_newest_first()
+        )
+        return list(itertools.islice(history, page * page_size, (page + 1) * page_size))
+
+    def close(self):
+        self.journal.close()
         
     def get_pending_operations(self):
         return {
@@ -190,26 +352,39 @@ class BotState:
         }
 
 # Initialize state manager
-state_manager = BotState()
-
-
-
-class GleecAuth(requests.auth.AuthBase):
+STATE_COMPACT_EVERY = int(os.getenv('STATE_COMPACT_EVERY', '1000'))  # Journal records between snapshots
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'json').lower()  # 'json' or 'sqlite'
+STATE_DB_FILE = os.getenv('STATE_DB_FILE', 'bot_state.db')
+STATE_HISTORY_SIZE = int(os.getenv('STATE_HISTORY_SIZE', '500'))  # Completed transactions kept in bot_state.json
+STATE_ARCHIVE_DIR = os.getenv('STATE_ARCHIVE_DIR', 'archive/completed_transactions')
+if STATE_BACKEND == 'sqlite':
+    state_manager = SQLiteBotState(STATE_DB_FILE)
+else:
+    state_manager = BotState(
+        compact_every=STATE_COMPACT_EVERY,
+        history_size=STATE_HISTORY_SIZE,
+        archive=TransactionArchive(STATE_ARCHIVE_DIR)
+    )
+
+
+
+class GleecAuth:
     def __init__(self, api_key, secret_key, window=10000):
         self.api_key = api_key
         self.secret_key = secret_key
         self.window = str(window)
 
-    def __call__(self, request):
+    def __call__(self, method, request_url, body=None):
+        """Return the HS256 Authorization header for a request."""
         try:
-            url = urlsplit(request.url)
-            message = [request.method.upper(), url.path]
+            url = urlsplit(request_url)
+            message = [method.upper(), url.path]
             if url.query:
                 message.append('?')
                 message.append(url.query)
-            if request.body:
+            if body:
                 message.append(
-                    request.body.decode() if isinstance(request.body, bytes) else request.body
+                    body.decode() if isinstance(body, bytes) else body
                 )
 
             timestamp = str(int(time.time() * 1000))
@@ -224,17 +399,95 @@ class GleecAuth(requests.auth.AuthBase):
             ).hexdigest()
             auth_str = ':'.join([self.api_key, signature, timestamp, self.window])
             auth_header = 'HS256 ' + b64encode(auth_str.encode()).decode()
-            request.headers['Authorization'] = auth_header
-            return request
+            return {'Authorization': auth_header}
         except Exception as e:
             logging.error(f"Error in GleecAuth: {e}")
             raise
 
-def get_average_price(token_in_id, token_out_id):
+async def run_blocking(func, *args):
+    """Run a blocking call (pycardano, Blockfrost SDK) in the default executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+# API Base URLs
+GLEEC_API_BASE_URL = 'https://api.exchange.gleec.com/api/3'
+BLOCKFROST_API_BASE_URL = 'https://cardano-mainnet.blockfrost.io/api/v0'
+
+# Shared pooled clients, one per venue (pool sizes and timeouts configurable via environment)
+GLEEC_POOL_SIZE = int(os.getenv('GLEEC_POOL_SIZE', '10'))
+GLEEC_TIMEOUT = float(os.getenv('GLEEC_TIMEOUT', '10'))
+DEXHUNTER_POOL_SIZE = int(os.getenv('DEXHUNTER_POOL_SIZE', '10'))
+DEXHUNTER_TIMEOUT = float(os.getenv('DEXHUNTER_TIMEOUT', '15'))
+BLOCKFROST_POOL_SIZE = int(os.getenv('BLOCKFROST_POOL_SIZE', '10'))
+BLOCKFROST_TIMEOUT = float(os.getenv('BLOCKFROST_TIMEOUT', '10'))
+
+# Per-venue rate limits (requests per second)
+GLEEC_PUBLIC_RATE_LIMIT = float(os.getenv('GLEEC_PUBLIC_RATE_LIMIT', '30'))
+GLEEC_PRIVATE_RATE_LIMIT = float(os.getenv('GLEEC_PRIVATE_RATE_LIMIT', '20'))
+DEXHUNTER_RATE_LIMIT = float(os.getenv('DEXHUNTER_RATE_LIMIT', '5'))
+BLOCKFROST_RATE_LIMIT = float(os.getenv('BLOCKFROST_RATE_LIMIT', '10'))
+
+gleec_public = VenueClient('gleec_public', GLEEC_API_BASE_URL,
+                           pool_size=GLEEC_POOL_SIZE, timeout=GLEEC_TIMEOUT,
+                           limiter=TokenBucket('gleec_public', GLEEC_PUBLIC_RATE_LIMIT))
+gleec_private = VenueClient('gleec_private', GLEEC_API_BASE_URL,
+                            pool_size=GLEEC_POOL_SIZE, timeout=GLEEC_TIMEOUT,
+                            auth=GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY),
+                            limiter=TokenBucket('gleec_private', GLEEC_PRIVATE_RATE_LIMIT, background_reserve=5))
+dexhunter = VenueClient('dexhunter', DEXHUNTER_API_BASE_URL,
+                        pool_size=DEXHUNTER_POOL_SIZE, timeout=DEXHUNTER_TIMEOUT,
+                        headers={"Content-Type": "application/json", "accept": "application/json"},
+                        limiter=TokenBucket('dexhunter', DEXHUNTER_RATE_LIMIT))
+blockfrost = VenueClient('blockfrost', BLOCKFROST_API_BASE_URL,
+                         pool_size=BLOCKFROST_POOL_SIZE, timeout=BLOCKFROST_TIMEOUT,
+                         headers={"project_id": BLOCKFROST_PROJECT_ID},
+                         limiter=TokenBucket('blockfrost', BLOCKFROST_RATE_LIMIT, background_reserve=2))
+
+# Streaming Gleec market data (falls back to REST when disabled or stale)
+GLEEC_WS_URL = os.getenv('GLEEC_WS_URL', 'wss://api.exchange.gleec.com/api/3/ws/public')
+MARKET_DATA_ENABLED = os.getenv('MARKET_DATA_ENABLED', 'true').lower() == 'true'
+MARKET_DATA_MAX_AGE = float(os.getenv('MARKET_DATA_MAX_AGE', '5'))  # Seconds
+
+market_data = GleecMarketData(GLEEC_WS_URL, ['SHARDSUSDT', 'ADAUSDT'])
+
+# Streaming order reports (order checks fall back to REST when disabled or disconnected)
+GLEEC_TRADING_WS_URL = os.getenv('GLEEC_TRADING_WS_URL', 'wss://api.exchange.gleec.com/api/3/ws/trading')
+ORDER_STREAM_ENABLED = os.getenv('ORDER_STREAM_ENABLED', 'true').lower() == 'true'
+
+order_stream = GleecOrderStream(GLEEC_TRADING_WS_URL, GLEEC_API_KEY, GLEEC_SECRET_KEY)
+
+# Idempotent order placement: fast retries are safe because the client ID is registered first
+ORDER_RETRIES = int(os.getenv('ORDER_RETRIES', '3'))  # Extra attempts after an order request with no clear answer
+ORDER_RETRY_DELAY = float(os.getenv('ORDER_RETRY_DELAY', '0.25'))  # Seconds before the first retry, doubled after
+PRE_TRADE_LIQUIDITY_CHECK = os.getenv('PRE_TRADE_LIQUIDITY_CHECK', 'true').lower() == 'true'  # Check cached book before orders
+
+# Repricing of resting orders (cancel-replace at the touch)
+REPRICE_ENABLED = os.getenv('REPRICE_ENABLED', 'true').lower() == 'true'
+REPRICE_DISTANCE = float(os.getenv('REPRICE_DISTANCE', '0.002'))  # Distance from the touch tolerated before repricing
+REPRICE_MAX_DRIFT = float(os.getenv('REPRICE_MAX_DRIFT', '0.005'))  # How far past its original price a repriced order may move
+REPRICE_MIN_INTERVAL = float(os.getenv('REPRICE_MIN_INTERVAL', '5'))  # Seconds between two replaces of one order
+REPRICE_MAX_PER_ORDER = int(os.getenv('REPRICE_MAX_PER_ORDER', '10'))  # Replaces allowed per order
+REPRICE_MAX_PER_MINUTE = int(os.getenv('REPRICE_MAX_PER_MINUTE', '20'))  # Replaces per minute across all orders
+
+
+# DexHunter quote cache shared by detection, sizing and execution
+quote_cache = QuoteCache(ttl=QUOTE_MAX_AGE, max_size=QUOTE_CACHE_SIZE)
+
+# DEX price-impact curves used by trade sizing
+dex_curve_cache = DexCurveCache(ttl=DEX_CURVE_TTL)
+
+async def get_average_price(token_in_id, token_out_id, max_age=None):
+    """Get the average price from DEX Hunter API, reusing a cached quote if fresh."""
+    key = quote_cache.key('average_price', token_in_id, token_out_id)
+    return await quote_cache.get_or_fetch(
+        key, lambda: fetch_average_price(token_in_id, token_out_id), max_age
+    )
+
+async def fetch_average_price(token_in_id, token_out_id):
     """Fetch the average price from DEX Hunter API."""
-    url = f"{DEXHUNTER_API_BASE_URL}/swap/averagePrice/{token_in_id}/{token_out_id}/"
+    path = f"/swap/averagePrice/{token_in_id}/{token_out_id}/"
     try:
-        response = requests.get(url)
+        response = await dexhunter.get(path)
         response.raise_for_status()
         data = response.json()
         average_price = data.get('averagePrice')
@@ -242,79 +495,112 @@ def get_average_price(token_in_id, token_out_id):
             logging.error(f"No averagePrice found in response: {data}")
             return None
         return float(average_price)
-    except requests.exceptions.HTTPError as http_err:
+    except HTTPError as http_err:
         logging.error(f"HTTP error in get_average_price: {http_err}")
         logging.error(f"Response content: {response.text}")
     except Exception as e:
         logging.error(f"Exception in get_average_price: {e}")
     return None
 
-def get_cex_shards_price_usdt():
+async def get_cex_shards_price_usdt():
     """Fetch the SHARDS price in USDT from Gleec CEX."""
-    url = "https://api.exchange.gleec.com/api/3/public/ticker/SHARDSUSDT"
+    streamed_price = market_data.get_last_price('SHARDSUSDT', MARKET_DATA_MAX_AGE)
+    if streamed_price is not None:
+        return streamed_price
     try:
-        response = requests.get(url)
+        response = await gleec_public.get("/public/ticker/SHARDSUSDT")
         response.raise_for_status()
         data = response.json()
         price_usdt = float(data['last'])
         return price_usdt
-    except requests.exceptions.HTTPError as http_err:
+    except HTTPError as http_err:
         logging.error(f"HTTP error in get_cex_shards_price_usdt: {http_err}")
     except Exception as e:
         logging.error(f"Exception in get_cex_shards_price_usdt: {e}")
     return None
 
-def get_ada_price_usdt():
+async def get_ada_price_usdt():
     """Fetch the ADA price in USDT from Gleec CEX."""
-    url = "https://api.exchange.gleec.com/api/3/public/price/ticker/ADAUSDT"
+    streamed_price = market_data.get_last_price('ADAUSDT', MARKET_DATA_MAX_AGE)
+    if streamed_price is not None:
+        return streamed_price
     try:
-        response = requests.get(url)
+        response = await gleec_public.get("/public/price/ticker/ADAUSDT")
         response.raise_for_status()
         data = response.json()
         price_usdt = float(data['price'])
         return price_usdt
-    except requests.exceptions.HTTPError as http_err:
+    except HTTPError as http_err:
         logging.error(f"HTTP error in get_ada_price_usdt: {http_err}")
         logging.error(response.json())
     except Exception as e:
         logging.error(f"Exception in get_ada_price_usdt: {e}")
     return None
 
-def calculate_shards_prices():
-    """Calculate SHARDS price in ADA using CEX prices."""
-    shards_price_usdt = get_cex_shards_price_usdt()
-    ada_price_usdt = get_ada_price_usdt()
-    if shards_price_usdt is not None and ada_price_usdt is not None:
-        shards_price_ada = shards_price_usdt / ada_price_usdt
-        return {
-            'shards_price_ada': shards_price_ada,
-            'shards_price_usdt': shards_price_usdt
-        }
-    else:
+async def get_price_snapshot():
+    """
+    Fetch DEX and CEX prices concurrently and return one timestamped snapshot.
+
+    The DexHunter average price and the two Gleec tickers are requested at the
+    same time, so the snapshot costs one round trip (the slowest of the three)
+    instead of three sequential ones, and all prices are sampled together.
+
+    Returns:
+        dict: Snapshot with 'timestamp', 'dex_price_ada_per_shards',
+              'shards_price_usdt', 'ada_price_usdt' and 'shards_price_ada',
+              or None if any price is unavailable
+    """
+    started = time.time()
+    dex_price_shards_per_ada, shards_price_usdt, ada_price_usdt = await asyncio.gather(
+        get_average_price(ADA_TOKEN_ID, TOKEN_ID),
+        get_cex_shards_price_usdt(),
+        get_ada_price_usdt()
+    )
+    logging.debug(f"Price snapshot fetched in {(time.time() - started) * 1000:.0f} ms")
+
+    if not dex_price_shards_per_ada:
+        logging.error("Failed to get DEX price or price is zero.")
+        return None
+    if shards_price_usdt is None or not ada_price_usdt:
         logging.error("Could not retrieve necessary price data for SHARDS or ADA.")
         return None
 
-async def check_cardano_balance():
-    """Check if we have SHARDS on Cardano that need to be sold."""
+    return {
+        'timestamp': started,
+        'dex_price_ada_per_shards': 1 / dex_price_shards_per_ada,
+        'shards_price_usdt': shards_price_usdt,
+        'ada_price_usdt': ada_price_usdt,
+        'shards_price_ada': shards_price_usdt / ada_price_usdt
+    }
+
+async def get_cardano_amounts():
+    """
+    Get {unit: quantity} spendable by CARDANO_ADDRESS, or None on error.
+
+    Read from the local UTxO set rather than Blockfrost's address totals, which
+    only count confirmed transactions: ADA and SHARDS spent by a swap or
+    transfer that is submitted but not yet in a block no longer show up as
+    free for the next cycle or the rebalancer.
+    """
     try:
-        url = f"https://cardano-mainnet.blockfrost.io/api/v0/addresses/{CARDANO_ADDRESS}/assets"
-        headers = {"project_id": BLOCKFROST_PROJECT_ID}
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            assets = response.json()
-            for asset in assets:
-                if asset.get('unit') == f"{TOKEN_POLICY_ID}{TOKEN_ASSET_NAME}":
-                    quantity = int(asset.get('quantity', 0))
-                    if quantity >= TRADE_QUANTITY:
-                        logging.info(f"Found {quantity} SHARDS on Cardano address - executing DEX sell")
-                        return True, quantity
-            
-        return False, 0
-        
+        return await run_blocking(chain.address_amounts)
     except Exception as e:
-        logging.error(f"Error checking Cardano balance: {e}")
-        return False, 0
+        logging.error(f"Error getting Cardano balance: {e}")
+        return None
+
+async def get_cardano_ada_balance():
+    """Get the ADA balance of CARDANO_ADDRESS, or None on error."""
+    amounts = await get_cardano_amounts()
+    if amounts is None:
+        return None
+    return amounts.get('lovelace', 0) / 1_000_000
+
+async def get_cardano_shards_balance():
+    """Get the SHARDS balance of CARDANO_ADDRESS, or None on error."""
+    amounts = await get_cardano_amounts()
+    if amounts is None:
+        return None
+    return float(amounts.get(f"{TOKEN_POLICY_ID}{TOKEN_ASSET_NAME}", 0))
 
 async def check_arbitrage_opportunity():
     """
@@ -324,7 +610,7 @@ async def check_arbitrage_opportunity():
     the difference exceeds the configured threshold.
     
     Returns:
-        None
+        float: Price difference in percent, or None if prices were unavailable
     
     Side Effects:
         - Initiates trades if opportunity is found
@@ -337,20 +623,13 @@ async def check_arbitrage_opportunity():
         - Requires sufficient liquidity on both exchanges
     """
     try:
-        # Fetch DEX price for swapping ADA to TOKEN
-        dex_price_shards_per_ada = get_average_price(ADA_TOKEN_ID, TOKEN_ID)
-        if dex_price_shards_per_ada is None or dex_price_shards_per_ada == 0:
-            logging.error("Failed to get DEX price or price is zero.")
-            return
-        # Invert the dex price to get ADA per TOKEN
-        dex_price_ada_per_shards = 1 / dex_price_shards_per_ada
-
-        # Fetch CEX price data
-        cex_prices = calculate_shards_prices()
+        # Fetch DEX and CEX prices in one concurrent snapshot
+        snapshot = await get_price_snapshot()
 
-        if dex_price_ada_per_shards is not None and cex_prices is not None:
-            cex_price_ada = cex_prices['shards_price_ada']
-            cex_price_usdt = cex_prices['shards_price_usdt']
+        if snapshot is not None:
+            dex_price_ada_per_shards = snapshot['dex_price_ada_per_shards']
+            cex_price_ada = snapshot['shards_price_ada']
+            cex_price_usdt = snapshot['shards_price_usdt']
             logging.info(f"DEX Price (ADA per SHARDS): {dex_price_ada_per_shards:.6f} ADA per SHARDS")
             logging.info(f"CEX Price (ADA per SHARDS): {cex_price_ada:.6f} ADA per SHARDS")
 
@@ -359,23 +638,24 @@ async def check_arbitrage_opportunity():
 
             if price_difference > ARBITRAGE_THRESHOLD:
                 logging.info("Arbitrage Opportunity: Buy on DEX, Sell on CEX")
-                await execute_trade('buy_dex_sell_cex', dex_price_ada_per_shards, cex_price_usdt)
+                start_trade('buy_dex_sell_cex', dex_price_ada_per_shards, cex_price_usdt)
             elif price_difference < -ARBITRAGE_THRESHOLD:
                 logging.info("Arbitrage Opportunity: Buy on CEX, Sell on DEX")
-                await execute_trade('buy_cex_sell_dex', dex_price_ada_per_shards, cex_price_usdt)
+                start_trade('buy_cex_sell_dex', dex_price_ada_per_shards, cex_price_usdt)
             else:
                 logging.info("No significant arbitrage opportunity.")
+            return price_difference
         else:
             logging.error("Price data not available.")
     except Exception as e:
         logging.error(f"Exception in check_arbitrage_opportunity: {e}")
+    return None
         
 
-def get_order_book_depth(symbol):
-    """Get order book depth for a trading pair."""
-    url = f"https://api.exchange.gleec.com/api/3/public/orderbook/{symbol}"
+async def get_order_book_depth(symbol):
+    """Get order book depth for a trading pair from the REST API."""
     try:
-        response = requests.get(url)
+        response = await gleec_public.get(f"/public/orderbook/{symbol}")
         response.raise_for_status()
         data = response.json()
         return data
@@ -383,7 +663,43 @@ def get_order_book_depth(symbol):
         logging.error(f"Error getting order book: {e}")
         return None
 
-def check_liquidity(symbol, side, quantity, price):
+async def get_order_book(symbol):
+    """
+    Get an OrderBook snapshot for a trading pair.
+
+    Uses the streamed book when it is fresh, otherwise fetches the book over REST.
+    The returned snapshot can be passed to every check that needs the book so
+    one fetch serves many queries.
+
+    Returns:
+        OrderBook: Snapshot, or None if no book could be obtained
+    """
+    streamed_book = market_data.get_order_book(symbol, MARKET_DATA_MAX_AGE)
+    if streamed_book is not None:
+        return streamed_book
+
+    levels = await get_order_book_depth(symbol)
+    if not levels:
+        return None
+    try:
+        book = OrderBook.from_levels(levels, symbol)
+    except (IndexError, ValueError) as e:
+        logging.error(f"Error parsing order book data: {e}")
+        return None
+    rest_books[symbol] = (book, time.time())
+    return book
+
+rest_books = {}  # symbol -> (OrderBook, fetch time) of the last REST fetch
+
+def get_cached_order_book(symbol, max_age=MARKET_DATA_MAX_AGE):
+    """Return the streamed or last fetched OrderBook if fresh, without any request."""
+    streamed_book = market_data.get_order_book(symbol, max_age)
+    if streamed_book is not None:
+        return streamed_book
+    book, fetched = rest_books.get(symbol, (None, 0))
+    return book if time.time() - fetched <= max_age else None
+
+async def check_liquidity(symbol, side, quantity, price, book=None):
     """
     Check if there's sufficient liquidity for a trade.
     
@@ -392,6 +708,7 @@ def check_liquidity(symbol, side, quantity, price):
         side (str): 'buy' or 'sell'
         quantity (float): Amount to trade
         price (float): Target price
+        book (OrderBook): Optional snapshot to check against instead of fetching one
     
     Returns:
         bool: True if sufficient liquidity exists, False otherwise
@@ -401,78 +718,198 @@ def check_liquidity(symbol, side, quantity, price):
         - Does not account for hidden orders
         - May not detect synthetic liquidity
     """
-    order_book = get_order_book_depth(symbol)
-    if not order_book:
-        return False
-        
-    side_key = 'ask' if side == 'buy' else 'bid'
-    if side_key not in order_book:
-        logging.error(f"Invalid order book data - missing {side_key}")
+    if book is None:
+        book = await get_order_book(symbol)
+    if not book:
         return False
-        
-    orders = order_book[side_key]
-    available_volume = 0
-    
-    try:
-        for order in orders:
-            order_price = float(order[0])
-            order_quantity = float(order[1])
-            
-            # For buy orders, we need prices less than or equal to our target
-            # For sell orders, we need prices greater than or equal to our target
-            if (side == 'buy' and order_price <= price) or \
-               (side == 'sell' and order_price >= price):
-                available_volume += order_quantity
-                if available_volume >= quantity:
-                    logging.info(f"Found sufficient liquidity for {side} {quantity} {symbol} at price {price}")
-                    return True
-                    
-        logging.warning(f"Insufficient liquidity for {side} {quantity} {symbol} at price {price}. Available: {available_volume}")
+
+    # Buys need asks at or below the target, sells need bids at or above it
+    available_volume = book.depth_within_price(side, price)
+    if available_volume >= quantity:
+        logging.info(f"Found sufficient liquidity for {side} {quantity} {symbol} at price {price}")
+        return True
+
+    logging.warning(f"Insufficient liquidity for {side} {quantity} {symbol} at price {price}. Available: {available_volume}")
+    return False
+
+# All Gleec order traffic (placement, cancel, replace, status) goes through the gateway
+order_gateway = OrderGateway(gleec_private, state_manager, order_stream,
+                             retries=ORDER_RETRIES, retry_delay=ORDER_RETRY_DELAY)
+if PRE_TRADE_LIQUIDITY_CHECK:
+    order_gateway.add_check(LiquidityCheck(get_cached_order_book))
+
+def update_cycle_order(old_order_id, new_order):
+    """Point the cycle waiting on a repriced order at the order that replaced it."""
+    for cycle_id, entry in cycle_driver.active_cycles().items():
+        if str(entry['details'].get('order_id')) == str(old_order_id):
+            state_manager.update_cycle(cycle_id, entry['status'], dict(
+                entry['details'], order_id=new_order['id'], client_order_id=new_order['client_order_id']))
+
+repricer = OrderRepricer(
+    order_gateway,
+    get_cached_order_book,
+    distance=REPRICE_DISTANCE,
+    min_interval=REPRICE_MIN_INTERVAL,
+    max_reprices=REPRICE_MAX_PER_ORDER,
+    max_per_minute=REPRICE_MAX_PER_MINUTE,
+    on_replaced=update_cycle_order
+)
+
+def track_order(order, limit, cross=False):
+    """Hand a placed limit order to the repricer (if enabled); cycle legs that must fill pass cross=True."""
+    if REPRICE_ENABLED and order and order.get('price'):
+        repricer.track(order, limit, cross=cross)
+
+async def create_liquidity(symbol, quantity, price, book=None):
+    """
+    Create a limit order to provide liquidity.
+
+    If a book snapshot is given and the post-only sell would cross the best bid
+    (and be rejected), the order is placed at the best ask instead.
+    """
+    if book is not None:
+        best_bid = book.best_price('sell')
+        best_ask = book.best_price('buy')
+        if best_bid is not None and price <= best_bid and best_ask is not None:
+            logging.info(f"Liquidity price {price} would cross best bid {best_bid}, using best ask {best_ask}")
+            price = best_ask
+
+    # We provide liquidity on the sell side; post-only ensures we're providing not taking liquidity
+    order = await order_gateway.place(symbol, 'sell', quantity, price, post_only=True)
+    if not order:
+        logging.error("Error creating liquidity order")
+        return None
+    logging.info(f"Created liquidity order: {order}")
+    track_order(order, limit=price * (1 - REPRICE_MAX_DRIFT))  # Kept at the best ask, within the drift allowed
+    return order
+
+
+# Task running the current trade cycle, if any
+trade_task = None
+
+def trade_in_progress():
+    """Return True while a trade is being sized and its cycle started."""
+    return trade_task is not None and not trade_task.done()
+
+def start_trade(direction, dex_price, cex_price_usdt):
+    """
+    Start execute_trade as its own task so price monitoring keeps running.
+
+    Trades are sized one at a time so each sees the reservations of the cycles
+    started before it; up to MAX_CONCURRENT_CYCLES cycles then run at once.
+
+    Returns:
+        bool: True if a new trade task was started, False if a trade is being
+              sized or MAX_CONCURRENT_CYCLES cycles are already in flight
+    """
+    global trade_task
+    if trade_in_progress():
+        logging.info("Trade already being started, skipping opportunity")
         return False
-        
-    except (IndexError, ValueError) as e:
-        logging.error(f"Error parsing order book data: {e}")
+    active = len(cycle_driver.active_cycles())
+    if active >= MAX_CONCURRENT_CYCLES:
+        logging.info(f"{active} trade cycles in flight, skipping opportunity")
         return False
+    trade_task = asyncio.create_task(execute_trade(direction, dex_price, cex_price_usdt))
+    return True
 
-def create_liquidity(symbol, quantity, price):
-    """Create a limit order to provide liquidity."""
-    url = 'https://api.exchange.gleec.com/api/3/spot/order'
-    
-    data = {
-        'symbol': symbol,
-        'side': 'sell',  # We provide liquidity on the sell side
-        'quantity': str(quantity),
-        'type': 'limit',
-        'timeInForce': 'GTC',
-        'price': str(price),
-        'post_only': True  # Ensure we're providing not taking liquidity
-    }
+async def calculate_trade_size(direction, book, dex_price, cex_price_usdt):
+    """
+    Find the most profitable trade size for a direction.
 
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
-    try:
-        response = session.post(url, json=data)
-        response.raise_for_status()
-        order_data = response.json()
-        
-        if 'error' in order_data:
-            logging.error(f"Error creating liquidity: {order_data['error']}")
-            return None
-            
-        logging.info(f"Created liquidity order: {order_data}")
-        return order_data
-        
-    except Exception as e:
-        logging.error(f"Error creating liquidity: {e}")
-        if hasattr(e, 'response'):
-            logging.error(f"Response: {e.response.text}")
+    Combines the Gleec book with a DEX price-impact curve and caps the size by
+    MAX_TRADE_QUANTITY and the available balances, less the funds reserved by
+    cycles already in flight (see inventory.py). With TRADE_SIZING_ENABLED off
+    the fixed TRADE_QUANTITY is used for both legs.
+
+    Args:
+        direction (str): Either 'buy_cex_sell_dex' or 'buy_dex_sell_cex'
+        book (OrderBook): SHARDSUSDT book snapshot
+        dex_price (float): DEX price in ADA per SHARDS
+        cex_price_usdt (float): CEX price in USDT
+
+    Returns:
+        dict: 'dex_amount_in', 'cex_quantity', 'cex_price' and 'expected_profit_usdt',
+              or None if no profitable size exists
+    """
+    if not TRADE_SIZING_ENABLED:
+        return {
+            'direction': direction,
+            'dex_amount_in': TRADE_QUANTITY,
+            'cex_quantity': TRADE_QUANTITY,
+            'cex_price': None,
+            'expected_profit_usdt': None
+        }
+    if not book:
         return None
 
+    ada_price_usdt = await get_ada_price_usdt()
+    if not ada_price_usdt:
+        return None
+
+    active_cycles = cycle_driver.active_cycles()
+    if direction == 'buy_cex_sell_dex':
+        usdt_balance = await get_wallet_balance('USDT')
+        if not usdt_balance:
+            return None
+        usdt_available = usdt_balance['available'] - reserved(active_cycles, GLEEC_USDT)
+        max_quantity = MAX_TRADE_QUANTITY
+        if TRADING_MODE == 'inventory':
+            # The DEX leg sells SHARDS already held on Cardano
+            shards_balance = await get_cardano_shards_balance()
+            if shards_balance is None:
+                return None
+            max_quantity = min(max_quantity, shards_balance - reserved(active_cycles, CARDANO_SHARDS))
+            if max_quantity < MIN_TRADE_QUANTITY:
+                logging.info("Not enough SHARDS inventory on Cardano")
+                return None
+        dex_curve = await dex_curve_cache.get(estimate_swap, TOKEN_ID, "", MAX_TRADE_QUANTITY)
+        if not dex_curve:
+            return None
+        size = optimize_buy_cex_sell_dex(
+            book, dex_curve, ada_price_usdt,
+            MIN_TRADE_QUANTITY, max_quantity,
+            usdt_available, fixed_cost_usdt=TRADE_FIXED_COST_USDT
+        )
+        side = 'buy'
+    else:
+        ada_balance = await get_cardano_ada_balance()
+        if ada_balance is None:
+            return None
+        ada_available = ada_balance - reserved(active_cycles, CARDANO_ADA)
+        max_ada = min(MAX_TRADE_QUANTITY * dex_price, ada_available - ADA_FEE_RESERVE)
+        if TRADING_MODE == 'inventory':
+            # The CEX leg sells SHARDS already held on Gleec
+            shards_balance = await get_wallet_balance('SHARDS')
+            if not shards_balance:
+                return None
+            max_shards = shards_balance['available'] - reserved(active_cycles, GLEEC_SHARDS)
+            if max_shards < MIN_TRADE_QUANTITY:
+                logging.info("Not enough SHARDS inventory on Gleec")
+                return None
+            max_ada = min(max_ada, max_shards * dex_price)
+        if max_ada < MIN_TRADE_QUANTITY * dex_price:
+            logging.info("Not enough ADA on Cardano for the minimum trade")
+            return None
+        dex_curve = await dex_curve_cache.get(estimate_swap, "", TOKEN_ID, max_ada)
+        if not dex_curve:
+            return None
+        size = optimize_buy_dex_sell_cex(
+            book, dex_curve, ada_price_usdt,
+            MIN_TRADE_QUANTITY * dex_price, max_ada,
+            fixed_cost_usdt=TRADE_FIXED_COST_USDT, slippage=DEX_SLIPPAGE / 100
+        )
+        side = 'sell'
+        if size and TRADING_MODE == 'inventory':
+            size['cex_quantity'] = min(size['cex_quantity'], max_shards)
+
+    if size:
+        size['cex_price'] = book.worst_price(side, size['cex_quantity'])
+    return size
 
 async def execute_trade(direction, dex_price, cex_price_usdt):
     """
-    Execute an arbitrage trade in the specified direction.
+    Size an arbitrage trade in the specified direction and start its cycle.
     
     Args:
         direction (str): Either 'buy_cex_sell_dex' or 'buy_dex_sell_cex'
@@ -480,345 +917,432 @@ async def execute_trade(direction, dex_price, cex_price_usdt):
         cex_price_usdt (float): Current price on CEX in USDT
     
     Returns:
-        bool: True if trade cycle completed successfully, False otherwise
+        bool: True if a trade cycle was started, False otherwise
     
     Side Effects:
-        - Places orders on exchanges
-        - Transfers tokens between exchanges
-        - Updates bot state
-        - Logs trade execution details
+        - May place a liquidity order on the CEX
+        - Checkpoints a new trade cycle, which cycle_driver then executes
+          stage by stage (see trade_cycle.py) alongside cycles already in flight.
+          With TRADING_MODE=inventory both legs are fired at once from the
+          inventory already held on each venue
     
     Known Issues:
         - Partial fills not handled
         - No automatic retry on failed transfers
-        - Manual intervention needed if cycle interrupted
     """
     try:
-        quantity = TRADE_QUANTITY
-        
-        await check_pending_operations()
-        
-        pending_ops = state_manager.get_pending_operations()
-        if any(pending_ops.values()):
-            logging.info("Found pending operations, completing those first...")
+        # Size the trade against the current book and DEX price impact
+        book = await get_order_book('SHARDSUSDT')
+        size = await calculate_trade_size(direction, book, dex_price, cex_price_usdt)
+        if not size:
+            logging.info("No profitable trade size found")
+            return False
+        quantity = size['cex_quantity']
+        logging.info(f"Trade size: {size}")
+
+        # A DEX leg fired at once needs wallet inputs DexHunter can use right now
+        fires_dex = TRADING_MODE == 'inventory' or direction == 'buy_dex_sell_cex'
+        sell = direction == 'buy_cex_sell_dex'
+        if fires_dex and not await dex_inputs_free(quantity if sell else size['dex_amount_in'], sell=sell):
             return False
                 
         if direction == 'buy_cex_sell_dex':
-            # First part: Buy on CEX
-            usdt_price = cex_price_usdt
+            # Buy on CEX, limit at the worst level the sized fill reaches
+            usdt_price = size.get('cex_price') or cex_price_usdt
             
             # Check liquidity before placing order
-            if not check_liquidity('SHARDSUSDT', 'buy', quantity, usdt_price):
+            if not await check_liquidity('SHARDSUSDT', 'buy', quantity, usdt_price, book=book):
                 logging.warning(f"Insufficient liquidity to buy {quantity} SHARDS at {usdt_price} USDT")
-                if create_liquidity('SHARDSUSDT', quantity * 2, usdt_price * 0.99):
+                if await create_liquidity('SHARDSUSDT', quantity * 2, usdt_price * 0.99, book=book):
                     logging.info("Created liquidity order, waiting for fills...")
                     await asyncio.sleep(30)
                 else:
                     return False
-            
-            # Execute CEX buy
-            order = create_new_order('SHARDSUSDT', 'buy', quantity, usdt_price)
-            if not order:
-                logging.error("Failed to place CEX order.")
-                return False
-
-            order_id = order['id']
-            state_manager.update_order(order_id, 'pending', order)
-            
-            # Wait for order fill
-            order_filled = monitor_order_status(order_id, timeout=600)
-            if not order_filled:
-                logging.error("Failed to execute buy order on CEX.")
-                return False
-
-            # Check balance and withdraw
-            balance = get_wallet_balance('SHARDS')
-            if not balance or balance['available'] < quantity:
-                logging.error("Insufficient SHARDS balance for withdrawal")
-                return False
-
-            # Initiate and wait for withdrawal
-            withdrawal_success = withdraw_shards_to_cardano(quantity)
-            if not withdrawal_success:
-                logging.error("Withdrawal to Cardano failed")
-                return False
-
-            # Second part: Sell on DEX
-            logging.info("Starting DEX sell portion of the trade...")
-            dex_success = execute_trade_on_dex(quantity, sell=True)  # Note: sell=True here
-            if dex_success:
-                logging.info("Successfully completed full buy_cex_sell_dex cycle")
-                return True
-            else:
-                logging.error("Failed to execute DEX sell")
-                return False
                     
         elif direction == 'buy_dex_sell_cex':
+            usdt_price = size.get('cex_price') or cex_price_usdt
+
             # Check liquidity on CEX for selling
-            if not check_liquidity('SHARDSUSDT', 'sell', quantity, cex_price_usdt):
-                logging.warning(f"Insufficient liquidity to sell {quantity} SHARDS at {cex_price_usdt} USDT")
+            if not await check_liquidity('SHARDSUSDT', 'sell', quantity, usdt_price, book=book):
+                logging.warning(f"Insufficient liquidity to sell {quantity} SHARDS at {usdt_price} USDT")
                 # Try to provide liquidity
-                if create_liquidity('SHARDSUSDT', quantity * 2, cex_price_usdt * 1.01):  # Slightly lower price
+                if await create_liquidity('SHARDSUSDT', quantity * 2, usdt_price * 1.01, book=book):  # Slightly lower price
                     logging.info("Created liquidity order, waiting for fills...")
-                    time.sleep(30)  # Wait for potential fills
+                    await asyncio.sleep(30)  # Wait for potential fills
                 else:
                     return False
-                    
-            # Execute DEX purchase first
-            dex_success = execute_trade_on_dex(quantity, sell=False)
-            if dex_success:
-                # If DEX trade succeeds, transfer to CEX
-                transfer_success = transfer_shards_to_gleec(quantity)
-                if transfer_success:
-                    # Execute sell on CEX
-                    cex_success = execute_trade_on_cex('sell', quantity, cex_price_usdt)
-                    if cex_success:
-                        logging.info("Completed DEX buy and CEX sell")
-                        return True
+        else:
             return False
 
-        return False
+        cycle_driver.create(
+            direction,
+            flow=f"inventory_{direction}" if TRADING_MODE == 'inventory' else direction,
+            quantity=quantity,
+            dex_amount_in=size['dex_amount_in'],
+            cex_price=usdt_price,
+            notional=quantity * usdt_price,
+            expected_profit_usdt=size.get('expected_profit_usdt')
+        )
+        return True
         
     except Exception as e:
         logging.error(f"Exception in execute_trade: {e}", exc_info=True)
         return False
 
-def create_new_order(symbol, side, quantity, price=None, order_type='limit', time_in_force='GTC'):
-    """Create new order with improved error handling."""
-    url = 'https://api.exchange.gleec.com/api/3/spot/order'
-    
-    # Generate unique client_order_id
-    client_order_id = f"bot_{int(time.time()*1000)}"
-    
-    data = {
-        'symbol': symbol,
-        'side': side,
-        'quantity': str(quantity),
-        'type': order_type,
-        'timeInForce': time_in_force,
-        'client_order_id': client_order_id
+# Trade-cycle stage handlers. Each makes one attempt to finish its stage and
+# returns (next_stage, updates), or None to be polled again (see trade_cycle.py).
+
+def cycle_client_order_id(cycle, leg):
+    """Client order ID of one of a cycle's orders, the same every time the stage is retried."""
+    return f"{cycle['cycle_id']}_{leg}"
+
+async def cycle_place_buy_order(cycle):
+    """NEW -> ORDER_PLACED: buy SHARDS on Gleec."""
+    client_order_id = cycle_client_order_id(cycle, 'b')
+    # An order sent before a crash is looked up rather than given up on
+    if stage_age(cycle) > 60 and not order_gateway.is_registered(client_order_id):
+        return FAILED, {'error': 'opportunity expired before the order was placed'}
+    order = await order_gateway.place('SHARDSUSDT', 'buy', cycle['quantity'], cycle['cex_price'],
+                                   client_order_id=client_order_id)
+    if not order:
+        return FAILED, {'error': 'failed to place CEX order'}
+    track_order(order, limit=cycle['cex_price'] * (1 + REPRICE_MAX_DRIFT), cross=True)
+    return ORDER_PLACED, {
+        'order_id': order['id'],
+        'client_order_id': order.get('client_order_id'),
+        'symbol': 'SHARDSUSDT'
     }
-    if price:
-        data['price'] = str(price)
 
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
-    try:
-        # Check liquidity one final time before placing order
-        if not check_liquidity(symbol, side, quantity, price):
-            logging.error("Final liquidity check failed before order placement")
-            return None
-            
-        response = session.post(url, json=data)
-        response.raise_for_status()
-        order_data = response.json()
-        
-        if 'id' not in order_data:
-            logging.error(f"No order ID in response: {order_data}")
-            return None
-            
-        # Store both IDs for tracking
-        order_data['client_order_id'] = client_order_id
-        logging.info(f"Order created: ID={order_data['id']}, ClientID={client_order_id}")
-        return order_data
-        
-    except Exception as e:
-        logging.error(f"Error creating order: {e}")
-        if hasattr(e, 'response'):
-            logging.error(f"Response: {e.response.text}")
+async def poll_cycle_order(cycle):
+    """
+    Check a cycle's Gleec order once, cancelling it if it is not filled in time.
+
+    Returns:
+        tuple: (True, None) once filled, (True, error) once it failed, (False, None) while open
+    """
+    order_id, symbol = repricer.current_id(cycle['order_id']), cycle['symbol']
+    status = await order_gateway.status(order_id, symbol)  # Active orders first, then history
+
+    if status == 'filled':
+        state_manager.remove('active_orders', order_id)
+        repricer.untrack(order_id)
+        return True, None
+    if status in ['canceled', 'cancelled', 'expired']:
+        state_manager.remove('active_orders', order_id)
+        repricer.untrack(order_id)
+        return True, f"order {status}"
+    if status == 'not_found' and stage_age(cycle) > 60:
+        # Cancel in case the order surfaces later, so it cannot fill for a failed cycle
+        repricer.untrack(order_id)
+        await order_gateway.cancel(order_id, symbol)
+        state_manager.remove('active_orders', order_id)
+        return True, 'order not found after being created'
+    # A resting order being repriced gets the full stage timeout instead of 60s
+    if (status == 'new' and stage_age(cycle) > 60 and not repricer.is_tracking(order_id)) or stage_age(cycle) > 600:
+        logging.warning(f"Order {order_id} not filled in time, cancelling...")
+        repricer.untrack(order_id)  # No replace may race the cancel; retried on the next poll if it fails
+        if await order_gateway.cancel(order_id, symbol):
+            return True, 'order not filled in time'
+    return False, None
+
+async def cycle_check_buy_order(cycle):
+    """ORDER_PLACED -> FILLED once the buy order is filled; cancels it after timeouts."""
+    finished, error = await poll_cycle_order(cycle)
+    if not finished:
         return None
+    if error:
+        return FAILED, {'error': error}
+    return FILLED, {'order_id': repricer.current_id(cycle['order_id'])}
+
+async def cycle_request_withdrawal(cycle):
+    """FILLED -> WITHDRAW_REQUESTED: withdraw the bought SHARDS to the Cardano wallet."""
+    balance = await get_wallet_balance('SHARDS')
+    if balance is None:
+        return None
+    others = reserved(cycle_driver.active_cycles(), GLEEC_SHARDS, exclude=cycle['cycle_id'])
+    if balance['available'] - others < cycle['quantity']:
+        return FAILED, {'error': 'insufficient SHARDS balance for withdrawal'}
+    withdrawal_id = await withdraw_crypto('SHARDS', cycle['quantity'], CARDANO_ADDRESS)
+    if not withdrawal_id:
+        return FAILED, {'error': 'failed to initiate SHARDS withdrawal'}
+    return WITHDRAW_REQUESTED, {'withdrawal_id': withdrawal_id}
+
+async def cycle_check_withdrawal(cycle, required_confirmations=2):
+    """WITHDRAW_REQUESTED -> WITHDRAWN once the withdrawal has enough confirmations."""
+    withdrawal_id = cycle['withdrawal_id']
+    status, details = await get_transaction_status(withdrawal_id)
+
+    if status == 'SUCCESS' and details.get('confirmations', 0) >= required_confirmations:
+        state_manager.complete_transaction(withdrawal_id, tx_type='withdrawal')
+        return WITHDRAWN, {}
+    if status in ['FAILED', 'ROLLED_BACK']:
+        return FAILED, {'error': f"withdrawal {status}"}
+    if status == 'NOT_FOUND' and stage_age(cycle) > 120:
+        return FAILED, {'error': 'withdrawal not found'}
+    if stage_age(cycle) > 3600:
+        return FAILED, {'error': 'withdrawal not confirmed within timeout'}
+    return None
 
-def check_order_status(order_id):
-    """Check current status of a CEX order."""
-    # Get order details from state manager to access symbol
-    order_details = state_manager.state['active_orders'].get(order_id, {}).get('details', {})
-    symbol = order_details.get('symbol')
-    
-    if not symbol:
-        logging.error(f"Cannot check order {order_id}: Missing symbol in order details")
-        return 'error'
+async def cycle_submit_dex_sell(cycle):
+    """WITHDRAWN -> DEX_SUBMITTED: sell the withdrawn SHARDS on the DEX."""
+    if not await dex_inputs_free(cycle['quantity'], sell=True):
+        return None  # Polled again once our unconfirmed transactions settle
+    tx_hash = await submit_dex_swap(cycle['quantity'], sell=True)
+    if not tx_hash:
+        return FAILED, {'error': 'failed to submit DEX sell'}
+    return DEX_SUBMITTED, {'tx_hash': tx_hash}
 
-    # First try active orders
-    url = f"https://api.exchange.gleec.com/api/3/spot/order/{order_id}"
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
-    try:
-        response = session.get(url)
-        if response.status_code == 200:
-            order_data = response.json()
-            return order_data.get('status')
-        
-        # If not found in active orders, check history
-        return check_order_history(order_id, symbol)  # Pass symbol to the function
-            
-    except Exception as e:
-        logging.error(f"Error checking order status: {e}")
-        return 'error'
+async def cycle_submit_dex_buy(cycle):
+    """
+    NEW -> DEX_SUBMITTED: buy SHARDS on the DEX.
 
-def check_order_history(order_id, symbol):
-    """Check order status in order history with symbol parameter."""
-    url = "https://api.exchange.gleec.com/api/3/spot/history/order"
-    params = {
-        'symbol': symbol,
-        'limit': 100
-    }
-    
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
+    With CHAIN_UNCONFIRMED_TX, if the swap pays the SHARDS straight to our
+    address, the Gleec deposit is built on the unconfirmed swap output and
+    submitted right behind it (NEW -> TRANSFER_SUBMITTED, see cycle_check_deposit).
+    """
+    if stage_age(cycle) > 60:
+        return FAILED, {'error': 'opportunity expired before the swap was submitted'}
+    if not await dex_inputs_free(cycle['dex_amount_in']):
+        return FAILED, {'error': 'wallet inputs busy with unconfirmed transactions, opportunity skipped'}
+    tx_hash = await submit_dex_swap(cycle['dex_amount_in'], sell=False)
+    if not tx_hash:
+        return FAILED, {'error': 'failed to submit DEX buy'}
+    if CHAIN_UNCONFIRMED_TX:
+        chained = await send_chained_to_gleec(tx_hash, cycle['quantity'])
+        if chained:
+            return TRANSFER_SUBMITTED, {'tx_hash': tx_hash, 'parent_tx': tx_hash, 'transfer_tx': chained}
+    return DEX_SUBMITTED, {'tx_hash': tx_hash}
+
+async def send_chained_to_gleec(parent_tx, quantity):
+    """
+    Send SHARDS to Gleec from the outputs of an unconfirmed transaction.
+
+    Returns:
+        str: Transfer transaction ID, or None if the parent did not pay enough
+             SHARDS to our address (e.g. order-based DEXes pay out in a later
+             batcher transaction) or the transfer failed
+    """
     try:
-        response = session.get(url, params=params)
-        response.raise_for_status()
-        orders = response.json()
-        
-        # Look for our order in the history
-        for order in orders:
-            if str(order['id']) == str(order_id):
-                return order['status']
-                
-        return 'not_found'
-        
+        available = await run_blocking(chain.pending_token_amount, parent_tx, TOKEN_ID)
     except Exception as e:
-        logging.error(f"Error checking order history: {e}")
-        return 'error'
+        logging.error(f"Error reading outputs of {parent_tx}: {e}")
+        return None
+    if available < quantity:
+        logging.info(f"Swap {parent_tx} pays {available} SHARDS to our address, waiting for confirmation instead")
+        return None
+    deposit_address = await get_deposit_address('SHARDS')
+    if not deposit_address:
+        return None
+    tx_id = await send_shards_to_address(deposit_address, quantity)
+    if tx_id:
+        logging.info(f"Transfer {tx_id} chained on unconfirmed swap {parent_tx}")
+        return str(tx_id)
+    return None
 
-def monitor_order_status(order_id, timeout=300):
-    """Monitor order status with improved retry logic and timeout for 'new' status."""
-    start_time = time.time()
-    retry_delay = 2  # Initial delay in seconds
-    max_retries = 30
-    attempts = 0
-    new_status_timeout = 60  # Timeout specifically for 'new' status (1 minute)
-    new_status_start = time.time()
-    
-    # Get order details from state manager to access symbol
-    order_details = state_manager.state['active_orders'].get(order_id, {}).get('details', {})
-    symbol = order_details.get('symbol')
-    
-    if not symbol:
-        logging.error(f"Cannot monitor order {order_id}: Missing symbol in order details")
-        return False
-        
-    first_status_check = True
+async def cycle_check_dex_tx(cycle):
+    """DEX_SUBMITTED -> DONE (sell) or DEX_CONFIRMED (buy) once the swap is in a block."""
+    tx_hash = cycle['tx_hash']
+    status = await get_tx_confirmation(tx_hash)
+    if status == 'confirmed':
+        state_manager.complete_transaction(tx_hash)
+        if cycle['direction'] == 'buy_cex_sell_dex':
+            state_manager.update_transaction(cycle['withdrawal_id'], dex_sell_completed=True)
+            return DONE, {}
+        return DEX_CONFIRMED, {}
+    if stage_age(cycle) > 300:
+        return FAILED, {'error': f"DEX transaction {tx_hash} not confirmed within timeout"}
+    return None
 
-    while time.time() - start_time < timeout and attempts < max_retries:
-        try:
-            status = check_order_history(order_id, symbol)
-            logging.info(f"Order {order_id} status: {status}")
-            
-            if status == 'filled':
-                return True
-            elif status in ['cancelled', 'expired', 'error']:
-                return False
-            elif status == 'new':
-                # Only start the new status timer after first confirmation of new status
-                if first_status_check:
-                    new_status_start = time.time()
-                    first_status_check = False
-                # Check if we've been in 'new' status too long    
-                elif time.time() - new_status_start > new_status_timeout:
-                    logging.warning(f"Order {order_id} stuck in 'new' status for too long, cancelling...")
-                    if cancel_order(order_id, symbol):
-                        return False
-            elif status == 'not_found' and not first_status_check:
-                # Only consider not_found as an error after first successful status check
-                logging.error(f"Order {order_id} not found after being created")
-                return False
-                
-            # Exponential backoff with max delay of 10 seconds
-            retry_delay = min(retry_delay * 1.5, 10)
-            time.sleep(retry_delay)
-            attempts += 1
-            
-        except Exception as e:
-            logging.error(f"Error monitoring order {order_id}: {e}")
-            time.sleep(retry_delay)
-            attempts += 1
+async def cycle_send_to_gleec(cycle):
+    """DEX_CONFIRMED -> TRANSFER_SUBMITTED: send the bought SHARDS to the Gleec deposit address."""
+    deposit_address = await get_deposit_address('SHARDS')
+    if not deposit_address:
+        return FAILED, {'error': 'failed to obtain Gleec SHARDS deposit address'}
+    tx_id = await send_shards_to_address(deposit_address, cycle['quantity'])
+    if not tx_id:
+        return FAILED, {'error': 'failed to send SHARDS to Gleec'}
+    return TRANSFER_SUBMITTED, {'transfer_tx': str(tx_id)}
+
+async def cycle_check_deposit(cycle):
+    """
+    TRANSFER_SUBMITTED -> DEPOSITED once Gleec has credited the cycle's transfer.
 
-    logging.error(f"Order {order_id} monitoring timed out after {attempts} attempts")
-    # Try to cancel the order before giving up
-    cancel_order(order_id, symbol)
-    return False
+    The deposit is matched by the transfer's hash (see get_deposit_status).
+    A transfer chained on an unconfirmed swap ('parent_tx') is rolled back and
+    the cycle failed if the swap is not confirmed within the DEX timeout: the
+    transfer can never confirm without it.
+    """
+    parent_tx = cycle.get('parent_tx')
+    status = await get_deposit_status('SHARDS', cycle['transfer_tx'])
+    if status == 'SUCCESS':
+        logging.info(f"Deposit of {cycle['quantity']} SHARDS ({cycle['transfer_tx']}) confirmed on Gleec.")
+        if parent_tx:
+            state_manager.complete_transaction(parent_tx)
+        return DEPOSITED, {}
+    if status in ['FAILED', 'ROLLED_BACK']:
+        return FAILED, {'error': f"Gleec deposit of {cycle['transfer_tx']} {status}"}
+    if parent_tx and stage_age(cycle) > 300:
+        # Only a swap still unconfirmed (or unknown) is dropped; a failed lookup is retried next poll
+        if await get_tx_confirmation(parent_tx) == 'pending':
+            dropped = await run_blocking(chain.drop_submitted, parent_tx)
+            return FAILED, {'error': f"DEX transaction {parent_tx} not confirmed within timeout, "
+                                     f"rolled back {', '.join(dropped) or 'nothing'}"}
+    if stage_age(cycle) > 3600:
+        return FAILED, {'error': 'deposit not confirmed within timeout'}
+    return None
 
-def cancel_order(order_id, symbol):
-    """Cancel an active order."""
-    url = f"https://api.exchange.gleec.com/api/3/spot/order/{order_id}/{symbol}"  # Include symbol in URL
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
-    try:
-        response = session.delete(url)
-        response.raise_for_status()
-        result = response.json()
-        if result.get('status') == 'canceled':
-            logging.info(f"Successfully cancelled order {order_id}")
-            state_manager.update_order(order_id, 'cancelled', {
-                'status': 'cancelled',
-                'timestamp': time.time()
-            })
-            return True
-        else:
-            logging.error(f"Unexpected response when cancelling order: {result}")
-            return False
-    except Exception as e:
-        logging.error(f"Failed to cancel order {order_id}: {e}")
-        if hasattr(e, 'response'):
-            logging.error(f"Response: {e.response.text}")
-        return False
+async def cycle_place_sell_order(cycle):
+    """
+    DEPOSITED -> DONE: sell the deposited SHARDS on Gleec.
 
-def handle_pending_order(order_id, order):
-    """Handle a pending CEX order."""
-    # Get symbol from order details
-    symbol = order.get('details', {}).get('symbol')
-    if not symbol:
-        logging.error(f"Cannot handle order {order_id}: Missing symbol in order details")
-        return False
-        
-    status = check_order_status(order_id)  # Symbol will be retrieved from state
-    
-    if status == 'not_found':
-        # Order doesn't exist - mark as failed and clean up
-        logging.warning(f"Order {order_id} not found - marking as failed")
-        state_manager.update_order(order_id, 'failed', {
-            'status': 'not_found',
-            'timestamp': time.time()
-        })
-        return False
-        
-    elif status == 'filled':
-        state_manager.update_order(order_id, 'completed', {
-            'status': 'filled',
-            'timestamp': time.time()
-        })
-        return True
-        
-    elif status in ['canceled', 'expired', 'error']:
-        state_manager.update_order(order_id, 'failed', {
-            'status': status,
-            'timestamp': time.time()
-        })
-        return False
-        
+    This leg closes a position the cycle already holds, possibly long after the
+    trade was sized, so it skips the pre-trade checks and is retried instead of
+    failed: a failed cycle would leave the SHARDS on Gleec with nothing to sell
+    them. When the cached book no longer fills the sized price, the order is
+    priced at the level it now reaches, down to the repricing floor.
+    """
+    price = cycle['cex_price']
+    floor = price * (1 - REPRICE_MAX_DRIFT)
+    book = get_cached_order_book('SHARDSUSDT')
+    if book is not None and book.depth_within_price('sell', price) < cycle['quantity']:
+        price = max(book.worst_price('sell', cycle['quantity']) or floor, floor)
+    order = await order_gateway.place('SHARDSUSDT', 'sell', cycle['quantity'], price,
+                                   client_order_id=cycle_client_order_id(cycle, 's'), checks=False)
+    if not order:
+        if stage_age(cycle) > 3600:
+            return FAILED, {'error': 'failed to place CEX sell order, SHARDS left on Gleec'}
+        logging.warning(f"Cycle {cycle['cycle_id']}: CEX sell order not placed, retrying")
+        return None
+    track_order(order, limit=floor, cross=True)
+    return DONE, {'order_id': order['id'], 'client_order_id': order.get('client_order_id')}
+
+async def cycle_fire_both_legs(cycle):
+    """NEW -> LEGS_SUBMITTED: place the CEX order and submit the DEX swap at the same moment."""
+    if stage_age(cycle) > 60:
+        return FAILED, {'error': 'opportunity expired before the legs were submitted'}
+    # Checked before either leg is fired: the DEX leg must never wait once the CEX order is live
+    sell = cycle['direction'] == 'buy_cex_sell_dex'
+    if not await dex_inputs_free(cycle['quantity'] if sell else cycle['dex_amount_in'], sell=sell):
+        return FAILED, {'error': 'wallet inputs busy with unconfirmed transactions, opportunity skipped'}
+    if cycle['direction'] == 'buy_cex_sell_dex':
+        order, tx_hash = await asyncio.gather(
+            order_gateway.place('SHARDSUSDT', 'buy', cycle['quantity'], cycle['cex_price'],
+                             client_order_id=cycle_client_order_id(cycle, 'c')),
+            submit_dex_swap(cycle['quantity'], sell=True)
+        )
+    else:
+        order, tx_hash = await asyncio.gather(
+            order_gateway.place('SHARDSUSDT', 'sell', cycle['quantity'], cycle['cex_price'],
+                             client_order_id=cycle_client_order_id(cycle, 'c')),
+            submit_dex_swap(cycle['dex_amount_in'], sell=False)
+        )
+
+    updates = {'symbol': 'SHARDSUSDT'}
+    if order:
+        updates.update(order_id=order['id'], client_order_id=order.get('client_order_id'))
+        drift = REPRICE_MAX_DRIFT if order['side'] == 'buy' else -REPRICE_MAX_DRIFT
+        track_order(order, limit=cycle['cex_price'] * (1 + drift), cross=True)
+    if tx_hash:
+        updates['tx_hash'] = tx_hash
+    if order and tx_hash:
+        return LEGS_SUBMITTED, updates
+    if order or tx_hash:
+        updates['error'] = f"{'DEX swap' if order else 'CEX order'} failed, {'CEX order' if order else 'DEX swap'} is unhedged"
+    else:
+        updates['error'] = 'both legs failed'
+    return FAILED, updates
+
+async def cycle_check_both_legs(cycle):
+    """LEGS_SUBMITTED -> DONE once the CEX order is filled and the DEX swap is in a block."""
+    (order_finished, order_error), tx_status = await asyncio.gather(
+        poll_cycle_order(cycle), get_tx_confirmation(cycle['tx_hash'])
+    )
+    if order_error:
+        return FAILED, {'error': f"{order_error}, DEX swap is unhedged"}
+    if tx_status == 'pending' and stage_age(cycle) > 300:  # 'error' is a failed lookup: polled again
+        if not order_finished:
+            await order_gateway.cancel(repricer.current_id(cycle['order_id']), cycle['symbol'])
+        return FAILED, {'error': f"DEX transaction {cycle['tx_hash']} not confirmed within timeout"}
+    if order_finished and tx_status == 'confirmed':
+        state_manager.complete_transaction(cycle['tx_hash'])
+        return DONE, {'order_id': repricer.current_id(cycle['order_id'])}
+    return None
+
+async def cycle_check_transfer(cycle):
+    """TRANSFER_SUBMITTED -> DONE once a rebalance transfer to Gleec is confirmed on chain."""
+    status = await check_transfer_status(cycle['transfer_tx'])
+    if status == 'confirmed':
+        return DONE, {}
+    if stage_age(cycle) > 3600:
+        return FAILED, {'error': f"transfer {cycle['transfer_tx']} not confirmed within timeout"}
     return None
 
-def handle_pending_transfer(tx_id, transfer):
+async def cycle_finish(cycle):
+    """Final stage with nothing left to do."""
+    return DONE, {}
+
+CYCLE_HANDLERS = {
+    'buy_cex_sell_dex': {
+        NEW: cycle_place_buy_order,
+        ORDER_PLACED: cycle_check_buy_order,
+        FILLED: cycle_request_withdrawal,
+        WITHDRAW_REQUESTED: cycle_check_withdrawal,
+        WITHDRAWN: cycle_submit_dex_sell,
+        DEX_SUBMITTED: cycle_check_dex_tx
+    },
+    'buy_dex_sell_cex': {
+        NEW: cycle_submit_dex_buy,
+        DEX_SUBMITTED: cycle_check_dex_tx,
+        DEX_CONFIRMED: cycle_send_to_gleec,
+        TRANSFER_SUBMITTED: cycle_check_deposit,
+        DEPOSITED: cycle_place_sell_order
+    },
+    'inventory_buy_cex_sell_dex': {
+        NEW: cycle_fire_both_legs,
+        LEGS_SUBMITTED: cycle_check_both_legs
+    },
+    'inventory_buy_dex_sell_cex': {
+        NEW: cycle_fire_both_legs,
+        LEGS_SUBMITTED: cycle_check_both_legs
+    },
+    'rebalance_to_gleec': {
+        NEW: cycle_send_to_gleec,
+        TRANSFER_SUBMITTED: cycle_check_transfer
+    },
+    'rebalance_to_cardano': {
+        NEW: cycle_request_withdrawal,
+        WITHDRAW_REQUESTED: cycle_check_withdrawal,
+        WITHDRAWN: cycle_finish
+    }
+}
+
+cycle_driver = CycleDriver(
+    state_manager,
+    CYCLE_HANDLERS,
+    poll_interval=CYCLE_POLL_INTERVAL,
+    # Slow stages are polled less often, like the old monitor loops; a sell
+    # order that could not be placed is retried every 30s
+    poll_intervals={WITHDRAW_REQUESTED: 30, TRANSFER_SUBMITTED: 60, DEPOSITED: 30}
+)
+
+def wake_on_order_report(order_id, report):
+    """Step the trade cycles as soon as one of our orders finishes."""
+    if report.get('status') in FINAL_STATUSES:
+        cycle_driver.wake()
+
+async def handle_pending_transfer(tx_id, transfer):
     """Handle a pending transfer."""
-    status = check_transfer_status(tx_id)
+    status = await check_transfer_status(tx_id)
     if status == 'confirmed':
         state_manager.update_transfer(tx_id, 'completed', {'status': 'confirmed'})
     elif status == 'failed':
         state_manager.update_transfer(tx_id, 'failed', {'status': 'failed'})
 
 
-def check_withdrawal_status(withdrawal_id):
+async def check_withdrawal_status(withdrawal_id):
     """Check the status of a withdrawal using the Gleec API."""
     try:
-        url = f"https://api.exchange.gleec.com/api/3/wallet/transactions/{withdrawal_id}"
-        session = requests.Session()
-        session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-        response = session.get(url)
+        response = await gleec_private.get(f"/wallet/transactions/{withdrawal_id}", priority=PRIORITY_BACKGROUND)
         response.raise_for_status()
         transaction = response.json()
         if transaction:
@@ -828,24 +1352,20 @@ def check_withdrawal_status(withdrawal_id):
         logging.error(f"Error checking withdrawal status: {e}")
         return 'ERROR'
 
-def handle_pending_withdrawal(withdrawal_id):
+async def handle_pending_withdrawal(withdrawal_id):
     """Handle a pending withdrawal with improved state cleanup and tracking."""
     try:
-        status = check_withdrawal_status(withdrawal_id)
+        status = await check_withdrawal_status(withdrawal_id)
         logging.info(f"Withdrawal {withdrawal_id} status: {status}")
         
         if status == 'SUCCESS':
             state_manager.update_withdrawal(withdrawal_id, 'completed', {'status': 'SUCCESS'})
             state_manager.complete_transaction(withdrawal_id, tx_type='withdrawal')
-            if withdrawal_id in state_manager.state['active_withdrawals']:
-                del state_manager.state['active_withdrawals'][withdrawal_id]
-            state_manager.save_state()
+            state_manager.remove('active_withdrawals', withdrawal_id)
             return True
         elif status in ['FAILED', 'ROLLED_BACK']:
             state_manager.update_withdrawal(withdrawal_id, 'failed', {'status': status})
-            if withdrawal_id in state_manager.state['active_withdrawals']:
-                del state_manager.state['active_withdrawals'][withdrawal_id]
-            state_manager.save_state()
+            state_manager.remove('active_withdrawals', withdrawal_id)
             return False
             
         return None
@@ -855,96 +1375,58 @@ def handle_pending_withdrawal(withdrawal_id):
         return False
 
 
-def execute_trade_on_cex(side, quantity, price=None):
-    """Execute a trade on the CEX."""
-    try:
-        symbol = 'SHARDSUSDT'
-        if price is None:
-            # Place a market order
-            order = create_new_order(symbol, side, quantity, order_type='market')
-        else:
-            # Place a limit order
-            order = create_new_order(symbol, side, quantity, price)
-        if order:
-            logging.info(f"CEX Order placed: {order}")
-            return True
-        else:
-            logging.error("Failed to place CEX order.")
-            return False
-    except Exception as e:
-        logging.error(f"Exception in execute_trade_on_cex: {e}", exc_info=True)
-        return False
-
-def create_new_order(symbol, side, quantity, price=None, order_type='limit', time_in_force='GTC'):
-    """Create new order with client_order_id tracking."""
-    url = 'https://api.exchange.gleec.com/api/3/spot/order'
-    
-    # Generate unique client_order_id
-    client_order_id = f"bot_{int(time.time()*1000)}"
-    
-    data = {
-        'symbol': symbol,
-        'side': side,
-        'quantity': str(quantity),
-        'type': order_type,
-        'timeInForce': time_in_force,
-        'client_order_id': client_order_id
-    }
-    if price:
-        data['price'] = str(price)
+async def estimate_swap(amount_in, token_in_id, token_out_id, max_age=None):
+    """
+    Estimate the swap on the DEX, reusing a cached estimate if fresh.
 
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
-    try:
-        response = session.post(url, json=data)
-        response.raise_for_status()
-        order_data = response.json()
-        
-        if 'id' not in order_data:
-            logging.error(f"No order ID in response: {order_data}")
-            return None
-            
-        # Store both IDs for tracking
-        order_data['client_order_id'] = client_order_id
-        logging.info(f"Order created: ID={order_data['id']}, ClientID={client_order_id}")
-        return order_data
-        
-    except Exception as e:
-        logging.error(f"Error creating order: {e}")
-        if hasattr(e, 'response'):
-            logging.error(f"Response: {e.response.text}")
+    Amounts within one cache bucket share an estimate (see quote_cache.py);
+    one made for a different amount has its total_output scaled to amount_in.
+    """
+    key = quote_cache.key('estimate', token_in_id, token_out_id, amount_in, DEX_SLIPPAGE)
+    quoted = await quote_cache.get_or_fetch(
+        key, lambda: fetch_quoted_estimate(amount_in, token_in_id, token_out_id), max_age
+    )
+    if quoted is None:
         return None
+    quoted_amount, estimate = quoted
+    if quoted_amount == amount_in or estimate.get('total_output') is None:
+        return estimate
+    return dict(estimate, total_output=float(estimate['total_output']) * amount_in / quoted_amount)
+
+async def fetch_quoted_estimate(amount_in, token_in_id, token_out_id):
+    """Fetch an estimate for the quote cache as (amount_in, estimate), or None on error."""
+    estimate = await fetch_swap_estimate(amount_in, token_in_id, token_out_id)
+    return (amount_in, estimate) if estimate else None
 
-def estimate_swap(amount_in, token_in_id, token_out_id):
+async def fetch_swap_estimate(amount_in, token_in_id, token_out_id):
     """Estimate the swap on the DEX using DEX Hunter API."""
-    url = f"{DEXHUNTER_API_BASE_URL}/swap/estimate"
     payload = {
         "amount_in": amount_in,
         "token_in": token_in_id,
         "token_out": token_out_id,
-        "slippage": 2,
+        "slippage": DEX_SLIPPAGE,
         # "single_preferred_dex": "minswap",  # Optional
         # "blacklisted_dexes": ["string"],    # Optional
     }
     try:
-        headers = {
-            "Content-Type": "application/json",
-            "accept": "application/json",
-        }
-        response = requests.post(url, json=payload, headers=headers)
+        response = await dexhunter.post("/swap/estimate", json=payload)
         response.raise_for_status()
         data = response.json()
         return data  # estimation details
-    except requests.exceptions.HTTPError as http_err:
+    except HTTPError as http_err:
         logging.error(f"HTTP error in estimate_swap: {http_err}")
         logging.error(f"Response content: {response.text}")
     except Exception as e:
         logging.error(f"Exception in estimate_swap: {e}", exc_info=True)
     return None
 
-def execute_trade_on_dex(quantity, sell=False):
-    """Execute a trade on the DEX with improved error handling and logging."""
+async def submit_dex_swap(quantity, sell=False):
+    """
+    Estimate, build, sign and submit a DEX swap without waiting for confirmation.
+
+    Returns:
+        str: Transaction hash, or None if any step failed
+    """
     try:
         amount_in = float(quantity)
         
@@ -958,125 +1440,128 @@ def execute_trade_on_dex(quantity, sell=False):
             logging.info(f"Buying SHARDS with {amount_in} ADA")
 
         # Estimate the swap
-        estimate = estimate_swap(amount_in, token_in_id, token_out_id)
+        estimate = await estimate_swap(amount_in, token_in_id, token_out_id)
         if not estimate:
             logging.error("Swap estimation failed")
-            return False
+            return None
 
         logging.info(f"Swap estimate received: {json.dumps(estimate, indent=2)}")
 
-        # Create the swap transaction with proper direction
-        if sell:
-            tx_cbor = create_swap_transaction(amount_in, CARDANO_ADDRESS, token_in=TOKEN_ID, token_out="")
-        else:
-            tx_cbor = create_swap_transaction(amount_in, CARDANO_ADDRESS, token_in="", token_out=TOKEN_ID)
-            
-        if not tx_cbor:
-            logging.error("Failed to create swap transaction")
-            return False
-
-        # Sign the transaction using DexHunter's signing process
-        try:
-            signed_tx_cbor = sign_with_dexhunter(tx_cbor)
-            if not signed_tx_cbor:
-                logging.error("Failed to sign transaction")
-                return False
-                
-            logging.info("Transaction signed successfully")
-            
-        except Exception as sign_error:
-            logging.error(f"Error during transaction signing: {sign_error}", exc_info=True)
-            return False
-
-        # Submit the transaction
-        try:
-            tx_hash = submit_transaction(signed_tx_cbor)
-            if tx_hash:
-                logging.info(f"Trade executed successfully. Transaction hash: {tx_hash}")
-                
-                # Monitor transaction status
-                status = monitor_transaction_status(tx_hash)
-                if status == "confirmed":
-                    logging.info(f"Transaction {tx_hash} confirmed")
-                    # Update state after successful DEX trade
-                    state_manager.complete_transaction(tx_hash)
-                    return True
-                else:
-                    logging.error(f"Transaction {tx_hash} failed with status: {status}")
-                    return False
-                    
-            else:
-                logging.error("Transaction submission failed")
-                return False
-                
-        except Exception as submit_error:
-            logging.error(f"Error during transaction submission: {submit_error}", exc_info=True)
-            return False
+        # Never waits for our unconfirmed transactions: callers check
+        # dex_inputs_free() before the opportunity is taken
+        return await build_and_submit_swap(amount_in, sell)
 
     except Exception as e:
-        logging.error(f"Exception in execute_trade_on_dex: {e}", exc_info=True)
-        return False
+        logging.error(f"Exception in submit_dex_swap: {e}", exc_info=True)
+        return None
 
-def monitor_transaction_status(tx_hash, timeout=300):
+async def dex_inputs_free(amount_in, sell=False):
     """
-    Monitor the status of a blockchain transaction.
-    
+    Check that DexHunter can build a swap without touching our unconfirmed transactions.
+
+    DexHunter picks swap inputs from the on-chain UTxOs and cannot see the
+    local UTxO set, so a swap built while one of our transactions still spends
+    on-chain UTxOs may pick the same inputs and be rejected. Checked before a
+    DEX leg is fired: a busy wallet skips the opportunity instead of holding
+    a swap back while the other leg is live.
+
     Args:
-        tx_hash (str): Transaction hash to monitor
-        timeout (int): Maximum time to wait in seconds
-    
+        amount_in (float): SHARDS to sell, or ADA to spend
+        sell (bool): True for a SHARDS -> ADA swap
+
     Returns:
-        str: Transaction status ('confirmed', 'timeout', or 'error')
-    
-    Known Issues:
-        - Network congestion can cause timeouts
-        - Reorgs not handled
-        - Confirmation count may be insufficient for large amounts
+        bool: True if no on-chain UTxO is spent by an unconfirmed transaction
+              and the remaining ones cover the swap
     """
-    url = f"https://cardano-mainnet.blockfrost.io/api/v0/txs/{tx_hash}"
-    headers = {"project_id": BLOCKFROST_PROJECT_ID}
-    
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                tx_data = response.json()
-                if tx_data.get("block_height"):
-                    return "confirmed"
-                    
-            elif response.status_code != 404: # 404 is expected for pending transactions
-                logging.error(f"Error checking transaction status: {response.text}")
-                return "error"
-                
-            time.sleep(5)  # Wait 5 seconds before checking again
+    try:
+        free, encumbered = await run_blocking(chain.free_inputs)
+    except Exception as e:
+        logging.error(f"Error checking wallet inputs: {e}")
+        return False
+    if encumbered:
+        logging.info(f"{encumbered} wallet UTxOs are spent by unconfirmed transactions, skipping the DEX swap")
+        return False
+    lovelace_needed = ADA_FEE_RESERVE * 1_000_000 + (0 if sell else amount_in * 1_000_000)
+    shards_needed = amount_in if sell else 0
+    if free.get('lovelace', 0) < lovelace_needed or free.get(f"{TOKEN_POLICY_ID}{TOKEN_ASSET_NAME}", 0) < shards_needed:
+        logging.info("Confirmed wallet UTxOs do not cover the DEX swap yet, skipping it")
+        return False
+    return True
+
+async def build_and_submit_swap(amount_in, sell):
+    """Build the swap with DexHunter, sign and submit it (see submit_dex_swap)."""
+    # Create the swap transaction with proper direction
+    if sell:
+        tx_cbor = await create_swap_transaction(amount_in, CARDANO_ADDRESS, token_in=TOKEN_ID, token_out="")
+    else:
+        tx_cbor = await create_swap_transaction(amount_in, CARDANO_ADDRESS, token_in="", token_out=TOKEN_ID)
+        
+    if not tx_cbor:
+        logging.error("Failed to create swap transaction")
+        return None
+
+    # A swap spending inputs of one of our unconfirmed transactions would be rejected
+    conflicts = await run_blocking(chain.conflicting_transactions, Transaction.from_cbor(bytes.fromhex(tx_cbor)))
+    if conflicts:
+        logging.error(f"DEX swap built on inputs spent by unconfirmed {', '.join(conflicts)}, not submitting")
+        return None
+
+    # Sign the transaction using DexHunter's signing process
+    try:
+        signed_tx_cbor = await sign_with_dexhunter(tx_cbor)
+        if not signed_tx_cbor:
+            logging.error("Failed to sign transaction")
+            return None
             
-        except Exception as e:
-            logging.error(f"Error monitoring transaction: {e}", exc_info=True)
-            return "error"
+        logging.info("Transaction signed successfully")
+        
+    except Exception as sign_error:
+        logging.error(f"Error during transaction signing: {sign_error}", exc_info=True)
+        return None
+
+    # Submit the transaction
+    try:
+        tx_hash = await submit_transaction(signed_tx_cbor)
+        if tx_hash:
+            logging.info(f"Trade executed successfully. Transaction hash: {tx_hash}")
+            return tx_hash
+        logging.error("Transaction submission failed")
+        return None
             
-    return "timeout"
+    except Exception as submit_error:
+        logging.error(f"Error during transaction submission: {submit_error}", exc_info=True)
+        return None
 
-def create_swap_transaction(amount_in, buyer_address, token_in="", token_out=TOKEN_ID):
-    """Create the swap transaction using DEX Hunter API."""
-    url = f"{DEXHUNTER_API_BASE_URL}/swap/build"
+async def get_tx_confirmation(tx_hash):
+    """Check once whether a transaction is in a block ('confirmed', 'pending' or 'error')."""
+    try:
+        response = await blockfrost.get(f"/txs/{tx_hash}", priority=PRIORITY_BACKGROUND)
+        if response.status_code == 200:
+            if response.json().get("block_height"):
+                return "confirmed"
+            return "pending"
+        if response.status_code == 404:  # 404 is expected for pending transactions
+            return "pending"
+        logging.error(f"Error checking transaction status: {response.text}")
+        return "error"
+    except Exception as e:
+        logging.error(f"Error monitoring transaction: {e}", exc_info=True)
+        return "error"
 
+async def create_swap_transaction(amount_in, buyer_address, token_in="", token_out=TOKEN_ID):
+    """Create the swap transaction using DEX Hunter API."""
     payload = {
         "buyer_address": buyer_address,
         "token_in": token_in,
         "token_out": token_out,
-        "slippage": 2,
+        "slippage": DEX_SLIPPAGE,
         "amount_in": amount_in
     }
 
     logging.debug(f"Request payload: {payload}")
 
     try:
-        headers = {
-            "Content-Type": "application/json",
-            "accept": "application/json",
-        }
-        response = requests.post(url, json=payload, headers=headers)
+        response = await dexhunter.post("/swap/build", json=payload, priority=PRIORITY_CRITICAL)
 
         logging.debug(f"Response status code: {response.status_code}")
         logging.debug(f"Response content: {response.text}")
@@ -1090,7 +1575,7 @@ def create_swap_transaction(amount_in, buyer_address, token_in="", token_out=TOK
             return None
         return tx_cbor
 
-    except requests.exceptions.HTTPError as http_err:
+    except HTTPError as http_err:
         logging.error(f"HTTP error in create_swap_transaction: {http_err}")
         logging.error(f"Status code: {response.status_code}")
         logging.error(f"Response content: {response.text}")
@@ -1101,7 +1586,7 @@ def create_swap_transaction(amount_in, buyer_address, token_in="", token_out=TOK
         logging.error(f"Exception in create_swap_transaction: {e}", exc_info=True)
     return None
 
-def sign_with_dexhunter(tx_cbor):
+async def sign_with_dexhunter(tx_cbor):
     """
     Sign a transaction using DexHunter's signing system.
     
@@ -1126,10 +1611,11 @@ def sign_with_dexhunter(tx_cbor):
         logging.info(f"Initial CBOR size: {len(tx_cbor)} chars")
         
         # Get both payment and stake keys
-        payment_signing_key = PaymentSigningKey.from_json(SIGNING_KEY_JSON)
-        payment_verification_key = payment_signing_key.to_verification_key()
-        stake_signing_key = StakeSigningKey.from_json(STAKE_SIGNING_KEY_JSON)
-        stake_verification_key = stake_signing_key.to_verification_key()
+        keys = chain.load_keys()
+        payment_signing_key = keys['payment_signing']
+        payment_verification_key = keys['payment_verification']
+        stake_signing_key = keys['stake_signing']
+        stake_verification_key = keys['stake_verification']
         
         # Verify we have both keys
         if not stake_signing_key or not stake_verification_key:
@@ -1173,14 +1659,8 @@ def sign_with_dexhunter(tx_cbor):
         }
         
         # Send request to DexHunter
-        headers = {
-            "Content-Type": "application/json",
-            "accept": "application/json"
-        }
-        
         logging.info("Sending request to DEX Hunter...")
-        url = f"{DEXHUNTER_API_BASE_URL}/swap/sign"
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = await dexhunter.post("/swap/sign", json=payload, timeout=30, priority=PRIORITY_CRITICAL)
         
         # Log response details
         logging.info(f"DexHunter Response status: {response.status_code}")
@@ -1258,11 +1738,9 @@ def load_cbor_file(filename):
         logging.error(f"Error loading CBOR file: {e}")
         return None
 
-def submit_transaction(signed_tx_cbor: str) -> Optional[str]:
+async def submit_transaction(signed_tx_cbor: str) -> Optional[str]:
     """Submit transaction using Blockfrost."""
-    url = "https://cardano-mainnet.blockfrost.io/api/v0/tx/submit"
     headers = {
-        "project_id": BLOCKFROST_PROJECT_ID,
         "Content-Type": "application/cbor"
     }
     
@@ -1288,15 +1766,21 @@ def submit_transaction(signed_tx_cbor: str) -> Optional[str]:
         
         # Submit transaction
         raw_tx_bytes = bytes.fromhex(signed_tx_cbor)
-        response = requests.post(
-            url,
+        response = await blockfrost.post(
+            "/tx/submit",
             headers=headers,
+            priority=PRIORITY_CRITICAL,
             data=raw_tx_bytes  # Send raw bytes directly
         )
         
         if response.status_code == 200:
             tx_hash = response.text.strip('"')
             logging.info(f"Transaction submitted. Hash: {tx_hash}")
+            try:
+                # Mark inputs spent so the next tx can be built at once
+                await run_blocking(chain.record_submitted, tx)
+            except Exception as e:
+                logging.error(f"Error updating local UTxO set: {e}")
             return tx_hash
             
         else:
@@ -1321,145 +1805,106 @@ def submit_transaction(signed_tx_cbor: str) -> Optional[str]:
         raise
     
 
-def transfer_shards_to_gleec(quantity):
-    """Transfer tokens to Gleec exchange."""
-    try:
-        gleec_shards_address = get_deposit_address('SHARDS')
-        if gleec_shards_address:
-            transaction_success = send_shards_to_address(gleec_shards_address, quantity)
-            if transaction_success:
-                deposit_confirmed = monitor_gleec_deposit('SHARDS', quantity)
-                return deposit_confirmed
-            else:
-                logging.error("Failed to send SHARDS to Gleec deposit address.")
-                return False
-        else:
-            logging.error("Failed to obtain Gleec SHARDS deposit address.")
-            return False
-    except Exception as e:
-        logging.error(f"Exception in transfer_shards_to_gleec: {e}", exc_info=True)
-        return False
-
-def withdraw_shards_to_cardano(quantity):
-    """Withdraw SHARDS tokens from Gleec exchange to Cardano wallet."""
-    try:
-        cardano_address = CARDANO_ADDRESS
-        transaction_id = withdraw_crypto('SHARDS', quantity, cardano_address)
-        if transaction_id:
-            # Add a small delay before first status check
-            time.sleep(2)
-            withdrawal_confirmed = monitor_cardano_withdrawal(transaction_id)
-            return withdrawal_confirmed
-        else:
-            logging.error("Failed to initiate SHARDS withdrawal from Gleec.")
-            return False
-    except Exception as e:
-        logging.error(f"Exception in withdraw_shards_to_cardano: {e}", exc_info=True)
-        return False
+def build_and_submit_shards_transfer(outputs, consolidate_utxos=CONSOLIDATE_UTXO_COUNT, max_consolidated=20):
+    """
+    Build, sign and submit one transaction sending SHARDS to several recipients
+    (blocking pycardano/Blockfrost calls).
 
-def send_shards_to_address(recipient_address, shards_quantity):
-    """Send tokens to a specified Cardano address."""
-    try:
-        network = Network.MAINNET
-        context = BlockFrostChainContext(BLOCKFROST_PROJECT_ID, network)
+    Args:
+        outputs (list): [(recipient_address, shards_quantity), ...]
+        consolidate_utxos (int): When the address holds more UTxOs than this, its
+            smallest UTxOs are also spent so they merge into the change output
+        max_consolidated (int): Maximum UTxOs added for consolidation
 
-        # Load signing keys
-        signing_key = PaymentSigningKey.from_json(SIGNING_KEY_JSON)
-        verification_key = PaymentVerificationKey.from_json(VERIFICATION_KEY_JSON)
-        key_pair = PaymentKeyPair(signing_key, verification_key)
+    Returns:
+        str: Transaction ID
+    """
+    context = chain.context
+    signing_key = chain.load_keys()['payment_signing']
 
-        # Define TOKEN
-        asset_name = AssetName(bytes.fromhex(TOKEN_ASSET_NAME))
+    builder = TransactionBuilder(context)
+    asset_name = AssetName(bytes.fromhex(TOKEN_ASSET_NAME))
+    min_ada = 1_500_000  # Adjust as needed
+    for recipient_address, shards_quantity in outputs:
         multi_asset = MultiAsset()
         multi_asset[TOKEN_POLICY_ID][asset_name] = int(shards_quantity)
+        builder.add_output(TransactionOutput(Address.from_primitive(recipient_address), Value(min_ada, multi_asset)))
+
+    my_address = Address.from_primitive(CARDANO_ADDRESS)
+    utxos = context.utxos(my_address)
+    if len(utxos) > consolidate_utxos:
+        for utxo in sorted(utxos, key=lambda u: u.output.amount.coin)[:max_consolidated]:
+            builder.add_input(utxo)
+    builder.add_input_address(my_address)
+    tx = builder.build_and_sign([signing_key], change_address=my_address)
+
+    # Submit transaction (pycardano's submit_tx returns None, the ID comes from the tx itself)
+    context.submit_tx(tx.to_cbor())
+    chain.record_submitted(tx)
+    return str(tx.id)
+
+async def submit_shards_batch(outputs):
+    """Submit a batch of SHARDS transfers as one transaction (see rebalancer.TransferBatcher)."""
+    return await run_blocking(build_and_submit_shards_transfer, outputs)
+
+transfer_batcher = TransferBatcher(
+    submit_shards_batch,
+    window=TRANSFER_BATCH_WINDOW,
+    max_outputs=TRANSFER_BATCH_MAX_OUTPUTS
+)
 
-        # Create transaction output
-        min_ada = 1_500_000  # Adjust as needed
-        value = Value(min_ada, multi_asset)
-        recipient_addr = Address.from_primitive(recipient_address)
-        tx_out = TransactionOutput(recipient_addr, value)
-
-        # Build transaction
-        builder = TransactionBuilder(context)
-        builder.add_output(tx_out)
-        my_address = Address.from_primitive(CARDANO_ADDRESS)
-        builder.add_input_address(my_address)
-        tx = builder.build_and_sign([signing_key], change_address=my_address)
+async def send_shards_to_address(recipient_address, shards_quantity):
+    """
+    Send tokens to a specified Cardano address, returning the transaction ID or None.
 
-        # Submit transaction
-        tx_id = context.submit_tx(tx.to_cbor())
-        logging.info(f"SHARDS sent to Gleec. Transaction ID: {tx_id}")
-        return True
+    Transfers queued within TRANSFER_BATCH_WINDOW share one transaction.
+    """
+    try:
+        tx_id = await transfer_batcher.send(recipient_address, shards_quantity)
+        logging.info(f"SHARDS sent to {recipient_address}. Transaction ID: {tx_id}")
+        return tx_id
     except Exception as e:
         logging.error(f"Exception in send_shards_to_address: {e}", exc_info=True)
-        return False
+        return None
 
-def get_deposit_address(currency):
+async def get_deposit_address(currency):
     """Get the deposit address for a specified currency on Gleec exchange."""
     try:
-        url = f"https://api.exchange.gleec.com/api/3/wallet/crypto/address?currency={currency}"
-        session = requests.Session()
-        session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-        response = session.get(url)
+        response = await gleec_private.get("/wallet/crypto/address", params={'currency': currency})
         response.raise_for_status()
         data = response.json()
         return data[0]['address']
-    except requests.exceptions.HTTPError as http_err:
+    except HTTPError as http_err:
         logging.error(f"HTTP error in get_deposit_address: {http_err}")
         logging.error(response.json())
     except Exception as e:
         logging.error(f"Exception in get_deposit_address: {e}")
     return None
 
-def monitor_gleec_deposit(currency, expected_amount, timeout=3600):
-    """Monitor the deposit of tokens on Gleec exchange."""
-    try:
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            balance = get_wallet_balance(currency)
-            if balance:
-                available = float(balance['available'])
-                if available >= expected_amount:
-                    logging.info(f"Deposit of {expected_amount} {currency} confirmed on Gleec.")
-                    return True
-            time.sleep(60)
-        logging.error(f"Deposit of {expected_amount} {currency} not confirmed within timeout.")
-        return False
-    except Exception as e:
-        logging.error(f"Exception in monitor_gleec_deposit: {e}", exc_info=True)
-        return False
-
-def get_wallet_balance(currency):
+async def get_wallet_balance(currency):
     """Get the wallet balance for a specified currency on Gleec exchange."""
     try:
-        url = f"https://api.exchange.gleec.com/api/3/wallet/balance/{currency}"
-        session = requests.Session()
-        session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-        response = session.get(url)
+        response = await gleec_private.get(f"/wallet/balance/{currency}")
         response.raise_for_status()
         data = response.json()
         return data
-    except requests.exceptions.HTTPError as http_err:
+    except HTTPError as http_err:
         logging.error(f"HTTP error in get_wallet_balance: {http_err}")
         logging.error(response.json())
     except Exception as e:
         logging.error(f"Exception in get_wallet_balance: {e}")
     return None
 
-def withdraw_crypto(currency, amount, address, auto_commit=True):
+async def withdraw_crypto(currency, amount, address, auto_commit=True):
     """Withdraw cryptocurrency from Gleec exchange to an external address."""
-    url = "https://api.exchange.gleec.com/api/3/wallet/crypto/withdraw"
     data = {
         'currency': currency,
         'amount': str(amount),
         'address': address,
         'auto_commit': str(auto_commit).lower()  # Convert bool to "true"/"false"
     }
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
     try:
-        response = session.post(url, data=data)
+        response = await gleec_private.post("/wallet/crypto/withdraw", data=data, priority=PRIORITY_CRITICAL)
         response.raise_for_status()
         result = response.json()
         
@@ -1470,7 +1915,7 @@ def withdraw_crypto(currency, amount, address, auto_commit=True):
             logging.error(f"Unexpected response format: {result}")
             return None
             
-    except requests.exceptions.HTTPError as e:
+    except HTTPError as e:
         error_data = e.response.json().get('error', {})
         error_code = error_data.get('code')
         error_msg = error_data.get('message')
@@ -1491,14 +1936,10 @@ def withdraw_crypto(currency, amount, address, auto_commit=True):
         logging.error(f"Exception in withdraw_crypto: {e}", exc_info=True)
         return None
 
-def get_transaction_status(transaction_id):
+async def get_transaction_status(transaction_id):
     """Get detailed transaction status from Gleec."""
-    url = f"https://api.exchange.gleec.com/api/3/wallet/transactions/{transaction_id}"
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
     try:
-        response = session.get(url)
+        response = await gleec_private.get(f"/wallet/transactions/{transaction_id}", priority=PRIORITY_BACKGROUND)
         response.raise_for_status()
         transaction = response.json()
         
@@ -1516,7 +1957,7 @@ def get_transaction_status(transaction_id):
                     
         return status, transaction.get('native', {})
         
-    except requests.exceptions.HTTPError as e:
+    except HTTPError as e:
         logging.error(f"Error getting transaction status: {e}")
         if e.response.status_code == 404:
             return 'NOT_FOUND', {}
@@ -1525,17 +1966,43 @@ def get_transaction_status(transaction_id):
         logging.error(f"Exception in get_transaction_status: {e}")
         return 'ERROR', {}
 
-def deposit_to_cex(currency, amount):
+async def get_deposit_status(currency, tx_hash, limit=100):
+    """
+    Get the status of the Gleec deposit made by an on-chain transaction.
+
+    Deposits are matched by blockchain hash, so a cycle only ever sees its own
+    transfer credited, never SHARDS already on Gleec or another cycle's deposit.
+
+    Returns:
+        str: Gleec status of the deposit ('SUCCESS', 'PENDING', 'FAILED', ...),
+             'NOT_FOUND' if Gleec has not registered it yet, or 'ERROR'
+    """
+    try:
+        response = await gleec_private.get(
+            "/wallet/transactions",
+            params={'currencies': currency, 'types': 'DEPOSIT', 'limit': limit},
+            priority=PRIORITY_BACKGROUND
+        )
+        response.raise_for_status()
+        for transaction in response.json():
+            if str(transaction.get('native', {}).get('hash', '')).lower() == str(tx_hash).lower():
+                return transaction.get('status')
+        return 'NOT_FOUND'
+    except Exception as e:
+        logging.error(f"Exception in get_deposit_status: {e}")
+        return 'ERROR'
+
+async def deposit_to_cex(currency, amount):
     """Initiate a deposit of cryptocurrency to the Gleec exchange."""
     try:
         # Get deposit address from Gleec
-        deposit_address = get_deposit_address(currency)
+        deposit_address = await get_deposit_address(currency)
         if not deposit_address:
             logging.error("Failed to get deposit address from Gleec")
             return None
 
         # Send tokens to the deposit address
-        tx_success = send_shards_to_address(deposit_address, amount)
+        tx_success = await send_shards_to_address(deposit_address, amount)
         if not tx_success:
             logging.error("Failed to send tokens to deposit address")
             return None
@@ -1548,61 +2015,10 @@ def deposit_to_cex(currency, amount):
         logging.error(f"Exception in deposit_to_cex: {e}", exc_info=True)
         return None
 
-def monitor_cardano_withdrawal(transaction_id, timeout=3600, required_confirmations=2):
-    """Monitor the withdrawal of tokens with enhanced status checking."""
-    try:
-        start_time = time.time()
-        last_status = None
-        check_count = 0
-        
-        while time.time() - start_time < timeout:
-            check_count += 1
-            status, details = get_transaction_status(transaction_id)
-            
-            if status != last_status:
-                logging.info(f"Withdrawal {transaction_id} status changed to: {status}")
-                last_status = status
-            
-            if status == 'SUCCESS':
-                confirmations = details.get('confirmations', 0)
-                if confirmations >= required_confirmations:
-                    logging.info(f"Withdrawal {transaction_id} confirmed with {confirmations} confirmations")
-                    return True
-                else:
-                    logging.info(f"Waiting for confirmations: {confirmations}/{required_confirmations}")
-                    
-            elif status == 'FAILED':
-                logging.error(f"Withdrawal {transaction_id} failed")
-                return False
-                
-            elif status == 'ROLLED_BACK':
-                logging.error(f"Withdrawal {transaction_id} was rolled back")
-                return False
-                
-            elif status == 'NOT_FOUND':
-                if check_count > 3:  # Give it a few tries before giving up
-                    logging.error(f"Withdrawal {transaction_id} not found after {check_count} attempts")
-                    return False
-                    
-            # Exponential backoff for checking status
-            sleep_time = min(60, 2 ** (check_count // 2))  # Max 60 seconds between checks
-            time.sleep(sleep_time)
-            
-        logging.error(f"Withdrawal {transaction_id} monitoring timed out")
-        return False
-        
-    except Exception as e:
-        logging.error(f"Exception in monitor_cardano_withdrawal: {e}", exc_info=True)
-        return False
-
-def get_wallet_balance(currency):
+async def get_wallet_balance(currency):
     """Get the wallet balance for a specified currency."""
-    url = f"https://api.exchange.gleec.com/api/3/wallet/balance/{currency}"
-    session = requests.Session()
-    session.auth = GleecAuth(GLEEC_API_KEY, GLEEC_SECRET_KEY)
-    
     try:
-        response = session.get(url)
+        response = await gleec_private.get(f"/wallet/balance/{currency}")
         response.raise_for_status()
         balance = response.json()
         
@@ -1615,7 +2031,7 @@ def get_wallet_balance(currency):
             'reserved': reserved,
             'total': available + reserved
         }
-    except requests.exceptions.HTTPError as e:
+    except HTTPError as e:
         logging.error(f"Error getting wallet balance: {e}")
         logging.error(f"Response: {e.response.text}")
         return None
@@ -1623,21 +2039,16 @@ def get_wallet_balance(currency):
         logging.error(f"Exception in get_wallet_balance: {e}")
         return None
 
-def check_transfer_status(tx_id):
+async def check_transfer_status(tx_id):
     """Check the status of a transfer on the Cardano blockchain."""
-    url = f"https://cardano-mainnet.blockfrost.io/api/v0/txs/{tx_id}"
-    headers = {
-        "project_id": BLOCKFROST_PROJECT_ID
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
+        response = await blockfrost.get(f"/txs/{tx_id}", priority=PRIORITY_BACKGROUND)
         if response.status_code == 200:
             tx_data = response.json()
             
             # Check number of confirmations
             if tx_data.get("block_height"):
-                current_block = get_current_block()
+                current_block = await get_current_block()
                 if current_block:
                     confirmations = current_block - tx_data["block_height"]
                     if confirmations >= 2:  # Requiring 2 confirmations
@@ -1660,15 +2071,10 @@ def check_transfer_status(tx_id):
         logging.error(f"Exception in check_transfer_status: {e}")
         return 'error'
 
-def get_current_block():
+async def get_current_block():
     """Get the current block height from Blockfrost."""
-    url = "https://cardano-mainnet.blockfrost.io/api/v0/blocks/latest"
-    headers = {
-        "project_id": BLOCKFROST_PROJECT_ID
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
+        response = await blockfrost.get("/blocks/latest", priority=PRIORITY_BACKGROUND)
         if response.status_code == 200:
             block_data = response.json()
             return block_data.get("height")
@@ -1676,11 +2082,16 @@ def get_current_block():
         logging.error(f"Exception in get_current_block: {e}")
         return None
 
-def get_bot_status():
-    """Get current bot status and pending operations."""
+def get_bot_status(page=0, page_size=5):
+    """
+    Get current bot status and pending operations.
+
+    Args:
+        page (int): Page of completed transactions to show, 0 being the newest
+        page_size (int): Completed transactions per page
+    """
     try:
         # Get current state
-        state = state_manager.state
         pending_ops = state_manager.get_pending_operations()
         
         print("\nBot Status Report:")
@@ -1720,10 +2131,10 @@ def get_bot_status():
             print("No pending operations")
             
         # Show recent completed transactions
-        print("\nRecent Completed Transactions:")
-        completed = state.get('completed_transactions', [])
+        print(f"\nCompleted Transactions (page {page}):")
+        completed = state_manager.get_transaction_history(page, page_size)
         if completed:
-            for tx in completed[-5:]:  # Show last 5
+            for tx in completed:  # Newest first
                 print(f"- {tx['tx_hash']} ({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(tx['timestamp']))})")
         else:
             print("No completed transactions")
@@ -1755,28 +2166,27 @@ async def check_pending_operations():
         if any(pending_ops.values()):
             # Handle pending withdrawals
             for withdrawal_id in list(pending_ops['withdrawals'].keys()):
-                status = check_withdrawal_status(withdrawal_id)
+                status = await check_withdrawal_status(withdrawal_id)
                 if status == 'SUCCESS':
                     # Remove completed withdrawal
-                    if withdrawal_id in state_manager.state['active_withdrawals']:
-                        del state_manager.state['active_withdrawals'][withdrawal_id]
+                    if state_manager.get_entry('active_withdrawals', withdrawal_id):
+                        state_manager.remove('active_withdrawals', withdrawal_id)
                         # Mark transaction as complete with type
                         state_manager.complete_transaction(withdrawal_id, tx_type='withdrawal')
                 elif status in ['FAILED', 'ROLLED_BACK']:
                     # Remove failed withdrawal
-                    if withdrawal_id in state_manager.state['active_withdrawals']:
-                        del state_manager.state['active_withdrawals'][withdrawal_id]
+                    state_manager.remove('active_withdrawals', withdrawal_id)
                 
-            # Handle pending orders
-            for order_id in list(pending_ops['orders'].keys()):
-                status = check_order_status(order_id)
-                if status in ['filled', 'canceled', 'expired']:
+            # Handle pending orders, resolved together from one snapshot per symbol
+            statuses = await order_gateway.reconcile(pending_ops['orders'])
+            for order_id, status in statuses.items():
+                entry = pending_ops['orders'][order_id]
+                if status in ['filled', 'canceled', 'cancelled', 'expired']:
                     # Remove completed/failed order
-                    if order_id in state_manager.state['active_orders']:
-                        del state_manager.state['active_orders'][order_id]
-            
-            # Save state after cleanup
-            state_manager.save_state()
+                    state_manager.remove('active_orders', order_id)
+                elif status == 'not_found' and entry['status'] == SUBMITTING and time.time() - entry['timestamp'] > 60:
+                    # Registered client ID that never reached the exchange
+                    state_manager.update_order(order_id, 'failed', dict(entry['details'], error='never placed'))
             
             # Check if we still have pending operations after cleanup
             remaining_ops = state_manager.get_pending_operations()
@@ -1795,57 +2205,97 @@ async def check_pending_operations():
         logging.error(f"Error in check_pending_operations: {e}")
         return False
 
-async def check_pending_cycle():
-    """Check for any incomplete trading cycles on startup."""
-    try:
-        # Check completed transactions to see if we have pending DEX sells
-        completed_withdrawals = [tx for tx in state_manager.state.get('completed_transactions', [])
-                               if 'withdrawal' in tx.get('type', '')]
-        
-        if completed_withdrawals:
-            latest_withdrawal = completed_withdrawals[-1]  # Get most recent withdrawal
-            if not latest_withdrawal.get('dex_sell_completed'):
-                logging.info("Found incomplete cycle - executing DEX sell before starting new trades")
-                # Execute DEX sell for the withdrawal amount
-                dex_success = execute_trade_on_dex(TRADE_QUANTITY, sell=True)
-                if dex_success:
-                    # Update the transaction to mark DEX sell as completed
-                    latest_withdrawal['dex_sell_completed'] = True
-                    state_manager.save_state()
-                    logging.info("Completed pending DEX sell from previous cycle")
-                else:
-                    logging.error("Failed to complete pending DEX sell")
-                return True  # Return True to indicate we handled an incomplete cycle
-            
-        return False  # Return False to indicate no incomplete cycles
-        
-    except Exception as e:
-        logging.error(f"Error in check_pending_cycle: {e}")
-        return False
-
 def clear_stale_operations(force=False):
     """Clear stale or force clear all pending operations."""
     now = time.time()
-    state = state_manager.state
     cleared = False
 
     for section in ['active_orders', 'pending_transfers', 'active_withdrawals']:
-        for id in list(state.get(section, {}).keys()):
-            if force or now - state[section][id].get('timestamp', 0) > 3600:
+        for id, entry in state_manager.get_entries(section).items():
+            stale = now - entry.get('timestamp', 0) > 3600
+            if entry.get('status') == SUBMITTING and not stale:
+                continue  # Kept so a resumed cycle finds the order instead of placing it again
+            if force or stale:
                 logging.warning(f"Clearing {section} entry: {id}")
-                del state[section][id]
+                state_manager.remove(section, id)
                 cleared = True
 
     if cleared:
-        state_manager.save_state()
+        state_manager.flush()
         logging.info("Cleared operations")
 
 def signal_handler(signum, _):
     """Handle shutdown signals."""
     logging.info(f"Received shutdown signal {signum}. Cleaning up...")
     clear_stale_operations(force=True)
+    state_manager.close()
     sys.exit(0)
 
+async def price_monitor_loop():
+    """
+    Check for arbitrage opportunities whenever a CEX price changes.
+
+    Streamed price updates trigger a (debounced) re-evaluation; between updates,
+    and whenever the stream is unavailable, the spread is polled adaptively.
+    """
+    scheduler = OpportunityScheduler(
+        check_arbitrage_opportunity,
+        ARBITRAGE_THRESHOLD,
+        debounce=EVALUATION_DEBOUNCE,
+        min_interval=MIN_EVALUATION_INTERVAL,
+        poll_min=PRICE_CHECK_MIN_INTERVAL,
+        poll_max=PRICE_CHECK_INTERVAL
+    )
+    if MARKET_DATA_ENABLED:
+        market_data.add_listener(scheduler.notify)
+        market_data.add_listener(repricer.notify)
+    await scheduler.run()
+
+async def pending_operations_loop():
+    """Poll pending orders, transfers and withdrawals in the background."""
+    while True:
+        await asyncio.sleep(PENDING_CHECK_INTERVAL)
+        try:
+            state_manager.flush()  # fsync journal records still waiting for a batch
+            if any(state_manager.get_pending_operations().values()):
+                await check_pending_operations()
+        except Exception as e:
+            logging.error(f"Error in pending operations loop: {e}", exc_info=True)
+
+async def get_unreserved_shards():
+    """Return (Gleec SHARDS, Cardano SHARDS) not reserved by active cycles, or None."""
+    active = cycle_driver.active_cycles()
+    gleec_balance, cardano_shards = await asyncio.gather(
+        get_wallet_balance('SHARDS'), get_cardano_shards_balance()
+    )
+    if not gleec_balance or cardano_shards is None:
+        return None
+    return (
+        gleec_balance['available'] - reserved(active, GLEEC_SHARDS),
+        cardano_shards - reserved(active, CARDANO_SHARDS)
+    )
+
+def rebalance_in_progress():
+    return any(cycle_flow(entry['details']).startswith('rebalance_')
+               for entry in cycle_driver.active_cycles().values())
+
+def start_rebalance(target, quantity):
+    cycle_driver.create('rebalance', flow=f"rebalance_{target}", quantity=quantity)
+
+rebalancer = Rebalancer(
+    get_unreserved_shards,
+    start_rebalance,
+    rebalance_in_progress,
+    target_share=INVENTORY_TARGET_GLEEC_SHARE,
+    band=INVENTORY_REBALANCE_BAND,
+    min_amount=INVENTORY_MIN_REBALANCE,
+    interval=REBALANCE_CHECK_INTERVAL
+)
+
+async def close_clients():
+    """Close the pooled HTTP clients."""
+    for client in (gleec_public, gleec_private, dexhunter, blockfrost):
+        await client.close()
 
 async def main():
     """Main function to run the arbitrage bot."""
@@ -1859,30 +2309,37 @@ async def main():
             logging.error("Failed environment verification")
             return
             
+        # Create the chain context off the event loop, so the first transaction
+        # does not stall the market-data and order streams on Blockfrost
+        try:
+            await run_blocking(chain.warm_up)
+        except Exception as e:
+            logging.error(f"Error preparing the chain context: {e}")
+
         # Check pending operations from previous session
         await check_pending_operations()
-        
-        # Check Cardano balance for pending DEX sells
-        has_balance = await check_cardano_balance()
-        if has_balance:
-            logging.info("Found SHARDS on Cardano - executing DEX sell before starting new trades")
-            dex_success = execute_trade_on_dex(TRADE_QUANTITY, sell=True)
-            if dex_success:
-                logging.info("Successfully sold SHARDS from previous cycle")
-            else:
-                logging.error("Failed to sell SHARDS from previous cycle")
     
-        while True:
-            try:
-                await check_arbitrage_opportunity()
-                await asyncio.sleep(60)
-            except Exception as e:
-                logging.error(f"Error in main loop: {e}", exc_info=True)
-                await asyncio.sleep(60)
+        # Price monitoring, pending-operation polling and the trade-cycle driver
+        # run as separate tasks; the driver resumes interrupted cycles at their
+        # checkpointed stage
+        tasks = [price_monitor_loop(), pending_operations_loop(), cycle_driver.run()]
+        if MARKET_DATA_ENABLED:
+            tasks.append(market_data.run())
+        if ORDER_STREAM_ENABLED:
+            order_stream.add_listener(wake_on_order_report)
+            tasks.append(order_stream.run())
+        if REPRICE_ENABLED:
+            tasks.append(repricer.run())
+        if TRADING_MODE == 'inventory':
+            tasks.append(rebalancer.run())
+        await asyncio.gather(*tasks)
                 
     except Exception as e:
         logging.error(f"Fatal error in main: {e}", exc_info=True)
         raise
+    finally:
+        await close_clients()
+        state_manager.flush()
 
 if __name__ == "__main__":
     # Create required directories
@@ -1902,6 +2359,7 @@ if __name__ == "__main__":
             def signal_handler(signum, frame):
                 logging.info("Received shutdown signal. Cleaning up...")
                 clear_stale_operations(force=True)
+                state_manager.close()
                 sys.exit(0)
             
             signal.signal(signal.SIGINT, signal_handler)
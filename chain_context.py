@@ -0,0 +1,192 @@
+"""
+Key and chain-context manager for the Cardano DEX-CEX Arbitrage Bot
+
+Wallet keys are parsed from their JSON environment variables once, and one
+Blockfrost chain context is shared by every transaction the bot builds, with
+protocol and genesis parameters reused for a TTL instead of being fetched for
+each transaction.
+
+The context serves the bot's own address from a local UTxO set (see
+utxo_cache.py), so transaction building does not fetch the address UTxOs
+from Blockfrost each time and sees the effects of transactions submitted
+moments before.
+
+Both are created lazily on first use, so importing the bot makes no
+Blockfrost calls. Creating the context and fetching its parameters are
+blocking Blockfrost round trips: the bot calls warm_up() in an executor
+thread at startup, and every later call runs in executor threads as well
+(see run_blocking), so creation and the parameter cache are guarded by a
+lock.
+"""
+
+import time
+import logging
+import threading
+
+from pycardano import BlockFrostChainContext, PaymentSigningKey, StakeSigningKey
+
+from utxo_cache import UtxoSet
+
+
+class CachedBlockFrostContext(BlockFrostChainContext):
+    """
+    BlockFrostChainContext that reuses protocol and genesis parameters and
+    serves one address from a local UTxO set.
+
+    Args:
+        project_id (str): Blockfrost project ID
+        network (Network): Cardano network
+        params_ttl (float): Seconds parameters are reused before being fetched again
+        address (str): Address whose UTxOs are kept locally, or None
+        utxo_refresh (float): Seconds between on-chain refreshes of the local UTxO set
+        utxo_pending_ttl (float): Seconds a submitted transaction may stay unconfirmed
+    """
+
+    def __init__(self, project_id, network, params_ttl=600, address=None, utxo_refresh=20, utxo_pending_ttl=600):
+        super().__init__(project_id, network)
+        self.params_ttl = params_ttl
+        self._params = {}
+        self._params_lock = threading.Lock()
+        self.utxo_set = None
+        if address:
+            self.utxo_set = UtxoSet(
+                address,
+                lambda: super(CachedBlockFrostContext, self).utxos(address),
+                refresh_interval=utxo_refresh,
+                pending_ttl=utxo_pending_ttl
+            )
+
+    def utxos(self, address):
+        if self.utxo_set is not None and str(address) == self.utxo_set.address:
+            return self.utxo_set.utxos()
+        return super().utxos(address)
+
+    def _cached_param(self, name, fetch):
+        with self._params_lock:
+            value, fetched = self._params.get(name, (None, 0))
+            if value is None or time.time() - fetched > self.params_ttl:
+                value = fetch()
+                self._params[name] = (value, time.time())
+            return value
+
+    @property
+    def protocol_param(self):
+        return self._cached_param('protocol', lambda: super(CachedBlockFrostContext, self).protocol_param)
+
+    @property
+    def genesis_param(self):
+        return self._cached_param('genesis', lambda: super(CachedBlockFrostContext, self).genesis_param)
+
+
+class ChainManager:
+    """
+    Shared wallet keys and chain context.
+
+    Args:
+        project_id (str): Blockfrost project ID
+        network (Network): Cardano network
+        signing_key_json (str): Payment signing key (cardano-cli JSON)
+        stake_signing_key_json (str): Stake signing key (cardano-cli JSON)
+        params_ttl (float): Seconds protocol parameters are reused
+        address (str): The bot's address, whose UTxOs are kept locally
+        utxo_refresh (float): Seconds between on-chain refreshes of the local UTxO set
+        utxo_pending_ttl (float): Seconds a submitted transaction may stay unconfirmed
+    """
+
+    def __init__(self, project_id, network, signing_key_json, stake_signing_key_json, params_ttl=600,
+                 address=None, utxo_refresh=20, utxo_pending_ttl=600):
+        self.project_id = project_id
+        self.network = network
+        self.signing_key_json = signing_key_json
+        self.stake_signing_key_json = stake_signing_key_json
+        self.params_ttl = params_ttl
+        self.address = address
+        self.utxo_refresh = utxo_refresh
+        self.utxo_pending_ttl = utxo_pending_ttl
+        self._keys = None
+        self._context = None
+        self._lock = threading.Lock()
+
+    def load_keys(self):
+        """
+        Parse the wallet keys (only the first call does any work).
+
+        Returns:
+            dict: 'payment_signing', 'payment_verification', 'stake_signing' and
+                  'stake_verification' keys
+        """
+        with self._lock:
+            if self._keys is None:
+                payment_signing_key = PaymentSigningKey.from_json(self.signing_key_json)
+                stake_signing_key = StakeSigningKey.from_json(self.stake_signing_key_json)
+                self._keys = {
+                    'payment_signing': payment_signing_key,
+                    'payment_verification': payment_signing_key.to_verification_key(),
+                    'stake_signing': stake_signing_key,
+                    'stake_verification': stake_signing_key.to_verification_key()
+                }
+            return self._keys
+
+    @property
+    def context(self):
+        """The shared chain context, created on first use."""
+        with self._lock:
+            if self._context is None:
+                self._context = CachedBlockFrostContext(
+                    self.project_id, self.network, params_ttl=self.params_ttl,
+                    address=self.address, utxo_refresh=self.utxo_refresh,
+                    utxo_pending_ttl=self.utxo_pending_ttl
+                )
+                logging.info("Created Blockfrost chain context")
+            return self._context
+
+    def warm_up(self):
+        """Create the context and fetch parameters and UTxOs ahead of the first transaction."""
+        context = self.context
+        context.protocol_param
+        context.genesis_param
+        if context.utxo_set is not None:
+            context.utxo_set.refresh()
+
+    def address_amounts(self):
+        """
+        {unit: quantity} spendable by the bot's address ('lovelace' for ADA).
+
+        Read from the local UTxO set, so funds spent by submitted transactions
+        are gone at once instead of when the transaction is confirmed.
+        """
+        context = self.context
+        if context.utxo_set is not None:
+            return context.utxo_set.amounts()
+        raise ValueError("No address configured for the local UTxO set")
+
+    def record_submitted(self, tx):
+        """Apply a submitted transaction to the local UTxO set."""
+        utxo_set = self.context.utxo_set
+        if utxo_set is not None:
+            utxo_set.apply_submitted(tx)
+
+    def free_inputs(self):
+        """
+        ({unit: quantity} of the on-chain UTxOs no unconfirmed transaction spends,
+        number of on-chain UTxOs one does spend) (see UtxoSet.free_inputs).
+        """
+        context = self.context
+        if context.utxo_set is not None:
+            return context.utxo_set.free_inputs()
+        raise ValueError("No address configured for the local UTxO set")
+
+    def conflicting_transactions(self, tx):
+        """IDs of unconfirmed transactions already spending inputs of an externally built transaction."""
+        utxo_set = self.context.utxo_set
+        return utxo_set.conflicts(tx) if utxo_set is not None else []
+
+    def pending_token_amount(self, tx_id, unit):
+        """Quantity of a token an unconfirmed transaction paid to the bot's address (0 if unknown)."""
+        utxo_set = self.context.utxo_set
+        return utxo_set.pending_token_amount(tx_id, unit) if utxo_set is not None else 0
+
+    def drop_submitted(self, tx_id):
+        """Roll back an unconfirmed transaction and the transactions chained on it."""
+        utxo_set = self.context.utxo_set
+        return utxo_set.drop(tx_id) if utxo_set is not None else []
@@ -0,0 +1,214 @@
+"""
+HTTP client layer for the Cardano DEX-CEX Arbitrage Bot
+
+Provides one long-lived asyncio client per venue (Gleec, DexHunter, Blockfrost)
+so that every API call reuses a pooled keep-alive connection instead of paying
+a new TCP and TLS handshake, and never blocks the event loop while waiting.
+
+Concurrent identical GET requests are coalesced (single-flight): the first
+caller sends the request and every other caller awaits the same result.
+Requests are throttled by the venue's token bucket (see rate_limiter.py) and
+retried after the advertised delay when the venue still answers 429.
+
+Configuration:
+    Pool size and timeout are set per venue when the client is created,
+    see the *_POOL_SIZE and *_TIMEOUT variables in .env.example
+"""
+
+import json
+import asyncio
+import logging
+import aiohttp
+from urllib.parse import urlencode
+from yarl import URL
+from rate_limiter import PRIORITY_NORMAL
+
+
+class HTTPError(Exception):
+    """Raised by HttpResponse.raise_for_status for 4xx/5xx responses."""
+
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class HttpResponse:
+    """
+    Fully read HTTP response.
+
+    The body is read before the connection is released back to the pool, so
+    callers can use the response after the request has finished.
+    """
+
+    def __init__(self, method, url, status_code, headers, content):
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise HTTPError(f"{self.status_code} Error for {self.method} {self.url}", response=self)
+
+
+class VenueClient:
+    """
+    Pooled asyncio HTTP client for a single API venue.
+
+    Args:
+        name (str): Venue name used in log messages
+        base_url (str): Prefix for relative request paths
+        pool_size (int): Maximum number of keep-alive connections kept open
+        timeout (float): Default request timeout in seconds
+        headers (dict): Headers sent with every request
+        auth (callable): Optional signer called as auth(method, url, body),
+            returning extra headers for the request
+        coalesce_gets (bool): Share one in-flight request between identical GETs
+        limiter (TokenBucket): Optional rate limiter shared by all requests
+        max_rate_limit_retries (int): Retries after a 429 response
+
+    Known Issues:
+        - Connections dropped by the server are only noticed on next use
+        - The underlying session is bound to the event loop that first used it
+    """
+
+    def __init__(self, name, base_url, pool_size=10, timeout=10, headers=None, auth=None,
+                 coalesce_gets=True, limiter=None, max_rate_limit_retries=2):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.auth = auth
+        self.coalesce_gets = coalesce_gets
+        self.coalesced = 0
+        self.limiter = limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self._session = None
+        self._inflight = {}
+
+    def url(self, path):
+        """Resolve a path relative to the venue base URL."""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+        return self._session
+
+    async def request(self, method, path, params=None, json=None, data=None, headers=None, timeout=None,
+                      priority=PRIORITY_NORMAL):
+        """
+        Send a request through the pooled session with the venue timeout.
+
+        Query string and body are encoded here rather than by aiohttp so that
+        the signer sees exactly the bytes that go on the wire. The request waits
+        for a rate-limit token in the given priority lane before it is sent.
+        """
+        url = self.url(path)
+        if params:
+            url = f"{url}?{urlencode(params)}"
+
+        request_headers = dict(headers or {})
+        body = None
+        if json is not None:
+            body = _json_dumps(json)
+            request_headers.setdefault('Content-Type', 'application/json')
+        elif isinstance(data, dict):
+            body = urlencode(data)
+            request_headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+        elif data is not None:
+            body = data
+
+        for attempt in range(self.max_rate_limit_retries + 1):
+            if self.limiter:
+                await self.limiter.acquire(priority)
+            if self.auth:
+                request_headers.update(self.auth(method, url, body))
+
+            response = await self._send(method, url, body, request_headers, timeout)
+            if response.status_code != 429 or attempt == self.max_rate_limit_retries:
+                return response
+
+            retry_after = _retry_after(response)
+            if self.limiter:
+                self.limiter.pause(retry_after)
+            else:
+                await asyncio.sleep(retry_after)
+        return response
+
+    async def _send(self, method, url, body, headers, timeout):
+        session = self._get_session()
+        try:
+            async with session.request(
+                method,
+                URL(url, encoded=True),
+                data=body,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout or self.timeout)
+            ) as response:
+                content = await response.read()
+                return HttpResponse(method, url, response.status, response.headers, content)
+        except asyncio.TimeoutError:
+            logging.error(f"{self.name} request timed out: {method} {url}")
+            raise
+
+    async def get(self, path, **kwargs):
+        """GET a resource, joining an identical request that is already in flight."""
+        if not self.coalesce_gets:
+            return await self.request('GET', path, **kwargs)
+
+        key = _flight_key(self.url(path), kwargs)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.request('GET', path, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so a cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request('DELETE', path, **kwargs)
+
+    async def patch(self, path, **kwargs):
+        return await self.request('PATCH', path, **kwargs)
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+def _json_dumps(payload):
+    return json.dumps(payload)
+
+
+def _retry_after(response, default=1.0):
+    """Seconds to wait from a 429 response's Retry-After header."""
+    try:
+        return float(response.headers.get('Retry-After', default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _flight_key(url, kwargs):
+    """Identity of a GET request for single-flight coalescing."""
+    params = kwargs.get('params') or {}
+    headers = kwargs.get('headers') or {}
+    return (url, tuple(sorted(params.items())), tuple(sorted(headers.items())))
@@ -0,0 +1,119 @@
+"""
+Inventory reservation for concurrent trade cycles
+
+Several trade cycles can be in flight at once, so a venue balance may hold
+funds that an earlier cycle is about to use. Each cycle reserves the funds it
+will spend next, for the stages in which those funds still show up as
+`available` on their venue. New cycles are sized, and stage checks are made,
+against the balance minus other cycles' reservations.
+
+Reservations are derived from the persisted cycles themselves, so they are
+exact after a restart and are released automatically when a cycle moves on,
+finishes or fails.
+
+Holdings:
+    buy_cex_sell_dex: NEW        -> Gleec USDT for the buy order
+                      FILLED     -> Gleec SHARDS until withdrawn
+                      WITHDRAWN  -> Cardano SHARDS until the DEX sell is submitted
+    buy_dex_sell_cex: NEW           -> Cardano ADA for the DEX buy
+                      DEX_CONFIRMED -> Cardano SHARDS until sent to Gleec
+                      DEPOSITED     -> Gleec SHARDS until the sell order is placed
+    inventory_*:      NEW -> both legs' funds until they are submitted
+    rebalance_*:      NEW -> the SHARDS to be moved
+
+    Cardano funds are only reserved until they are spent: the Cardano balance
+    is read from the local UTxO set (see utxo_cache.py), which drops a
+    transaction's inputs the moment it is submitted, so *_SUBMITTED stages
+    need no reservation even before the transaction is confirmed.
+
+Rebalancing:
+    In inventory mode SHARDS are kept on both venues. plan_rebalance decides
+    when the split has drifted far enough from the target to move SHARDS.
+    ADA and USDT are not moved: the two trade directions shift them back and
+    forth between the venues on their own.
+"""
+
+from trade_cycle import NEW, FILLED, WITHDRAWN, DEX_CONFIRMED, DEPOSITED, cycle_flow
+
+GLEEC_USDT = 'gleec:USDT'
+GLEEC_SHARDS = 'gleec:SHARDS'
+CARDANO_ADA = 'cardano:ADA'
+CARDANO_SHARDS = 'cardano:SHARDS'
+
+# {flow: {stage: [(asset, cycle field holding the amount), ...]}}
+HOLDINGS = {
+    'buy_cex_sell_dex': {
+        NEW: [(GLEEC_USDT, 'notional')],
+        FILLED: [(GLEEC_SHARDS, 'quantity')],
+        WITHDRAWN: [(CARDANO_SHARDS, 'quantity')]
+    },
+    'buy_dex_sell_cex': {
+        NEW: [(CARDANO_ADA, 'dex_amount_in')],
+        DEX_CONFIRMED: [(CARDANO_SHARDS, 'quantity')],
+        DEPOSITED: [(GLEEC_SHARDS, 'quantity')]
+    },
+    'inventory_buy_cex_sell_dex': {
+        NEW: [(GLEEC_USDT, 'notional'), (CARDANO_SHARDS, 'quantity')]
+    },
+    'inventory_buy_dex_sell_cex': {
+        NEW: [(CARDANO_ADA, 'dex_amount_in'), (GLEEC_SHARDS, 'quantity')]
+    },
+    'rebalance_to_gleec': {
+        NEW: [(CARDANO_SHARDS, 'quantity')]
+    },
+    'rebalance_to_cardano': {
+        NEW: [(GLEEC_SHARDS, 'quantity')]
+    }
+}
+
+
+def cycle_holdings(entry):
+    """Return [(asset, amount), ...] reserved by a cycle entry in its current stage."""
+    cycle = entry['details']
+    holdings = HOLDINGS.get(cycle_flow(cycle), {}).get(entry['status'], [])
+    return [(asset, float(cycle.get(field) or 0)) for asset, field in holdings]
+
+
+def reserved(cycles, asset, exclude=None):
+    """
+    Total amount of an asset reserved by active cycles.
+
+    Args:
+        cycles (dict): {cycle_id: entry} of active cycles
+        asset (str): One of GLEEC_USDT, GLEEC_SHARDS, CARDANO_ADA, CARDANO_SHARDS
+        exclude (str): Cycle ID whose own reservation is not counted
+    """
+    total = 0.0
+    for cycle_id, entry in cycles.items():
+        if cycle_id == exclude:
+            continue
+        for held_asset, amount in cycle_holdings(entry):
+            if held_asset == asset:
+                total += amount
+    return total
+
+
+def plan_rebalance(gleec_shards, cardano_shards, target_share=0.5, band=0.25, min_amount=0):
+    """
+    Decide whether SHARDS inventory needs to move between the venues.
+
+    Args:
+        gleec_shards (float): Unreserved SHARDS on Gleec
+        cardano_shards (float): Unreserved SHARDS on Cardano
+        target_share (float): Share of the SHARDS to keep on Gleec
+        band (float): Allowed drift of the Gleec share before rebalancing
+        min_amount (float): Smallest transfer worth making
+
+    Returns:
+        tuple: ('to_gleec' or 'to_cardano', whole SHARDS to move), or None
+    """
+    total = gleec_shards + cardano_shards
+    if total <= 0:
+        return None
+    share = gleec_shards / total
+    if abs(share - target_share) <= band:
+        return None
+    amount = int(abs(target_share * total - gleec_shards))
+    if amount <= 0 or amount < min_amount:
+        return None
+    return ('to_gleec' if share < target_share else 'to_cardano'), amount
@@ -0,0 +1,218 @@
+"""
+Streaming CEX market data for the Cardano DEX-CEX Arbitrage Bot
+
+Subscribes to Gleec's public WebSocket for ticker and full order-book updates
+and keeps an in-memory copy of each book, so price checks read data that is
+milliseconds old instead of polling the REST API.
+
+Protocol:
+    Gleec API v3 public WebSocket - channels 'ticker/1s' and 'orderbook/full'.
+    Order-book frames carry a 'snapshot' or an incremental 'update'; a level
+    with quantity 0 is removed. Each frame has a sequence number 's' and a gap
+    forces a reconnect so a fresh snapshot is received.
+
+Known Issues:
+    - Consumers must fall back to REST when the stream is stale or down
+"""
+
+import time
+import asyncio
+import logging
+import aiohttp
+from order_book import OrderBook
+
+
+class LocalOrderBook:
+    """
+    In-memory order book maintained from snapshot and update frames.
+
+    Levels are kept as {price: quantity} dicts so updates are O(1); snapshot()
+    returns a NumPy OrderBook that is rebuilt at most once per update.
+    """
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.asks = {}
+        self.bids = {}
+        self.sequence = None
+        self.timestamp = 0
+        self._snapshot = None
+
+    def apply_snapshot(self, data):
+        """Replace the book with a full snapshot frame."""
+        self.asks = {float(p): float(q) for p, q in data.get('a', [])}
+        self.bids = {float(p): float(q) for p, q in data.get('b', [])}
+        self.sequence = data.get('s')
+        self.timestamp = time.time()
+        self._snapshot = None
+
+    def apply_update(self, data):
+        """
+        Apply an incremental update frame.
+
+        Returns:
+            bool: False if the update is out of sequence and the book must be resynced
+        """
+        sequence = data.get('s')
+        if self.sequence is None:
+            return False
+        if sequence is not None:
+            if sequence <= self.sequence:
+                return True  # Already applied
+            if sequence != self.sequence + 1:
+                logging.warning(f"Order book {self.symbol} sequence gap: {self.sequence} -> {sequence}")
+                self.sequence = None
+                return False
+            self.sequence = sequence
+
+        for side, levels in (('a', self.asks), ('b', self.bids)):
+            for price, quantity in data.get(side, []):
+                price = float(price)
+                quantity = float(quantity)
+                if quantity == 0:
+                    levels.pop(price, None)
+                else:
+                    levels[price] = quantity
+        self.timestamp = time.time()
+        self._snapshot = None
+        return True
+
+    def best_prices(self):
+        """Return (best_bid, best_ask), None for an empty side."""
+        return (max(self.bids) if self.bids else None, min(self.asks) if self.asks else None)
+
+    def is_valid(self):
+        return self.sequence is not None
+
+    def snapshot(self):
+        """Return an OrderBook for the current state, shared until the next update."""
+        if self._snapshot is None:
+            self._snapshot = OrderBook(
+                self.symbol, list(self.asks.items()), list(self.bids.items()), self.timestamp
+            )
+        return self._snapshot
+
+
+class GleecMarketData:
+    """
+    Gleec public WebSocket subscriber for tickers and order books.
+
+    Args:
+        url (str): Public WebSocket endpoint
+        symbols (list): Symbols to subscribe to, e.g. ['SHARDSUSDT', 'ADAUSDT']
+        reconnect_delay (float): Initial delay before reconnecting, doubled up to 60s
+    """
+
+    def __init__(self, url, symbols, reconnect_delay=1):
+        self.url = url
+        self.symbols = list(symbols)
+        self.reconnect_delay = reconnect_delay
+        self.tickers = {}
+        self.books = {symbol: LocalOrderBook(symbol) for symbol in self.symbols}
+        self.connected = False
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """Register callback(symbol), called when a symbol's last price or top of book changes."""
+        self.listeners.append(callback)
+
+    def _notify(self, symbol):
+        for callback in self.listeners:
+            try:
+                callback(symbol)
+            except Exception as e:
+                logging.error(f"Error in market data listener: {e}")
+
+    def get_last_price(self, symbol, max_age):
+        """Return the streamed last price, or None if missing or older than max_age seconds."""
+        ticker = self.tickers.get(symbol)
+        if not self.connected or not ticker or time.time() - ticker['timestamp'] > max_age:
+            return None
+        return ticker['last']
+
+    def get_order_book(self, symbol, max_age):
+        """Return the streamed OrderBook snapshot, or None if invalid or older than max_age seconds."""
+        book = self.books.get(symbol)
+        if not self.connected or not book or not book.is_valid() or time.time() - book.timestamp > max_age:
+            return None
+        return book.snapshot()
+
+    def subscriptions(self):
+        return [
+            {'method': 'subscribe', 'ch': 'ticker/1s', 'params': {'symbols': self.symbols}, 'id': 1},
+            {'method': 'subscribe', 'ch': 'orderbook/full', 'params': {'symbols': self.symbols}, 'id': 2}
+        ]
+
+    def handle_message(self, message):
+        """
+        Apply one decoded WebSocket frame.
+
+        Returns:
+            bool: False if a book fell out of sequence and the stream must be resynced
+        """
+        channel = message.get('ch')
+        if 'error' in message:
+            logging.error(f"Market data error: {message['error']}")
+            return True
+
+        if channel and channel.startswith('ticker'):
+            for symbol, data in message.get('data', {}).items():
+                if data.get('c') is None:
+                    continue
+                previous = self.tickers.get(symbol)
+                ticker = {
+                    'last': float(data['c']),
+                    'bid': float(data['b']) if data.get('b') else None,
+                    'ask': float(data['a']) if data.get('a') else None,
+                    'timestamp': time.time()
+                }
+                self.tickers[symbol] = ticker
+                if previous is None or any(previous[k] != ticker[k] for k in ('last', 'bid', 'ask')):
+                    self._notify(symbol)
+
+        elif channel == 'orderbook/full':
+            for symbol, data in message.get('snapshot', {}).items():
+                if symbol in self.books:
+                    self.books[symbol].apply_snapshot(data)
+                    self._notify(symbol)
+            for symbol, data in message.get('update', {}).items():
+                if symbol not in self.books:
+                    continue
+                book = self.books[symbol]
+                top = book.best_prices()
+                if not book.apply_update(data):
+                    return False
+                if book.best_prices() != top:
+                    self._notify(symbol)
+
+        return True
+
+    async def run(self):
+        """Connect, subscribe and apply frames forever, reconnecting on errors."""
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        for subscription in self.subscriptions():
+                            await ws.send_json(subscription)
+                        self.connected = True
+                        delay = self.reconnect_delay
+                        logging.info(f"Market data stream connected: {self.symbols}")
+
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                if not self.handle_message(msg.json()):
+                                    logging.warning("Resyncing market data stream")
+                                    break
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Market data stream error: {e}")
+                finally:
+                    self.connected = False
+
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
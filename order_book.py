@@ -0,0 +1,123 @@
+"""
+Order book snapshot for the Cardano DEX-CEX Arbitrage Bot
+
+Holds both sides of a book as sorted NumPy arrays with precomputed cumulative
+quantity and notional, so depth, depth-within-price and fill price (VWAP)
+queries are binary searches instead of Python loops over every level. One
+snapshot is built per book update and shared by every query against it.
+
+Sides:
+    'buy' consumes the asks (lowest price first),
+    'sell' consumes the bids (highest price first).
+"""
+
+import time
+import numpy as np
+
+
+class OrderBook:
+    """
+    Immutable order book snapshot.
+
+    Args:
+        symbol (str): Trading pair symbol
+        asks (array-like): [[price, quantity], ...] in any order
+        bids (array-like): [[price, quantity], ...] in any order
+        timestamp (float): Time the book was observed
+    """
+
+    def __init__(self, symbol, asks, bids, timestamp=None):
+        self.symbol = symbol
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self._sides = {
+            'buy': _BookSide(asks, descending=False),
+            'sell': _BookSide(bids, descending=True)
+        }
+
+    @classmethod
+    def from_levels(cls, levels, symbol=None):
+        """Build a snapshot from an orderbook response ({'ask': [...], 'bid': [...]})."""
+        return cls(
+            symbol or levels.get('symbol'),
+            levels.get('ask', []),
+            levels.get('bid', []),
+            levels.get('timestamp') if isinstance(levels.get('timestamp'), (int, float)) else None
+        )
+
+    def age(self):
+        return time.time() - self.timestamp
+
+    def best_price(self, side):
+        """Best price a taker on this side would trade at, or None if the side is empty."""
+        book_side = self._sides[side]
+        return float(book_side.prices[0]) if len(book_side.prices) else None
+
+    def cumulative_depth(self, side, levels):
+        """Total quantity in the best `levels` price levels."""
+        book_side = self._sides[side]
+        levels = min(int(levels), len(book_side.prices))
+        return float(book_side.cum_quantity[levels - 1]) if levels > 0 else 0.0
+
+    def depth_within_price(self, side, price):
+        """Quantity available at prices equal to or better than `price`."""
+        book_side = self._sides[side]
+        idx = book_side.levels_within(price)
+        return float(book_side.cum_quantity[idx - 1]) if idx > 0 else 0.0
+
+    def fill_notional(self, side, quantities):
+        """
+        Cost (buy) or proceeds (sell) of filling each quantity by walking the book.
+
+        Args:
+            side (str): 'buy' or 'sell'
+            quantities (float or array-like): Quantities to fill
+
+        Returns:
+            numpy.ndarray: Notional per quantity, NaN where the book is too thin
+        """
+        book_side = self._sides[side]
+        quantities = np.atleast_1d(np.asarray(quantities, dtype=float))
+        result = np.full(quantities.shape, np.nan)
+        if not len(book_side.prices):
+            return result
+
+        # Index of the level that completes each fill
+        idx = np.searchsorted(book_side.cum_quantity, quantities, side='left')
+        fillable = idx < len(book_side.prices)
+        idx = idx[fillable]
+        filled_before = np.where(idx > 0, book_side.cum_quantity[idx - 1], 0.0)
+        notional_before = np.where(idx > 0, book_side.cum_notional[idx - 1], 0.0)
+        result[fillable] = notional_before + (quantities[fillable] - filled_before) * book_side.prices[idx]
+        return result
+
+    def fill_price(self, side, quantity):
+        """Volume-weighted average price to fill `quantity`, or None if the book is too thin."""
+        if quantity <= 0:
+            return self.best_price(side)
+        notional = self.fill_notional(side, quantity)[0]
+        return None if np.isnan(notional) else float(notional / quantity)
+
+    def worst_price(self, side, quantity):
+        """Price of the last level touched when filling `quantity`, or None if the book is too thin."""
+        book_side = self._sides[side]
+        idx = int(np.searchsorted(book_side.cum_quantity, quantity, side='left'))
+        return float(book_side.prices[idx]) if idx < len(book_side.prices) else None
+
+
+class _BookSide:
+    """One side of the book sorted best price first with cumulative sums."""
+
+    def __init__(self, levels, descending):
+        levels = np.asarray(levels, dtype=float).reshape(-1, 2)
+        order = np.argsort(-levels[:, 0] if descending else levels[:, 0], kind='stable')
+        self.descending = descending
+        self.prices = levels[order, 0]
+        self.quantities = levels[order, 1]
+        self.cum_quantity = np.cumsum(self.quantities)
+        self.cum_notional = np.cumsum(self.prices * self.quantities)
+
+    def levels_within(self, price):
+        """Number of levels priced equal to or better than `price`."""
+        if self.descending:
+            return int(np.searchsorted(-self.prices, -price, side='right'))
+        return int(np.searchsorted(self.prices, price, side='right'))
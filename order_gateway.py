@@ -0,0 +1,445 @@
+"""
+Gleec order gateway for the Cardano DEX-CEX Arbitrage Bot
+
+All order traffic goes through OrderGateway: placement, cancel, replace
+(cancel-replace in one request) and status.
+
+Idempotent placement:
+    Every order gets a collision-free client_order_id that is written to the
+    bot state (active_orders, status 'submitting') and flushed before the
+    order is sent. When a request times out or fails without a clear answer,
+    the gateway looks the order up by its client ID before trying again, so
+    retries can be fast and aggressive without ever placing the same order
+    twice.
+
+    After a crash, the 'submitting' entry is still in the state: placing the
+    order again with the same client ID (trade cycles derive it from the
+    cycle ID) finds the order instead of duplicating it, and
+    check_pending_operations resolves entries that are never retried.
+
+Pre-trade checks:
+    Async callables `check(order)` registered with add_check(), run in order
+    before anything is sent. `order` is the request body (symbol, side,
+    quantity, price, ...); a check returns a rejection reason, or None to let
+    the order through. Checks should read cached data (see LiquidityCheck):
+    they sit on the critical path of every order. Only orders taking on new
+    risk are checked: legs completing a position pass checks=False.
+
+Latency:
+    Each placement logs its time broken down by stage (checks, register,
+    submit, lookup), and running averages are kept in latency_stats().
+
+Known Issues:
+    - If the exchange cannot be reached to look the order up, the order is
+      not sent again; when all attempts are used up placement gives up and
+      the 'submitting' entry is left for reconciliation
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+
+from rate_limiter import PRIORITY_CRITICAL, PRIORITY_BACKGROUND
+
+SUBMITTING = 'submitting'
+
+
+def new_client_order_id(prefix='bot'):
+    """Collision-free client order ID (Gleec allows up to 32 characters)."""
+    return f"{prefix}_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
+
+
+class LiquidityCheck:
+    """
+    Pre-trade check rejecting limit orders the book cannot fill at their price.
+
+    Args:
+        get_book (callable): get_book(symbol) returning a cached OrderBook, or
+            None when no fresh snapshot is at hand (the check is then skipped
+            rather than fetching one)
+    """
+
+    def __init__(self, get_book):
+        self.get_book = get_book
+
+    async def __call__(self, order):
+        if not order.get('price') or order.get('post_only'):
+            return None  # Market orders take whatever the book has; post-only orders are meant to rest
+        book = self.get_book(order['symbol'])
+        if book is None:
+            logging.debug(f"No cached {order['symbol']} book, liquidity check skipped")
+            return None
+        quantity, price = float(order['quantity']), float(order['price'])
+        # Buys need asks at or below the price, sells need bids at or above it
+        available = book.depth_within_price(order['side'], price)
+        if available < quantity:
+            return f"insufficient liquidity for {order['side']} {quantity} at {price} (available {available})"
+        return None
+
+
+class OrderGateway:
+    """
+    Places, cancels, replaces and tracks Gleec spot orders.
+
+    Args:
+        client (VenueClient): Authenticated Gleec client
+        state: BotState (or SQLiteBotState) orders are tracked in
+        order_stream (GleecOrderStream): Streamed order reports checked before REST, or None
+        retries (int): Extra attempts after a request with no clear answer
+        retry_delay (float): Delay before the first retry, doubled for each further one
+    """
+
+    def __init__(self, client, state, order_stream=None, retries=3, retry_delay=0.25):
+        self.client = client
+        self.state = state
+        self.order_stream = order_stream
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.checks = []
+        self.latency = {}  # stage -> [count, total seconds]
+
+    def add_check(self, check):
+        """Register a pre-trade check (see module docstring)."""
+        self.checks.append(check)
+
+    def latency_stats(self):
+        """Return {stage: average milliseconds} over all placements."""
+        return {stage: round(total / count * 1000, 1) for stage, (count, total) in self.latency.items()}
+
+    def _record_latency(self, client_order_id, timings):
+        for stage, seconds in timings.items():
+            count, total = self.latency.get(stage, (0, 0.0))
+            self.latency[stage] = [count + 1, total + seconds]
+        breakdown = ', '.join(f"{stage} {seconds * 1000:.1f}" for stage, seconds in timings.items())
+        logging.info(f"Order {client_order_id} latency {sum(timings.values()) * 1000:.1f} ms ({breakdown})")
+
+    def is_registered(self, client_order_id):
+        """True if an order with this client ID may already have been sent."""
+        entry = self.state.get_entry('active_orders', client_order_id)
+        return entry is not None and entry['status'] == SUBMITTING
+
+    async def find(self, client_order_id, symbol):
+        """
+        Look an order up by client ID (stream, active orders, then history).
+
+        Returns:
+            tuple: (order or None, True if the answer is certain)
+        """
+        if self.order_stream is not None:
+            order = self.order_stream.get_order(client_order_id=client_order_id)
+            if order:
+                return order, True
+        try:
+            response = await self.client.get(f"/spot/order/{client_order_id}", priority=PRIORITY_CRITICAL)
+            if response.status_code == 200:
+                return response.json(), True
+            response = await self.client.get(
+                "/spot/history/order",
+                params={'symbol': symbol, 'client_order_id': client_order_id},
+                priority=PRIORITY_CRITICAL
+            )
+            response.raise_for_status()
+            for order in response.json():
+                if order.get('client_order_id') == client_order_id:
+                    return order, True
+            return None, True
+        except Exception as e:
+            logging.error(f"Error looking up order {client_order_id}: {e}")
+            return None, False
+
+    async def place(self, symbol, side, quantity, price=None, order_type='limit', time_in_force='GTC',
+                    client_order_id=None, post_only=False, checks=True):
+        """
+        Place an order, or return it if this client ID was already placed.
+
+        Args:
+            checks (bool): Run the pre-trade checks. Orders completing a position
+                already taken (e.g. selling SHARDS deposited for a cycle) skip
+                them: there is no risk left to refuse, only a position to close
+
+        Returns:
+            dict: Order data including 'id' and 'client_order_id', or None if
+                  the order was rejected or could not be placed
+        """
+        client_order_id = client_order_id or new_client_order_id()
+        data = {
+            'symbol': symbol,
+            'side': side,
+            'quantity': str(quantity),
+            'type': order_type,
+            'timeInForce': time_in_force,
+            'client_order_id': client_order_id
+        }
+        if price:
+            data['price'] = str(price)
+        if post_only:
+            data['post_only'] = True
+
+        timings = {}
+        try:
+            return await self._place(data, timings, checks)
+        finally:
+            self._record_latency(client_order_id, timings)
+
+    async def _timed(self, timings, stage, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+    async def _place(self, data, timings, checks=True):
+        client_order_id, symbol = data['client_order_id'], data['symbol']
+
+        may_post = True
+        if self.is_registered(client_order_id):
+            # Resumed placement: the order may have reached the exchange before a crash
+            order, certain = await self._timed(timings, 'lookup', self.find(client_order_id, symbol))
+            if order:
+                return self._placed(client_order_id, order)
+            may_post = certain
+        else:
+            for check in (self.checks if checks else []):
+                reason = await self._timed(timings, 'checks', check(data))
+                if reason:
+                    logging.error(f"Order {client_order_id} blocked by pre-trade check: {reason}")
+                    return None
+            start = time.perf_counter()
+            self.state.update_order(client_order_id, SUBMITTING, data)
+            self.state.flush()  # Durable before the order can exist
+            timings['register'] = time.perf_counter() - start
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+            if may_post:
+                try:
+                    response = await self._timed(timings, 'submit', self.client.post(
+                        '/spot/order', json=data, priority=PRIORITY_CRITICAL))
+                except Exception as e:
+                    error = str(e)  # Timeout or connection error: the order may exist
+                else:
+                    if response.status_code < 400:
+                        order = response.json()
+                        if 'id' in order:
+                            return self._placed(client_order_id, order)
+                        logging.error(f"No order ID in response: {order}")
+                        return self._rejected(client_order_id, data, 'no order ID in response')
+                    if response.status_code < 500:
+                        # Rejected; a duplicate client ID means an earlier attempt got through
+                        order, _ = await self._timed(timings, 'lookup', self.find(client_order_id, symbol))
+                        if order:
+                            return self._placed(client_order_id, order)
+                        logging.error(f"Order {client_order_id} rejected: {response.text}")
+                        return self._rejected(client_order_id, data, response.text)
+                    error = f"{response.status_code} {response.text}"
+                logging.warning(f"Order {client_order_id} attempt {attempt + 1} failed ({error}), "
+                                f"checking whether it was placed")
+
+            order, certain = await self._timed(timings, 'lookup', self.find(client_order_id, symbol))
+            if order:
+                return self._placed(client_order_id, order)
+            may_post = certain  # Never send again while the first attempt is unaccounted for
+
+        # The last attempt may still reach the exchange: the 'submitting' entry is left for reconciliation
+        logging.error(f"Could not place order {client_order_id} after {self.retries + 1} attempts")
+        return None
+
+    def _placed(self, client_order_id, order):
+        order = dict(order, client_order_id=client_order_id)
+        self.state.update_order(order['id'], 'pending', order)
+        self.state.remove('active_orders', client_order_id)
+        logging.info(f"Order created: ID={order['id']}, ClientID={client_order_id}")
+        return order
+
+    def _rejected(self, client_order_id, data, error):
+        self.state.update_order(client_order_id, 'failed', dict(data, error=error))
+        return None
+
+    async def cancel(self, order_id, symbol):
+        """
+        Cancel an active order.
+
+        Returns:
+            bool: True if the exchange confirmed the cancellation
+        """
+        try:
+            response = await self.client.delete(f"/spot/order/{order_id}/{symbol}", priority=PRIORITY_CRITICAL)
+            response.raise_for_status()
+            result = response.json()
+            if result.get('status') == 'canceled':
+                logging.info(f"Successfully cancelled order {order_id}")
+                self.state.remove('active_orders', order_id)  # Nothing left to reconcile
+                return True
+            logging.error(f"Unexpected response when cancelling order: {result}")
+            return False
+        except Exception as e:
+            logging.error(f"Failed to cancel order {order_id}: {e}")
+            if hasattr(e, 'response'):
+                logging.error(f"Response: {e.response.text}")
+            return False
+
+    async def replace(self, order_id, client_order_id, symbol, quantity, price, new_client_order_id=None):
+        """
+        Atomically replace an active order's quantity and price.
+
+        The new client ID is registered like a new order, so a replace whose
+        answer was lost is looked up instead of being sent again.
+
+        Returns:
+            dict: The replacing order, or None if the replace was rejected
+                  (e.g. the order filled first) or its outcome is unknown
+        """
+        new_client_order_id = new_client_order_id or replacement_client_order_id(client_order_id)
+        data = {
+            'new_client_order_id': new_client_order_id,
+            'quantity': str(quantity),
+            'price': str(price)
+        }
+        self.state.update_order(new_client_order_id, SUBMITTING, dict(data, symbol=symbol, replaces=order_id))
+        self.state.flush()
+
+        try:
+            response = await self.client.patch(f"/spot/order/{client_order_id}", json=data,
+                                               priority=PRIORITY_CRITICAL)
+        except Exception as e:
+            logging.warning(f"Replace of order {order_id} failed ({e}), checking whether it went through")
+            order, certain = await self.find(new_client_order_id, symbol)
+            if order:
+                self.state.remove('active_orders', order_id)
+                return self._placed(new_client_order_id, order)
+            if certain:
+                self._rejected(new_client_order_id, data, str(e))
+            return None
+
+        if response.status_code >= 400:
+            logging.error(f"Replace of order {order_id} rejected: {response.text}")
+            return self._rejected(new_client_order_id, data, response.text)
+        self.state.remove('active_orders', order_id)
+        return self._placed(new_client_order_id, response.json())
+
+    async def fetch_order(self, order_id, priority=PRIORITY_CRITICAL):
+        """
+        Fetch an active order from the exchange.
+
+        Returns:
+            dict: The order, including 'status' and 'quantity_cumulative', or
+                  None if the order is no longer active
+
+        Raises:
+            Exception: If the request failed
+        """
+        response = await self.client.get(f"/spot/order/{order_id}", priority=priority)
+        return response.json() if response.status_code == 200 else None
+
+    async def status(self, order_id, symbol):
+        """Status of an order: streamed first, then the active order, then the symbol's history."""
+        streamed = self.order_stream.get_status(order_id) if self.order_stream is not None else None
+        if streamed:
+            return streamed
+        try:
+            order = await self.fetch_order(order_id, priority=PRIORITY_BACKGROUND)
+        except Exception as e:
+            logging.error(f"Error checking order status: {e}")
+            return 'error'
+        if order is not None:
+            return order.get('status')
+        return await self.history_status(order_id, symbol)
+
+    async def history_status(self, order_id, symbol):
+        """Status of an order: streamed first, then the symbol's order history."""
+        streamed = self.order_stream.get_status(order_id) if self.order_stream is not None else None
+        if streamed:
+            return streamed
+        snapshot = await self.fetch_history(symbol)
+        if snapshot is None:
+            return 'error'
+        return snapshot.get(str(order_id), 'not_found')
+
+    async def fetch_history(self, symbol, limit=100):
+        """
+        Fetch a symbol's recent order history once.
+
+        Returns:
+            dict: {order ID or client_order_id: status}, or None if the request failed
+        """
+        try:
+            response = await self.client.get("/spot/history/order", params={'symbol': symbol, 'limit': limit},
+                                             priority=PRIORITY_BACKGROUND)
+            response.raise_for_status()
+            return _index(response.json())
+        except Exception as e:
+            logging.error(f"Error checking order history: {e}")
+            return None
+
+    async def fetch_snapshot(self, symbol, history_limit=100):
+        """
+        Fetch a symbol's active orders and recent order history once.
+
+        Returns:
+            dict: {order ID or client_order_id: status}, or None if a request failed
+        """
+        try:
+            active, history = await asyncio.gather(
+                self.client.get("/spot/order", params={'symbol': symbol}, priority=PRIORITY_BACKGROUND),
+                self.client.get("/spot/history/order", params={'symbol': symbol, 'limit': history_limit},
+                                priority=PRIORITY_BACKGROUND)
+            )
+            active.raise_for_status()
+            history.raise_for_status()
+        except Exception as e:
+            logging.error(f"Error fetching order snapshot for {symbol}: {e}")
+            return None
+        return _index(history.json() + active.json())  # Active orders last: they are the current view
+
+    async def reconcile(self, orders):
+        """
+        Resolve the status of many orders from one snapshot per symbol.
+
+        Args:
+            orders (dict): {order_id: state entry} as in the bot state's active_orders
+
+        Returns:
+            dict: {order_id: status}; 'not_found' if the order is in neither the
+                  active orders nor the recent history, 'error' if it has no
+                  symbol or its symbol's snapshot failed
+        """
+        statuses = {}
+        by_symbol = {}
+        for order_id, entry in orders.items():
+            streamed = self.order_stream.get_status(order_id) if self.order_stream is not None else None
+            if streamed:
+                statuses[order_id] = streamed
+                continue
+            symbol = entry.get('details', {}).get('symbol')
+            if not symbol:
+                logging.error(f"Cannot check order {order_id}: Missing symbol in order details")
+                statuses[order_id] = 'error'
+                continue
+            by_symbol.setdefault(symbol, []).append(order_id)
+
+        symbols = list(by_symbol)
+        snapshots = await asyncio.gather(*(self.fetch_snapshot(symbol) for symbol in symbols))
+        for symbol, snapshot in zip(symbols, snapshots):
+            for order_id in by_symbol[symbol]:
+                if snapshot is None:
+                    statuses[order_id] = 'error'
+                    continue
+                client_order_id = orders[order_id].get('details', {}).get('client_order_id')
+                statuses[order_id] = snapshot.get(str(order_id)) or snapshot.get(client_order_id) or 'not_found'
+        return statuses
+
+
+def replacement_client_order_id(client_order_id):
+    """Client ID for the order replacing client_order_id (keeps its prefix, fits in 32 characters)."""
+    return f"{client_order_id.split('_r')[0][:21]}_r{uuid.uuid4().hex[:8]}"
+
+
+def _index(orders):
+    index = {}
+    for order in orders:
+        index[str(order['id'])] = order['status']
+        if order.get('client_order_id'):
+            index[order['client_order_id']] = order['status']
+    return index
@@ -0,0 +1,138 @@
+"""
+Streaming order reports for the Cardano DEX-CEX Arbitrage Bot
+
+Subscribes to Gleec's private trading WebSocket and keeps the latest report
+of every order placed on the account, so order checks read a status pushed
+the moment the order changes instead of downloading the order history.
+
+Protocol:
+    Gleec API v3 trading WebSocket. After a 'login' request, 'spot_subscribe'
+    sends one 'spot_orders' frame with the active orders, then a 'spot_order'
+    frame for every order event (new, partial fill, fill, cancel, expiry).
+
+Known Issues:
+    - Consumers must fall back to REST while the stream is down, and for
+      orders whose first report has not arrived yet
+    - Reports missed while disconnected are not replayed; the active-orders
+      frame sent on resubscribe covers open orders only
+"""
+
+import time
+import asyncio
+import logging
+import aiohttp
+
+FINAL_STATUSES = ('filled', 'canceled', 'cancelled', 'expired')
+
+
+class GleecOrderStream:
+    """
+    Gleec private WebSocket subscriber for order reports.
+
+    Args:
+        url (str): Trading WebSocket endpoint
+        api_key (str): Gleec API key
+        secret_key (str): Gleec API secret
+        reconnect_delay (float): Initial delay before reconnecting, doubled up to 60s
+        retain (float): Seconds finished orders are kept in the status map
+    """
+
+    def __init__(self, url, api_key, secret_key, reconnect_delay=1, retain=3600):
+        self.url = url
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.reconnect_delay = reconnect_delay
+        self.retain = retain
+        self.orders = {}  # order_id -> latest report
+        self.client_ids = {}  # client_order_id -> order_id
+        self.connected = False
+        self.listeners = []
+        self._last_prune = 0
+
+    def add_listener(self, callback):
+        """Register callback(order_id, report), called on every order report."""
+        self.listeners.append(callback)
+
+    def get_order(self, order_id=None, client_order_id=None):
+        """Return the latest report of an order, or None if the stream has not seen it."""
+        if order_id is None:
+            order_id = self.client_ids.get(client_order_id)
+        return self.orders.get(str(order_id)) if order_id is not None else None
+
+    def get_status(self, order_id):
+        """Return the streamed status of an order, or None if unknown or the stream is down."""
+        order = self.orders.get(str(order_id))
+        if order is None or (not self.connected and order['status'] not in FINAL_STATUSES):
+            return None
+        return order['status']
+
+    def subscriptions(self):
+        return [
+            {'method': 'login', 'params': {'type': 'BASIC', 'api_key': self.api_key,
+                                           'secret_key': self.secret_key}, 'id': 1},
+            {'method': 'spot_subscribe', 'params': {}, 'id': 2}
+        ]
+
+    def apply_report(self, report):
+        """Record one order report and notify the listeners."""
+        order_id = str(report['id'])
+        report = dict(report, timestamp=time.time())
+        self.orders[order_id] = report
+        if report.get('client_order_id'):
+            self.client_ids[report['client_order_id']] = order_id
+        for callback in self.listeners:
+            try:
+                callback(order_id, report)
+            except Exception as e:
+                logging.error(f"Error in order stream listener: {e}")
+
+    def prune(self):
+        """Forget finished orders older than retain."""
+        cutoff = time.time() - self.retain
+        for order_id, order in list(self.orders.items()):
+            if order['status'] in FINAL_STATUSES and order['timestamp'] < cutoff:
+                del self.orders[order_id]
+                self.client_ids.pop(order.get('client_order_id'), None)
+        self._last_prune = time.time()
+
+    def handle_message(self, message):
+        """Apply one decoded WebSocket frame."""
+        if 'error' in message:
+            logging.error(f"Order stream error: {message['error']}")
+            return
+        method = message.get('method')
+        if method == 'spot_order':
+            self.apply_report(message['params'])
+        elif method == 'spot_orders':
+            for report in message.get('params', []):
+                self.apply_report(report)
+
+    async def run(self):
+        """Connect, log in, subscribe and apply reports forever, reconnecting on errors."""
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        for request in self.subscriptions():
+                            await ws.send_json(request)
+                        self.connected = True
+                        delay = self.reconnect_delay
+                        logging.info("Order stream connected")
+
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self.handle_message(msg.json())
+                                if time.time() - self._last_prune > 60:
+                                    self.prune()
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Order stream error: {e}")
+                finally:
+                    self.connected = False
+
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
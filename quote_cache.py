@@ -0,0 +1,93 @@
+"""
+Quote cache for the Cardano DEX-CEX Arbitrage Bot
+
+Caches DexHunter quotes (swap estimates and average prices) so detection and
+execution reuse a fresh quote instead of asking DexHunter again seconds later.
+Entries expire after a TTL, the cache is bounded with LRU eviction, and hit
+and miss counters show how much traffic it saves.
+
+Keys:
+    (kind, token_in, token_out, amount bucket, slippage). Amounts are grouped
+    into geometric buckets `bucket_pct` percent wide, so 100 and 100.4 ADA
+    share a quote while 100 and 150 ADA do not. A quote shared this way was
+    made for another amount, so callers scale it to the amount they asked
+    for (see estimate_swap).
+"""
+
+import math
+import time
+import logging
+from collections import OrderedDict
+
+
+class QuoteCache:
+    """
+    TTL + LRU cache for quotes.
+
+    Args:
+        ttl (float): Default maximum age in seconds before a quote is fetched again
+        max_size (int): Maximum number of entries kept
+        bucket_pct (float): Width of an amount bucket in percent
+    """
+
+    def __init__(self, ttl=5, max_size=256, bucket_pct=1.0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.bucket_pct = bucket_pct
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def amount_bucket(self, amount):
+        """Geometric bucket index for an amount (None, 0 and negative amounts map to themselves)."""
+        if not amount or amount < 0:
+            return amount
+        return round(math.log(float(amount)) / math.log(1 + self.bucket_pct / 100))
+
+    def key(self, kind, token_in, token_out, amount=None, slippage=None):
+        return (kind, token_in, token_out, self.amount_bucket(amount), slippage)
+
+    def get(self, key, max_age=None):
+        """Return a cached value no older than max_age (default ttl), or None."""
+        max_age = self.ttl if max_age is None else max_age
+        entry = self.entries.get(key)
+        if entry is not None:
+            timestamp, value = entry
+            if time.time() - timestamp <= max_age:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if time.time() - timestamp > self.ttl:
+                del self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = (time.time(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def get_or_fetch(self, key, fetch, max_age=None):
+        """
+        Return a fresh cached value or await fetch() and cache its result.
+
+        None results are not cached so failed fetches are retried next time.
+        """
+        value = self.get(key, max_age)
+        if value is not None:
+            return value
+        value = await fetch()
+        if value is not None:
+            self.put(key, value)
+        logging.debug(f"Quote cache miss for {key[:3]} ({self.stats()})")
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
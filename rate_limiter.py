@@ -0,0 +1,99 @@
+"""
+Rate limiting for the Cardano DEX-CEX Arbitrage Bot
+
+One token bucket per venue (Gleec public, Gleec private, DexHunter, Blockfrost)
+throttles requests before they are sent. Waiting requests are served by
+priority lane, so order placement and cancellation go ahead of background
+status polling, and background requests cannot take the last few tokens of a
+bucket, keeping burst headroom for latency-critical calls.
+
+Lanes:
+    PRIORITY_CRITICAL   - order placement, cancellation, withdrawals, tx submission
+    PRIORITY_NORMAL     - price, book and balance lookups
+    PRIORITY_BACKGROUND - order, withdrawal and transaction status polling
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+
+PRIORITY_CRITICAL = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+
+class TokenBucket:
+    """
+    Token bucket with priority-ordered waiters.
+
+    Args:
+        name (str): Venue name used in log messages
+        rate (float): Tokens added per second (sustained requests per second)
+        capacity (float): Maximum tokens (burst size)
+        background_reserve (float): Tokens background requests must leave in the bucket
+    """
+
+    def __init__(self, name, rate, capacity=None, background_reserve=1):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.background_reserve = min(background_reserve, max(self.capacity - 1, 0))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._dispatcher = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _required(self, priority):
+        return 1 + (self.background_reserve if priority >= PRIORITY_BACKGROUND else 0)
+
+    def _try_take(self, priority):
+        self._refill()
+        if time.monotonic() >= self.paused_until and self.tokens >= self._required(priority):
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, priority=PRIORITY_NORMAL):
+        """Wait until a token is available for this priority lane and take it."""
+        if not self._waiters and self._try_take(priority):
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        """Hand out tokens to waiters, highest priority first."""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():  # Waiter was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            if self._try_take(priority):
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+                continue
+
+            wait = max(
+                self.paused_until - time.monotonic(),
+                (self._required(priority) - self.tokens) / self.rate,
+                0.001
+            )
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds`, e.g. after a 429 response."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        logging.warning(f"{self.name} rate limited, pausing requests for {seconds:.1f}s")
@@ -0,0 +1,141 @@
+"""
+Inventory rebalancer and batched on-chain transfers
+
+TransferBatcher queues SHARDS transfers from the bot's Cardano address and
+sends everything queued within a short window as one transaction, with one
+output per recipient (transfers to the same address are merged). The batch
+transaction can also consume small UTxOs of the bot's address, consolidating
+them into its change output. Fewer transactions means lower fees and fewer
+waits for chain confirmation.
+
+Rebalancer watches the SHARDS inventory on both venues (inventory mode) and
+starts a transfer whenever the split drifts past its band (see
+inventory.plan_rebalance). Transfers to Gleec go through the batcher.
+
+Known Issues:
+    - A failed batch fails every transfer in it
+"""
+
+import asyncio
+import logging
+
+from inventory import plan_rebalance
+
+
+class TransferBatcher:
+    """
+    Coalesces SHARDS transfers into multi-output transactions.
+
+    Args:
+        submit_batch (callable): Async callable taking [(address, quantity), ...]
+            and returning the submitted transaction ID
+        window (float): Seconds to wait for more transfers before submitting
+        max_outputs (int): Maximum recipients per transaction
+    """
+
+    def __init__(self, submit_batch, window=2.0, max_outputs=10):
+        self.submit_batch = submit_batch
+        self.window = window
+        self.max_outputs = max_outputs
+        self.queue = []
+        self.batches = 0
+        self.transfers = 0
+        self._flusher = None
+
+    async def send(self, address, quantity):
+        """
+        Queue a transfer and wait for the transaction carrying it.
+
+        Returns:
+            str: Transaction ID
+
+        Raises:
+            Exception: Whatever submitting the batch raised
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.append((address, quantity, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_after(self.window))
+        return await future
+
+    async def _flush_after(self, delay):
+        await asyncio.sleep(delay)
+        while self.queue:
+            batch, self.queue = self.queue[:self.max_outputs], self.queue[self.max_outputs:]
+            await self._submit(batch)
+
+    async def _submit(self, batch):
+        outputs = {}
+        for address, quantity, _ in batch:
+            outputs[address] = outputs.get(address, 0) + quantity
+
+        try:
+            tx_id = await self.submit_batch(list(outputs.items()))
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.transfers += len(batch)
+        logging.info(f"Sent {len(batch)} transfers to {len(outputs)} recipients in transaction {tx_id}")
+        for _, _, future in batch:
+            if not future.done():
+                future.set_result(tx_id)
+
+
+class Rebalancer:
+    """
+    Background service keeping the SHARDS inventory split between the venues.
+
+    Args:
+        get_balances (callable): Async callable returning (unreserved Gleec SHARDS,
+            unreserved Cardano SHARDS), or None if a balance is unavailable
+        start_transfer (callable): Called as start_transfer(target, quantity) with
+            target 'to_gleec' or 'to_cardano'
+        is_busy (callable): Returns True while an earlier rebalance is in flight
+        target_share (float): Share of the SHARDS to keep on Gleec
+        band (float): Allowed drift of the Gleec share before rebalancing
+        min_amount (float): Smallest transfer worth making
+        interval (float): Seconds between two checks
+    """
+
+    def __init__(self, get_balances, start_transfer, is_busy, target_share=0.5, band=0.25,
+                 min_amount=0, interval=300):
+        self.get_balances = get_balances
+        self.start_transfer = start_transfer
+        self.is_busy = is_busy
+        self.target_share = target_share
+        self.band = band
+        self.min_amount = min_amount
+        self.interval = interval
+
+    async def check(self):
+        """
+        Start a transfer if the inventory is out of balance.
+
+        Returns:
+            tuple: The (target, quantity) started, or None
+        """
+        if self.is_busy():
+            return None  # One rebalance at a time
+        balances = await self.get_balances()
+        if balances is None:
+            return None
+
+        plan = plan_rebalance(*balances, target_share=self.target_share, band=self.band,
+                              min_amount=self.min_amount)
+        if plan:
+            target, quantity = plan
+            logging.info(f"SHARDS inventory out of balance, moving {quantity} SHARDS {target.replace('_', ' ')}")
+            self.start_transfer(target, quantity)
+        return plan
+
+    async def run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logging.error(f"Error in rebalancer: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,215 @@
+"""
+Cancel-replace repricing of resting Gleec orders
+
+A limit order that does not fill at once rests in the book and falls behind
+as the market moves. OrderRepricer tracks such orders and replaces them at
+the touch in one cancel-replace request (see OrderGateway.replace):
+
+    - Resting orders (liquidity orders, post-only) join the same-side touch
+      (best bid for a buy, best ask for a sell) once it has moved more than
+      `distance` away from the order's price
+    - Crossing orders (cycle legs, meant to fill at once) follow the
+      opposite-side touch (best ask for a buy, best bid for a sell) as soon as
+      it has moved away from the order's price: a resting crossing order is
+      itself the same-side touch, so comparing it with that side never fires
+
+Limits:
+    Every tracked order has a limit price it is never moved past (the worst
+    price at which the trade still makes sense): a buy is never repriced
+    above it, a sell never below it. When the touch is beyond the limit the
+    order stays where it is.
+
+Rate limits:
+    An order is replaced at most once every `min_interval` seconds and at
+    most `max_reprices` times, and all orders together share a budget of
+    `max_per_minute` replaces, on top of the Gleec client's token bucket.
+
+Triggers:
+    check() runs on every top-of-book change (notify(), registered as a
+    market-data listener) and every `interval` seconds. Books are read from
+    cache only; a symbol without a fresh book is skipped.
+
+Known Issues:
+    - Tracked orders live in memory; after a restart the orders rest at their
+      last price until their cycle times them out
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+
+from order_stream import FINAL_STATUSES
+
+
+class OrderRepricer:
+    """
+    Keeps resting orders within a distance of the touch price.
+
+    Args:
+        gateway (OrderGateway): Gateway used for replaces and status
+        get_book (callable): get_book(symbol) returning a cached OrderBook, or None
+        distance (float): Relative distance from the touch tolerated before repricing a resting order
+        min_interval (float): Minimum seconds between two replaces of one order
+        max_reprices (int): Replaces allowed per order
+        max_per_minute (int): Replaces allowed per minute across all orders
+        interval (float): Seconds between two checks without book changes
+        on_replaced (callable): Called as on_replaced(old_order_id, new_order) after a replace
+    """
+
+    def __init__(self, gateway, get_book, distance=0.002, min_interval=5, max_reprices=10,
+                 max_per_minute=20, interval=10, on_replaced=None):
+        self.gateway = gateway
+        self.get_book = get_book
+        self.distance = distance
+        self.min_interval = min_interval
+        self.max_reprices = max_reprices
+        self.max_per_minute = max_per_minute
+        self.interval = interval
+        self.on_replaced = on_replaced
+        self.orders = {}  # order_id -> tracked order
+        self.replaced = {}  # replaced order_id -> order_id that replaced it
+        self.recent = deque()  # Times of the replaces in the last minute
+        self._wake = None
+
+    def track(self, order, limit, cross=False):
+        """
+        Start repricing a placed order.
+
+        Args:
+            order (dict): Order data from OrderGateway.place
+            limit (float): Worst price the order may be moved to
+            cross (bool): Follow the opposite-side touch so the order fills,
+                instead of joining the same-side touch
+        """
+        order_id = str(order['id'])
+        self.orders[order_id] = {
+            'order_id': order_id,
+            'client_order_id': order['client_order_id'],
+            'symbol': order['symbol'],
+            'side': order['side'],
+            'quantity': float(order['quantity']),
+            'price': float(order['price']),
+            'limit': float(limit),
+            'cross': cross,
+            'reprices': 0,
+            'last_reprice': 0
+        }
+        logging.info(f"Repricing {order['side']} order {order_id} at {order['price']} (limit {limit})")
+
+    def untrack(self, order_id):
+        self.orders.pop(self.current_id(order_id), None)
+
+    def is_tracking(self, order_id):
+        return self.current_id(order_id) in self.orders
+
+    def current_id(self, order_id):
+        """ID of the order now standing for order_id after any replaces."""
+        order_id = str(order_id)
+        while order_id in self.replaced:
+            order_id = self.replaced[order_id]
+        return order_id
+
+    def notify(self, symbol):
+        """Market-data listener: check the symbol's orders on the next loop pass."""
+        if self._wake is not None and any(o['symbol'] == symbol for o in self.orders.values()):
+            self._wake.set()
+
+    def target_price(self, tracked, book):
+        """
+        Price an order should be moved to, or None to leave it.
+
+        The touch is the best price on the order's own side of the book, or on
+        the opposite side for crossing orders (see module docstring).
+        """
+        buy = tracked['side'] == 'buy'
+        if tracked['cross']:
+            touch = book.best_price(tracked['side'])  # Best ask for a buy, best bid for a sell
+        else:
+            touch = book.best_price('sell' if buy else 'buy')  # Best bid for a buy, best ask for a sell
+        if touch is None or (touch > tracked['limit'] if buy else touch < tracked['limit']):
+            return None
+        behind = touch - tracked['price'] if buy else tracked['price'] - touch
+        if tracked['cross']:
+            return touch if behind > 0 else None  # Any gap keeps the order from filling
+        if behind <= self.distance * touch:
+            return None
+        return touch
+
+    def _budget_left(self):
+        now = time.time()
+        while self.recent and now - self.recent[0] > 60:
+            self.recent.popleft()
+        return len(self.recent) < self.max_per_minute
+
+    async def reprice(self, tracked):
+        """
+        Replace one order if it has fallen behind the touch.
+
+        Returns:
+            bool: True if the order was replaced
+        """
+        order_id = tracked['order_id']
+        report = self.gateway.order_stream.get_order(order_id) if self.gateway.order_stream else None
+        if report and report['status'] in FINAL_STATUSES:
+            self.orders.pop(order_id, None)
+            return False
+        if tracked['reprices'] >= self.max_reprices or time.time() - tracked['last_reprice'] < self.min_interval:
+            return False
+        book = self.get_book(tracked['symbol'])
+        if book is None:
+            return False
+        price = self.target_price(tracked, book)
+        if price is None or not self._budget_left():
+            return False
+
+        # The stream may not have reported the latest fills (or be down): the
+        # replacing order must only cover what is still open
+        order = await self.gateway.fetch_order(order_id)
+        if order is None or order.get('status') in FINAL_STATUSES:
+            self.orders.pop(order_id, None)  # Filled or cancelled since the last report
+            return False
+        quantity = tracked['quantity'] - float(order.get('quantity_cumulative') or 0)
+        if quantity <= 0:
+            return False
+
+        self.recent.append(time.time())
+        tracked['last_reprice'] = time.time()
+        new_order = await self.gateway.replace(order_id, tracked['client_order_id'], tracked['symbol'],
+                                               quantity, price)
+        if not new_order:
+            # Usually the order filled or was cancelled first
+            if await self.gateway.status(order_id, tracked['symbol']) in FINAL_STATUSES:
+                self.orders.pop(order_id, None)
+            return False
+
+        new_id = str(new_order['id'])
+        logging.info(f"Repriced {tracked['side']} order {order_id} from {tracked['price']} to {price} as {new_id}")
+        self.orders.pop(order_id, None)
+        self.replaced[order_id] = new_id
+        self.orders[new_id] = dict(tracked, order_id=new_id, client_order_id=new_order['client_order_id'],
+                                   quantity=quantity, price=price, reprices=tracked['reprices'] + 1)
+        if self.on_replaced:
+            try:
+                self.on_replaced(order_id, new_order)
+            except Exception as e:
+                logging.error(f"Error in repricer callback: {e}")
+        return True
+
+    async def check(self):
+        """Reprice every tracked order that has fallen behind."""
+        for tracked in list(self.orders.values()):
+            try:
+                await self.reprice(tracked)
+            except Exception as e:
+                logging.error(f"Error repricing order {tracked['order_id']}: {e}", exc_info=True)
+
+    async def run(self):
+        self._wake = asyncio.Event()
+        while True:
+            self._wake.clear()
+            await self.check()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,79 @@
+"""
+Opportunity scheduler for the Cardano DEX-CEX Arbitrage Bot
+
+Re-evaluates the DEX/CEX spread whenever an input price changes instead of on
+a fixed timer. Bursts of price events are debounced and evaluations are never
+closer together than a minimum interval. Between events the scheduler polls
+adaptively: faster while the spread is close to the arbitrage threshold,
+slower while it is far away. Without push feeds the adaptive poll is the only
+trigger.
+"""
+
+import time
+import asyncio
+import logging
+
+
+class OpportunityScheduler:
+    """
+    Event-driven spread evaluation with adaptive polling fallback.
+
+    Args:
+        evaluate (coroutine function): Checks the spread and returns the price
+            difference in percent, or None if prices were unavailable
+        threshold (float): Arbitrage threshold in percent
+        debounce (float): Seconds to wait after a price event so bursts coalesce
+        min_interval (float): Minimum seconds between two evaluations
+        poll_min (float): Poll interval when the spread is at or beyond the threshold
+        poll_max (float): Poll interval when the spread is zero
+    """
+
+    def __init__(self, evaluate, threshold, debounce=0.25, min_interval=2, poll_min=5, poll_max=60):
+        self.evaluate = evaluate
+        self.threshold = threshold
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.last_spread = None
+        self.last_run = 0
+        self._event = asyncio.Event()
+
+    def notify(self, *_):
+        """Signal that an input price changed. Safe to use as a market data listener."""
+        self._event.set()
+
+    def poll_interval(self):
+        """Interpolate the poll interval from the distance between spread and threshold."""
+        if self.last_spread is None or self.threshold <= 0:
+            return self.poll_min
+        closeness = min(abs(self.last_spread) / self.threshold, 1.0)
+        return self.poll_max - (self.poll_max - self.poll_min) * closeness
+
+    async def wait_for_trigger(self):
+        """Wait for a price event (debounced) or the adaptive poll timeout."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=self.poll_interval())
+            await asyncio.sleep(self.debounce)
+            return 'event'
+        except asyncio.TimeoutError:
+            return 'poll'
+
+    async def run(self):
+        """Evaluate the spread forever on price events and adaptive polls."""
+        while True:
+            trigger = await self.wait_for_trigger()
+
+            wait = self.last_run + self.min_interval - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._event.clear()
+            self.last_run = time.time()
+
+            try:
+                spread = await self.evaluate()
+                if spread is not None:
+                    self.last_spread = spread
+                logging.debug(f"Spread evaluated ({trigger}), next poll in {self.poll_interval():.1f}s")
+            except Exception as e:
+                logging.error(f"Error evaluating opportunity: {e}", exc_info=True)
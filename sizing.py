@@ -0,0 +1,147 @@
+"""
+Trade sizing for the Cardano DEX-CEX Arbitrage Bot
+
+Finds the trade size with the highest expected profit by combining the Gleec
+order book (cost or proceeds of walking the book, see order_book.py) with a
+DEX price-impact curve interpolated from DexHunter swap estimates at several
+sizes. Estimates are requested concurrently and the curve is cached briefly so
+repeated searches stay cheap.
+
+Units:
+    CEX quantities are SHARDS, CEX notionals USDT, DEX amounts are in the
+    units DexHunter uses for the input token (ADA or SHARDS).
+"""
+
+import time
+import asyncio
+import logging
+import numpy as np
+
+# Fractions of the maximum size at which the DEX is quoted
+CURVE_POINTS = (0.1, 0.25, 0.5, 0.75, 1.0)
+
+
+class DexImpactCurve:
+    """
+    Piecewise-linear DEX output as a function of input amount.
+
+    Args:
+        amounts (array-like): Quoted input amounts
+        outputs (array-like): Estimated output for each amount
+    """
+
+    def __init__(self, amounts, outputs):
+        order = np.argsort(amounts)
+        self.amounts = np.concatenate(([0.0], np.asarray(amounts, dtype=float)[order]))
+        self.outputs = np.concatenate(([0.0], np.asarray(outputs, dtype=float)[order]))
+        self.timestamp = time.time()
+
+    @property
+    def max_amount(self):
+        return float(self.amounts[-1])
+
+    def output(self, amounts):
+        """Interpolated output for each amount, NaN beyond the largest quote."""
+        return np.interp(amounts, self.amounts, self.outputs, right=np.nan)
+
+
+async def build_dex_curve(quote, token_in, token_out, max_amount):
+    """
+    Quote the DEX at several sizes concurrently and build an impact curve.
+
+    Args:
+        quote (coroutine function): quote(amount_in, token_in, token_out) returning
+            a DexHunter estimate dict with 'total_output'
+        max_amount (float): Largest input amount to quote
+
+    Returns:
+        DexImpactCurve: Curve, or None if no usable quote was returned
+    """
+    amounts = [max_amount * fraction for fraction in CURVE_POINTS]
+    estimates = await asyncio.gather(
+        *(quote(amount, token_in, token_out) for amount in amounts),
+        return_exceptions=True
+    )
+
+    points = []
+    for amount, estimate in zip(amounts, estimates):
+        if isinstance(estimate, dict) and estimate.get('total_output') is not None:
+            points.append((amount, float(estimate['total_output'])))
+    if not points:
+        logging.error(f"No usable DEX quotes for {token_in or 'ADA'} -> {token_out or 'ADA'}")
+        return None
+    return DexImpactCurve([p[0] for p in points], [p[1] for p in points])
+
+
+class DexCurveCache:
+    """Keeps the last impact curve per (token_in, token_out) for `ttl` seconds."""
+
+    def __init__(self, ttl=15):
+        self.ttl = ttl
+        self.curves = {}
+
+    async def get(self, quote, token_in, token_out, max_amount):
+        key = (token_in, token_out)
+        curve = self.curves.get(key)
+        if curve is None or time.time() - curve.timestamp > self.ttl or curve.max_amount < max_amount:
+            curve = await build_dex_curve(quote, token_in, token_out, max_amount)
+            if curve is not None:
+                self.curves[key] = curve
+        return curve
+
+
+def _best(direction, sizes, dex_amounts, cex_quantities, profits, min_profit):
+    """Pick the most profitable candidate, or None if nothing beats min_profit."""
+    if not len(profits) or np.all(np.isnan(profits)):
+        return None
+    idx = int(np.nanargmax(profits))
+    if profits[idx] <= min_profit:
+        return None
+    return {
+        'direction': direction,
+        'dex_amount_in': float(dex_amounts[idx]),
+        'cex_quantity': float(cex_quantities[idx]),
+        'expected_profit_usdt': float(profits[idx]),
+        'size': float(sizes[idx])
+    }
+
+
+def optimize_buy_cex_sell_dex(book, dex_curve, ada_price_usdt, min_quantity, max_quantity,
+                              usdt_available, fixed_cost_usdt=0, min_profit=0, steps=50):
+    """
+    Best SHARDS quantity to buy on Gleec and sell on the DEX.
+
+    Returns:
+        dict: 'dex_amount_in' and 'cex_quantity' (both SHARDS) and
+              'expected_profit_usdt', or None if no size is profitable
+    """
+    if max_quantity < min_quantity:
+        return None
+    quantities = np.linspace(min_quantity, max_quantity, steps)
+    cost = book.fill_notional('buy', quantities)
+    proceeds = dex_curve.output(quantities) * ada_price_usdt
+    profits = proceeds - cost - fixed_cost_usdt
+    profits[~(cost <= usdt_available)] = np.nan
+    return _best('buy_cex_sell_dex', quantities, quantities, quantities, profits, min_profit)
+
+
+def optimize_buy_dex_sell_cex(book, dex_curve, ada_price_usdt, min_ada, max_ada,
+                              fixed_cost_usdt=0, min_profit=0, slippage=0.02, steps=50):
+    """
+    Best ADA amount to swap for SHARDS on the DEX and sell on Gleec.
+
+    The CEX quantity is the estimated DEX output reduced by `slippage`, so the
+    sell never exceeds what the swap is guaranteed to deliver.
+
+    Returns:
+        dict: 'dex_amount_in' (ADA), 'cex_quantity' (SHARDS) and
+              'expected_profit_usdt', or None if no size is profitable
+    """
+    if max_ada < min_ada:
+        return None
+    ada_amounts = np.linspace(min_ada, max_ada, steps)
+    shards = np.floor(dex_curve.output(ada_amounts) * (1 - slippage))
+    proceeds = book.fill_notional('sell', np.nan_to_num(shards))
+    proceeds[np.isnan(shards)] = np.nan
+    profits = proceeds - ada_amounts * ada_price_usdt - fixed_cost_usdt
+    return _best('buy_dex_sell_cex', ada_amounts, ada_amounts, shards, profits, min_profit)
@@ -0,0 +1,142 @@
+"""
+Write-ahead journal for the bot state
+
+Each state change is appended to a JSON-lines journal next to the state
+snapshot instead of rewriting the whole snapshot, so a change costs O(1)
+regardless of how much history the state holds. Appends are flushed to the OS
+immediately and fsync'd in batches (at most once per `fsync_interval`).
+BotState periodically compacts the journal into a new snapshot.
+
+Sequence numbers:
+    Every record carries a sequence number 'seq', and a snapshot stores the
+    number of the last record it includes as 'journal_sequence'. Replay skips
+    records at or below it, so a crash between writing a snapshot and
+    truncating the journal does not apply the journal's records twice.
+    Numbering continues across truncations.
+
+Records:
+    {'op': 'set', 'section': ..., 'key': ..., 'value': ...}
+    {'op': 'delete', 'section': ..., 'key': ...}
+    {'op': 'append', 'section': ..., 'value': ...}
+    {'op': 'update_tx', 'tx_hash': ..., 'fields': {...}}
+    {'op': 'trim', 'section': ..., 'keep': n}
+
+Known Issues:
+    - A record torn by a crash mid-append is discarded on replay
+"""
+
+import os
+import json
+import time
+import logging
+
+
+def apply_record(state, record):
+    """Apply one journal record to a state dict."""
+    op = record['op']
+    if op == 'set':
+        state.setdefault(record['section'], {})[record['key']] = record['value']
+    elif op == 'delete':
+        state.get(record['section'], {}).pop(record['key'], None)
+    elif op == 'append':
+        state.setdefault(record['section'], []).append(record['value'])
+    elif op == 'update_tx':
+        for tx in reversed(state.get('completed_transactions', [])):
+            if tx.get('tx_hash') == record['tx_hash']:
+                tx.update(record['fields'])
+                break
+    elif op == 'trim':
+        items = state.get(record['section'], [])
+        state[record['section']] = items[-record['keep']:] if record['keep'] else []
+    else:
+        raise ValueError(f"Unknown journal op: {op}")
+
+
+class StateJournal:
+    """
+    Append-only journal file.
+
+    Args:
+        path (str): Journal file path
+        fsync_interval (float): Minimum seconds between two fsync calls
+    """
+
+    def __init__(self, path, fsync_interval=0.2):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.records = 0
+        self.sequence = 0
+        self.unsynced = 0
+        self.last_sync = 0
+        self.torn = False
+        self._file = None
+
+    def replay(self, state):
+        """
+        Apply every record in the journal that `state` does not include yet.
+
+        Returns:
+            int: Number of records applied
+        """
+        applied = 0
+        self.sequence = state.get('journal_sequence', 0)
+        try:
+            with open(self.path, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logging.warning(f"Discarding torn journal record at {self.path}:{line_number}")
+                        self.torn = True
+                        break
+                    seq = record.pop('seq', None)
+                    if seq is not None:
+                        if seq <= self.sequence:
+                            continue  # Already in the snapshot
+                        self.sequence = seq
+                    apply_record(state, record)
+                    applied += 1
+        except FileNotFoundError:
+            pass
+        self.records = applied
+        return applied
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        return self._file
+
+    def append(self, record):
+        """Append a record, fsync'ing if the last fsync is older than fsync_interval."""
+        f = self._open()
+        self.sequence += 1
+        f.write(json.dumps(dict(record, seq=self.sequence)) + '\n')
+        f.flush()
+        self.records += 1
+        self.unsynced += 1
+        if time.time() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """fsync all appended records."""
+        if self._file is not None and self.unsynced:
+            os.fsync(self._file.fileno())
+            self.unsynced = 0
+        self.last_sync = time.time()
+
+    def truncate(self):
+        """Empty the journal after its records were compacted into a snapshot."""
+        self.close()
+        with open(self.path, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.records = 0
+        self.torn = False
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+SQLite state store for the Cardano DEX-CEX Arbitrage Bot
+
+Optional backend with the same interface as BotState (see arbitrage_bot.py),
+selected with STATE_BACKEND=sqlite. Orders, transfers and withdrawals live in
+one indexed table and completed transactions in another, so pending-operation
+queries and transaction history pages are index scans instead of scans over
+the whole history. The database runs in WAL mode so writes are cheap appends.
+
+Usage:
+    ./state_store.py migrate [bot_state.json] [bot_state.db]
+        Import an existing JSON state file (with its journal and transaction
+        archive) into SQLite
+"""
+
+import sys
+import json
+import time
+import sqlite3
+
+from state_journal import StateJournal
+from tx_archive import TransactionArchive
+from trade_cycle import TERMINAL_STAGES
+
+SECTIONS = ('active_orders', 'pending_transfers', 'active_withdrawals', 'trade_cycles')
+TERMINAL_STATUSES = ('completed', 'failed')
+TX_FIELDS = ('tx_hash', 'type', 'timestamp', 'dex_sell_completed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    section TEXT NOT NULL,
+    key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    details TEXT,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (section, key)
+);
+CREATE INDEX IF NOT EXISTS idx_operations_status ON operations (section, status);
+CREATE INDEX IF NOT EXISTS idx_operations_timestamp ON operations (timestamp);
+
+CREATE TABLE IF NOT EXISTS completed_transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tx_hash TEXT NOT NULL,
+    type TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    dex_sell_completed INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_type_timestamp ON completed_transactions (type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_transactions_hash ON completed_transactions (tx_hash);
+"""
+
+
+class SQLiteBotState:
+    """
+    BotState backed by SQLite.
+
+    Args:
+        db_file (str): Database path, created if missing
+    """
+
+    def __init__(self, db_file='bot_state.db'):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def save_state(self):
+        self.conn.commit()
+
+    def flush(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _update(self, section, key, status, details, timestamp=None):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO operations (section, key, status, details, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (section, str(key), status, json.dumps(details),
+                 timestamp if timestamp is not None else time.time())
+            )
+
+    def update_order(self, order_id, status, details):
+        self._update('active_orders', order_id, status, details)
+
+    def update_transfer(self, tx_id, status, details):
+        self._update('pending_transfers', tx_id, status, details)
+
+    def update_withdrawal(self, withdrawal_id, status, details):
+        self._update('active_withdrawals', withdrawal_id, status, details)
+
+    def update_cycle(self, cycle_id, stage, details):
+        """Checkpoint a trade cycle (see trade_cycle.py)."""
+        self._update('trade_cycles', cycle_id, stage, details)
+
+    def get_active_cycles(self):
+        """Return {cycle_id: entry} for trade cycles that have not finished."""
+        rows = self.conn.execute(
+            "SELECT * FROM operations WHERE section = 'trade_cycles' AND status NOT IN (?, ?)",
+            TERMINAL_STAGES
+        )
+        return {row['key']: self._entry(row) for row in rows}
+
+    def remove(self, section, key):
+        """Remove an order, transfer or withdrawal entry."""
+        with self.conn:
+            self.conn.execute("DELETE FROM operations WHERE section = ? AND key = ?", (section, str(key)))
+
+    def complete_transaction(self, tx_hash, tx_type='unknown', timestamp=None, **extra):
+        """Complete a transaction with type tracking."""
+        dex_sell_completed = extra.pop('dex_sell_completed', False)
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO completed_transactions (tx_hash, type, timestamp, dex_sell_completed, extra) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (tx_hash, tx_type, timestamp if timestamp is not None else time.time(),
+                 int(bool(dex_sell_completed)), json.dumps(extra) if extra else None)
+            )
+
+    def update_transaction(self, tx_hash, **fields):
+        """Update fields of the most recent completed transaction with this hash."""
+        row = self.conn.execute(
+            "SELECT * FROM completed_transactions WHERE tx_hash = ? ORDER BY id DESC LIMIT 1", (tx_hash,)
+        ).fetchone()
+        if row is None:
+            return
+        extra = json.loads(row['extra']) if row['extra'] else {}
+        dex_sell_completed = fields.pop('dex_sell_completed', bool(row['dex_sell_completed']))
+        extra.update(fields)
+        with self.conn:
+            self.conn.execute(
+                "UPDATE completed_transactions SET dex_sell_completed = ?, extra = ? WHERE id = ?",
+                (int(bool(dex_sell_completed)), json.dumps(extra) if extra else None, row['id'])
+            )
+
+    def _entry(self, row):
+        return {
+            'status': row['status'],
+            'details': json.loads(row['details']) if row['details'] else {},
+            'timestamp': row['timestamp']
+        }
+
+    def _transaction(self, row):
+        tx = {
+            'tx_hash': row['tx_hash'],
+            'type': row['type'],
+            'timestamp': row['timestamp'],
+            'dex_sell_completed': bool(row['dex_sell_completed'])
+        }
+        if row['extra']:
+            tx.update(json.loads(row['extra']))
+        return tx
+
+    def get_entry(self, section, key):
+        """Return one order, transfer or withdrawal entry, or None."""
+        row = self.conn.execute(
+            "SELECT * FROM operations WHERE section = ? AND key = ?", (section, str(key))
+        ).fetchone()
+        return self._entry(row) if row else None
+
+    def get_entries(self, section):
+        """Return all entries of a section as {key: entry}."""
+        rows = self.conn.execute("SELECT * FROM operations WHERE section = ?", (section,))
+        return {row['key']: self._entry(row) for row in rows}
+
+    def _pending(self, section):
+        rows = self.conn.execute(
+            "SELECT * FROM operations WHERE section = ? AND status NOT IN (?, ?)",
+            (section,) + TERMINAL_STATUSES
+        )
+        return {row['key']: self._entry(row) for row in rows}
+
+    def get_pending_operations(self):
+        return {
+            'orders': self._pending('active_orders'),
+            'transfers': self._pending('pending_transfers'),
+            'withdrawals': self._pending('active_withdrawals')
+        }
+
+    def get_transaction_history(self, page=0, page_size=20):
+        """Return one page of completed transactions, newest first."""
+        rows = self.conn.execute(
+            "SELECT * FROM completed_transactions ORDER BY id DESC LIMIT ? OFFSET ?",
+            (page_size, page * page_size)
+        )
+        return [self._transaction(row) for row in rows]
+
+def migrate_json_state(state_file, db_file, archive_dir='archive/completed_transactions'):
+    """
+    Import a JSON state file (its journal records and archived completed
+    transactions) into a SQLite store.
+
+    Returns:
+        tuple: (operations imported, transactions imported)
+    """
+    with open(state_file, 'r') as f:
+        state = json.load(f)
+    StateJournal(f"{state_file}.journal").replay(state)
+
+    store = SQLiteBotState(db_file)
+    operations = 0
+    for section in SECTIONS:
+        for key, entry in state.get(section, {}).items():
+            store._update(section, key, entry.get('status', 'unknown'),
+                          entry.get('details', {}), entry.get('timestamp', 0))
+            operations += 1
+
+    archive = TransactionArchive(archive_dir)
+    archived = [tx for day in reversed(archive.days()) for tx in archive.read_day(day)]
+
+    transactions = 0
+    for tx in archived + state.get('completed_transactions', []):
+        extra = {k: v for k, v in tx.items() if k not in TX_FIELDS}
+        store.complete_transaction(
+            tx['tx_hash'], tx.get('type', 'unknown'), timestamp=tx.get('timestamp', 0),
+            dex_sell_completed=tx.get('dex_sell_completed', False), **extra
+        )
+        transactions += 1
+    store.close()
+    return operations, transactions
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate' or len(sys.argv) > 4:
+        print("Usage: ./state_store.py migrate [bot_state.json] [bot_state.db]")
+        sys.exit(1)
+
+    source = sys.argv[2] if len(sys.argv) > 2 else 'bot_state.json'
+    target = sys.argv[3] if len(sys.argv) > 3 else 'bot_state.db'
+    operations, transactions = migrate_json_state(source, target)
+    print(f"Imported {operations} operations and {transactions} completed transactions into {target}")
@@ -0,0 +1,168 @@
+"""Replay of scripted Gleec WebSocket sessions against GleecMarketData."""
+
+import time
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from market_data import GleecMarketData
+
+SYMBOL = 'SHARDSUSDT'
+CLOSE = object()  # Script entry: the server closes the connection
+
+
+def snapshot(sequence, asks, bids):
+    return {'ch': 'orderbook/full', 'snapshot': {SYMBOL: {'a': asks, 'b': bids, 's': sequence}}}
+
+
+def update(sequence, asks=(), bids=()):
+    return {'ch': 'orderbook/full', 'update': {SYMBOL: {'a': list(asks), 'b': list(bids), 's': sequence}}}
+
+
+def ticker(last, bid, ask):
+    return {'ch': 'ticker/1s', 'data': {SYMBOL: {'c': last, 'b': bid, 'a': ask}}}
+
+
+class FakeGleec:
+    """
+    Local WebSocket server replaying one script of frames per connection.
+
+    Each connection reads the client's two subscriptions, sends its script's
+    frames and then stays open until the client disconnects (or closes it at
+    a CLOSE entry).
+    """
+
+    def __init__(self, scripts):
+        self.scripts = scripts
+        self.connections = []  # Subscriptions received on each connection
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/ws', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"ws://{host}:{port}/ws"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscriptions = [await ws.receive_json() for _ in range(2)]
+        index = len(self.connections)
+        self.connections.append(subscriptions)
+
+        for frame in self.scripts[index] if index < len(self.scripts) else []:
+            if frame is CLOSE:
+                await ws.close()
+                return ws
+            await ws.send_json(frame)
+        async for _ in ws:
+            pass
+        return ws
+
+
+class GleecMarketDataTest(unittest.IsolatedAsyncioTestCase):
+
+    async def start(self, scripts):
+        self.server = FakeGleec(scripts)
+        await self.server.start()
+        self.market = GleecMarketData(self.server.url, [SYMBOL], reconnect_delay=0.01)
+        self.notified = []
+        self.market.add_listener(self.notified.append)
+        self.task = asyncio.ensure_future(self.market.run())
+
+    async def asyncTearDown(self):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        await self.server.stop()
+
+    async def wait_until(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail('Condition not reached before timeout')
+            await asyncio.sleep(0.01)
+
+    def book(self):
+        return self.market.get_order_book(SYMBOL, max_age=60)
+
+    async def test_snapshot_and_updates(self):
+        await self.start([[
+            snapshot(1, asks=[['1.01', '10'], ['1.02', '5']], bids=[['0.99', '10']]),
+            update(2, asks=[['1.01', '0'], ['1.015', '3']]),
+            update(2, asks=[['1.03', '1']]),  # Replayed frame, already applied
+            update(3, bids=[['0.995', '4']]),
+        ]])
+        await self.wait_until(lambda: self.market.books[SYMBOL].sequence == 3)
+
+        self.assertEqual(self.server.connections, [self.market.subscriptions()])
+        book = self.book()
+        self.assertEqual(book.best_price('buy'), 1.015)
+        self.assertEqual(book.best_price('sell'), 0.995)
+        self.assertEqual(book.cumulative_depth('buy', 5), 8)  # 3 @ 1.015 + 5 @ 1.02
+        self.assertEqual(book.cumulative_depth('sell', 5), 14)
+        # Snapshot and the two top-of-book changes
+        self.assertEqual(self.notified, [SYMBOL] * 3)
+
+    async def test_sequence_gap_resyncs(self):
+        await self.start([
+            [
+                snapshot(1, asks=[['1.01', '10']], bids=[['0.99', '10']]),
+                update(3, asks=[['1.00', '1']]),  # Update 2 was lost
+            ],
+            [
+                snapshot(10, asks=[['1.05', '7']], bids=[['1.00', '2']]),
+                update(11, bids=[['1.01', '1']]),
+            ],
+        ])
+        await self.wait_until(lambda: self.market.books[SYMBOL].sequence == 11)
+
+        self.assertEqual(len(self.server.connections), 2)
+        book = self.book()
+        self.assertEqual(book.best_price('buy'), 1.05)  # The out-of-sequence update was not applied
+        self.assertEqual(book.best_price('sell'), 1.01)
+
+    async def test_book_is_unavailable_while_out_of_sequence(self):
+        await self.start([[
+            snapshot(1, asks=[['1.01', '10']], bids=[['0.99', '10']]),
+            update(3, asks=[['1.00', '1']]),
+        ]])
+        await self.wait_until(lambda: len(self.server.connections) == 2)
+        self.assertIsNone(self.book())
+
+    async def test_reconnect_after_server_close(self):
+        await self.start([
+            [snapshot(1, asks=[['1.01', '10']], bids=[['0.99', '10']]), CLOSE],
+            [snapshot(5, asks=[['1.02', '10']], bids=[['0.98', '10']])],
+        ])
+        await self.wait_until(lambda: self.market.books[SYMBOL].sequence == 5)
+
+        # Subscriptions are sent again on the new connection
+        self.assertEqual(self.server.connections, [self.market.subscriptions()] * 2)
+        self.assertTrue(self.market.connected)
+        self.assertEqual(self.book().best_price('buy'), 1.02)
+
+    async def test_ticker(self):
+        await self.start([[
+            ticker('1.00', '0.99', '1.01'),
+            ticker('1.00', '0.99', '1.01'),  # Unchanged, no notification
+            ticker('1.05', '1.04', '1.06'),
+        ]])
+        await self.wait_until(lambda: self.market.get_last_price(SYMBOL, max_age=60) == 1.05)
+        self.assertEqual(self.market.tickers[SYMBOL]['bid'], 1.04)
+        self.assertEqual(self.notified, [SYMBOL] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Depth and fill-price queries of the NumPy order book snapshot."""
+
+import math
+import unittest
+
+from order_book import OrderBook
+
+
+def make_book():
+    # Levels deliberately out of order: the snapshot sorts each side best first
+    return OrderBook(
+        'SHARDSUSDT',
+        asks=[[1.02, 50], [1.00, 10], [1.01, 20]],
+        bids=[[0.98, 20], [0.99, 10], [0.97, 50]],
+        timestamp=0
+    )
+
+
+class OrderBookTest(unittest.TestCase):
+
+    def test_best_price(self):
+        book = make_book()
+        self.assertEqual(book.best_price('buy'), 1.00)
+        self.assertEqual(book.best_price('sell'), 0.99)
+
+    def test_best_price_of_empty_side(self):
+        book = OrderBook('SHARDSUSDT', asks=[], bids=[[0.99, 10]])
+        self.assertIsNone(book.best_price('buy'))
+        self.assertEqual(book.cumulative_depth('buy', 5), 0.0)
+
+    def test_cumulative_depth(self):
+        book = make_book()
+        self.assertEqual(book.cumulative_depth('buy', 1), 10)
+        self.assertEqual(book.cumulative_depth('buy', 2), 30)
+        self.assertEqual(book.cumulative_depth('buy', 10), 80)
+        self.assertEqual(book.cumulative_depth('sell', 2), 30)
+        self.assertEqual(book.cumulative_depth('sell', 0), 0.0)
+
+    def test_depth_within_price(self):
+        book = make_book()
+        self.assertEqual(book.depth_within_price('buy', 1.01), 30)
+        self.assertEqual(book.depth_within_price('buy', 0.999), 0.0)
+        self.assertEqual(book.depth_within_price('sell', 0.98), 30)
+        self.assertEqual(book.depth_within_price('sell', 0.5), 80)
+
+    def test_fill_price_within_first_level(self):
+        self.assertAlmostEqual(make_book().fill_price('buy', 5), 1.00)
+
+    def test_fill_price_across_levels(self):
+        book = make_book()
+        # 10 @ 1.00 + 20 @ 1.01 + 5 @ 1.02
+        self.assertAlmostEqual(book.fill_price('buy', 35), (10 * 1.00 + 20 * 1.01 + 5 * 1.02) / 35)
+        # 10 @ 0.99 + 5 @ 0.98
+        self.assertAlmostEqual(book.fill_price('sell', 15), (10 * 0.99 + 5 * 0.98) / 15)
+
+    def test_fill_price_of_zero_is_best_price(self):
+        self.assertEqual(make_book().fill_price('sell', 0), 0.99)
+
+    def test_fill_beyond_depth(self):
+        book = make_book()
+        self.assertIsNone(book.fill_price('buy', 81))
+        self.assertIsNone(book.worst_price('buy', 81))
+
+    def test_fill_notional_vector(self):
+        notionals = make_book().fill_notional('buy', [10, 30, 100])
+        self.assertAlmostEqual(notionals[0], 10.0)
+        self.assertAlmostEqual(notionals[1], 10 * 1.00 + 20 * 1.01)
+        self.assertTrue(math.isnan(notionals[2]))
+
+    def test_worst_price(self):
+        book = make_book()
+        self.assertEqual(book.worst_price('buy', 10), 1.00)
+        self.assertEqual(book.worst_price('buy', 11), 1.01)
+        self.assertEqual(book.worst_price('sell', 31), 0.97)
+
+    def test_from_levels(self):
+        book = OrderBook.from_levels({'ask': [['1.5', '2']], 'bid': [['1.4', '3']], 'timestamp': 'ignored'},
+                                     'SHARDSUSDT')
+        self.assertEqual(book.symbol, 'SHARDSUSDT')
+        self.assertEqual(book.best_price('buy'), 1.5)
+        self.assertEqual(book.cumulative_depth('sell', 1), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Priority lanes and burst headroom of the per-venue token bucket."""
+
+import asyncio
+import unittest
+
+from rate_limiter import TokenBucket, PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+
+
+class TokenBucketTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_burst_is_served_immediately(self):
+        bucket = TokenBucket('test', rate=1, capacity=3, background_reserve=0)
+        for _ in range(3):
+            await asyncio.wait_for(bucket.acquire(), timeout=0.05)
+
+    async def test_waiters_are_served_by_priority(self):
+        bucket = TokenBucket('test', rate=50, capacity=1, background_reserve=0)
+        await bucket.acquire()  # Empty the bucket so every request below has to wait
+
+        served = []
+
+        async def request(name, priority):
+            await bucket.acquire(priority)
+            served.append(name)
+
+        # Queued lowest priority first; each lane keeps its own FIFO order
+        tasks = [
+            asyncio.ensure_future(request('background', PRIORITY_BACKGROUND)),
+            asyncio.ensure_future(request('normal-1', PRIORITY_NORMAL)),
+            asyncio.ensure_future(request('critical', PRIORITY_CRITICAL)),
+            asyncio.ensure_future(request('normal-2', PRIORITY_NORMAL)),
+        ]
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=2)
+        self.assertEqual(served, ['critical', 'normal-1', 'normal-2', 'background'])
+
+    async def test_background_leaves_reserve(self):
+        bucket = TokenBucket('test', rate=0.01, capacity=3, background_reserve=2)
+        await asyncio.wait_for(bucket.acquire(PRIORITY_BACKGROUND), timeout=0.05)
+        # The reserved tokens still serve latency-critical requests at once
+        await asyncio.wait_for(bucket.acquire(PRIORITY_NORMAL), timeout=0.05)
+        await asyncio.wait_for(bucket.acquire(PRIORITY_CRITICAL), timeout=0.05)
+
+        bucket = TokenBucket('test', rate=0.01, capacity=3, background_reserve=2)
+        await bucket.acquire(PRIORITY_BACKGROUND)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(bucket.acquire(PRIORITY_BACKGROUND), timeout=0.05)
+
+    async def test_cancelled_waiter_is_skipped(self):
+        bucket = TokenBucket('test', rate=50, capacity=1, background_reserve=0)
+        await bucket.acquire()
+        cancelled = asyncio.ensure_future(bucket.acquire(PRIORITY_CRITICAL))
+        waiting = asyncio.ensure_future(bucket.acquire(PRIORITY_NORMAL))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.wait_for(waiting, timeout=1)
+
+    async def test_pause_empties_bucket(self):
+        bucket = TokenBucket('test', rate=1000, capacity=5)
+        bucket.pause(0.1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(bucket.acquire(PRIORITY_CRITICAL), timeout=0.05)
+        await asyncio.wait_for(bucket.acquire(PRIORITY_CRITICAL), timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Coalescing of SHARDS transfers into batch transactions."""
+
+import asyncio
+import unittest
+
+from rebalancer import TransferBatcher
+
+
+class TransferBatcherTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.submitted = []
+
+    async def submit_batch(self, outputs):
+        self.submitted.append(outputs)
+        return f"tx{len(self.submitted)}"
+
+    async def test_transfers_in_window_share_a_transaction(self):
+        batcher = TransferBatcher(self.submit_batch, window=0.01)
+        tx_ids = await asyncio.gather(
+            batcher.send('addr_a', 10),
+            batcher.send('addr_b', 5),
+            batcher.send('addr_a', 2),
+        )
+        self.assertEqual(tx_ids, ['tx1', 'tx1', 'tx1'])
+        # Transfers to the same address are merged into one output
+        self.assertEqual(self.submitted, [[('addr_a', 12), ('addr_b', 5)]])
+        self.assertEqual((batcher.batches, batcher.transfers), (1, 3))
+
+    async def test_batches_are_split_by_max_outputs(self):
+        batcher = TransferBatcher(self.submit_batch, window=0.01, max_outputs=2)
+        tx_ids = await asyncio.gather(*(batcher.send(f"addr_{i}", i + 1) for i in range(5)))
+        self.assertEqual(tx_ids, ['tx1', 'tx1', 'tx2', 'tx2', 'tx3'])
+        self.assertEqual([len(outputs) for outputs in self.submitted], [2, 2, 1])
+        self.assertEqual(batcher.batches, 3)
+
+    async def test_transfers_after_window_start_a_new_batch(self):
+        batcher = TransferBatcher(self.submit_batch, window=0.01)
+        self.assertEqual(await batcher.send('addr_a', 1), 'tx1')
+        self.assertEqual(await batcher.send('addr_a', 1), 'tx2')
+
+    async def test_failed_batch_fails_every_transfer(self):
+        async def failing(outputs):
+            raise RuntimeError('insufficient funds')
+
+        batcher = TransferBatcher(failing, window=0.01)
+        results = await asyncio.gather(batcher.send('addr_a', 1), batcher.send('addr_b', 2),
+                                       return_exceptions=True)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual((batcher.batches, batcher.transfers), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
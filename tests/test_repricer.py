@@ -0,0 +1,59 @@
+"""Target prices of the cancel-replace repricer."""
+
+import unittest
+
+from order_book import OrderBook
+from repricer import OrderRepricer
+
+
+def tracked(side, price, limit, cross=False):
+    return {'side': side, 'price': price, 'limit': limit, 'cross': cross}
+
+
+class TargetPriceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.repricer = OrderRepricer(gateway=None, get_book=lambda symbol: None, distance=0.01)
+        # Best bid 0.99, best ask 1.01
+        self.book = OrderBook('SHARDSUSDT', asks=[[1.01, 10], [1.02, 10]], bids=[[0.99, 10], [0.98, 10]])
+
+    def target(self, order):
+        return self.repricer.target_price(order, self.book)
+
+    def test_resting_order_within_distance_stays(self):
+        self.assertIsNone(self.target(tracked('buy', 0.985, limit=1.0)))
+        self.assertIsNone(self.target(tracked('sell', 1.015, limit=1.0)))
+
+    def test_resting_order_joins_same_side_touch(self):
+        self.assertEqual(self.target(tracked('buy', 0.95, limit=1.0)), 0.99)
+        self.assertEqual(self.target(tracked('sell', 1.05, limit=1.0)), 1.01)
+
+    def test_resting_order_at_touch_stays(self):
+        self.assertIsNone(self.target(tracked('buy', 0.99, limit=1.0)))
+        self.assertIsNone(self.target(tracked('sell', 1.01, limit=1.0)))
+
+    def test_touch_beyond_limit(self):
+        self.assertIsNone(self.target(tracked('buy', 0.95, limit=0.98)))
+        self.assertIsNone(self.target(tracked('sell', 1.05, limit=1.02)))
+
+    def test_crossing_order_follows_opposite_touch(self):
+        # Any gap to the opposite touch is repriced, however small
+        self.assertEqual(self.target(tracked('buy', 1.005, limit=1.05, cross=True)), 1.01)
+        self.assertEqual(self.target(tracked('sell', 0.995, limit=0.95, cross=True)), 0.99)
+
+    def test_crossing_order_at_or_through_touch_stays(self):
+        self.assertIsNone(self.target(tracked('buy', 1.01, limit=1.05, cross=True)))
+        self.assertIsNone(self.target(tracked('sell', 0.98, limit=0.95, cross=True)))
+
+    def test_crossing_order_limit(self):
+        self.assertIsNone(self.target(tracked('buy', 1.0, limit=1.005, cross=True)))
+        self.assertIsNone(self.target(tracked('sell', 1.0, limit=0.995, cross=True)))
+
+    def test_empty_side(self):
+        book = OrderBook('SHARDSUSDT', asks=[], bids=[[0.99, 10]])
+        self.assertIsNone(self.repricer.target_price(tracked('sell', 1.05, limit=1.0), book))
+        self.assertIsNone(self.repricer.target_price(tracked('buy', 0.95, limit=1.0, cross=True), book))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Replay of the BotState write-ahead journal."""
+
+import os
+import json
+import tempfile
+import unittest
+
+from state_journal import StateJournal, apply_record
+
+
+def completed(tx_hash):
+    return {'op': 'append', 'section': 'completed_transactions', 'value': {'tx_hash': tx_hash}}
+
+
+class StateJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'bot_state.json.journal')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, records, state=None):
+        """Apply and journal records like BotState does; returns the in-memory state."""
+        state = {} if state is None else state
+        journal = StateJournal(self.path, fsync_interval=0)
+        journal.replay(state)
+        for record in records:
+            apply_record(state, record)
+            journal.append(record)
+        journal.close()
+        return state
+
+    def replay(self, state=None):
+        state = {} if state is None else state
+        journal = StateJournal(self.path)
+        return journal, journal.replay(state), state
+
+    def test_replay_rebuilds_state(self):
+        self.write([
+            {'op': 'set', 'section': 'active_orders', 'key': '1', 'value': {'status': 'pending'}},
+            {'op': 'set', 'section': 'active_orders', 'key': '2', 'value': {'status': 'pending'}},
+            {'op': 'delete', 'section': 'active_orders', 'key': '1'},
+            completed('a'),
+            completed('b'),
+            {'op': 'update_tx', 'tx_hash': 'a', 'fields': {'dex_sell_completed': True}},
+            {'op': 'trim', 'section': 'completed_transactions', 'keep': 1},
+        ])
+        _, applied, state = self.replay()
+        self.assertEqual(applied, 7)
+        self.assertEqual(state['active_orders'], {'2': {'status': 'pending'}})
+        self.assertEqual(state['completed_transactions'], [{'tx_hash': 'b'}])
+
+    def test_missing_journal(self):
+        journal, applied, state = self.replay()
+        self.assertEqual((applied, state, journal.torn), (0, {}, False))
+
+    def test_torn_record_is_discarded(self):
+        self.write([completed('a'), completed('b')])
+        with open(self.path, 'a') as f:
+            f.write('{"op": "append", "sec')  # Crash mid-append
+        journal, applied, state = self.replay()
+        self.assertEqual(applied, 2)
+        self.assertTrue(journal.torn)
+        self.assertEqual([tx['tx_hash'] for tx in state['completed_transactions']], ['a', 'b'])
+
+    def test_records_in_snapshot_are_skipped(self):
+        state = self.write([completed('a'), completed('b')])
+        # Snapshot written, crash before the journal was truncated
+        journal = StateJournal(self.path)
+        journal.replay({})
+        snapshot = json.loads(json.dumps(dict(state, journal_sequence=journal.sequence)))
+
+        journal, applied, replayed = self.replay(snapshot)
+        self.assertEqual(applied, 0)
+        self.assertEqual([tx['tx_hash'] for tx in replayed['completed_transactions']], ['a', 'b'])
+
+    def test_sequence_continues_after_truncate(self):
+        state = self.write([completed('a')])
+        journal = StateJournal(self.path)
+        journal.replay({})
+        state['journal_sequence'] = journal.sequence
+        journal.truncate()
+        snapshot = json.loads(json.dumps(state))
+
+        self.write([completed('b')], state=json.loads(json.dumps(snapshot)))
+        _, applied, replayed = self.replay(snapshot)
+        self.assertEqual(applied, 1)
+        self.assertEqual([tx['tx_hash'] for tx in replayed['completed_transactions']], ['a', 'b'])
+
+    def test_records_without_sequence_are_applied(self):
+        with open(self.path, 'w') as f:
+            f.write(json.dumps(completed('a')) + '\n')
+        _, applied, state = self.replay({'journal_sequence': 5})
+        self.assertEqual(applied, 1)
+        self.assertEqual(state['completed_transactions'], [{'tx_hash': 'a'}])
+
+    def test_unknown_op(self):
+        with self.assertRaises(ValueError):
+            apply_record({}, {'op': 'set_field', 'key': 'x', 'value': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
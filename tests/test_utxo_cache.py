@@ -0,0 +1,123 @@
+"""Optimistic overlay of submitted transactions on the address UTxOs."""
+
+import unittest
+
+from pycardano import (
+    Address, Asset, AssetName, MultiAsset, Network, ScriptHash, Transaction, TransactionBody,
+    TransactionId, TransactionInput, TransactionOutput, TransactionWitnessSet, UTxO, Value,
+    VerificationKeyHash
+)
+
+from utxo_cache import UtxoSet
+
+ADDRESS = Address(VerificationKeyHash(bytes(28)), network=Network.TESTNET)
+OTHER = Address(VerificationKeyHash(b'\x01' * 28), network=Network.TESTNET)
+POLICY = ScriptHash(b'\x02' * 28)
+SHARDS = f"{POLICY.payload.hex()}{b'SHARDS'.hex()}"
+
+
+def value(lovelace, shards=0):
+    if not shards:
+        return Value(lovelace)
+    return Value(lovelace, MultiAsset({POLICY: Asset({AssetName(b'SHARDS'): shards})}))
+
+
+def chain_utxo(tx_byte, index, lovelace, shards=0):
+    return UTxO(TransactionInput(TransactionId(bytes([tx_byte]) * 32), index),
+                TransactionOutput(ADDRESS, value(lovelace, shards)))
+
+
+def transaction(inputs, outputs):
+    """Transaction spending UTxOs and paying [(address, Value), ...]."""
+    body = TransactionBody(
+        inputs=[utxo.input for utxo in inputs],
+        outputs=[TransactionOutput(address, amount) for address, amount in outputs],
+        fee=200_000
+    )
+    return Transaction(body, TransactionWitnessSet())
+
+
+def output_utxo(tx, index):
+    """UTxO a transaction output becomes once the transaction is on chain."""
+    return UTxO(TransactionInput(tx.id, index), tx.transaction_body.outputs[index])
+
+
+class UtxoSetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ada = chain_utxo(1, 0, 5_000_000)
+        self.shards = chain_utxo(2, 0, 2_000_000, shards=100)
+        self.chain = [self.ada, self.shards]
+        self.utxo_set = UtxoSet(str(ADDRESS), lambda: list(self.chain), refresh_interval=3600)
+        self.utxo_set.refresh()
+
+    def submit(self, inputs, outputs):
+        tx = transaction(inputs, outputs)
+        self.utxo_set.apply_submitted(tx)
+        return tx
+
+    def test_chain_utxos(self):
+        self.assertEqual(self.utxo_set.amounts(), {'lovelace': 7_000_000, SHARDS: 100})
+        self.assertEqual(self.utxo_set.free_inputs(), ({'lovelace': 7_000_000, SHARDS: 100}, 0))
+
+    def test_submitted_transaction_spends_inputs_and_adds_outputs(self):
+        tx = self.submit([self.ada], [(OTHER, value(1_800_000)), (ADDRESS, value(3_000_000))])
+        self.assertTrue(self.utxo_set.is_pending(tx.id))
+        self.assertEqual(self.utxo_set.amounts(), {'lovelace': 5_000_000, SHARDS: 100})
+        # Only outputs to the tracked address are added
+        self.assertIn(output_utxo(tx, 1).input, [utxo.input for utxo in self.utxo_set.utxos()])
+        self.assertNotIn(self.ada.input, [utxo.input for utxo in self.utxo_set.utxos()])
+
+    def test_free_inputs_exclude_pending_outputs_and_spent_inputs(self):
+        self.submit([self.ada], [(ADDRESS, value(4_800_000))])
+        self.assertEqual(self.utxo_set.free_inputs(), ({'lovelace': 2_000_000, SHARDS: 100}, 1))
+
+    def test_settled_on_refresh(self):
+        tx = self.submit([self.ada], [(ADDRESS, value(4_800_000))])
+        self.chain = [self.shards, output_utxo(tx, 0)]
+        self.utxo_set.refresh()
+        self.assertFalse(self.utxo_set.is_pending(tx.id))
+        self.assertEqual(self.utxo_set.amounts(), {'lovelace': 6_800_000, SHARDS: 100})
+
+    def test_unsettled_after_ttl_is_dropped(self):
+        tx = self.submit([self.ada], [(ADDRESS, value(4_800_000))])
+        self.utxo_set.pending_ttl = 10
+        self.utxo_set.pending[str(tx.id)]['submitted'] -= 11
+        self.utxo_set.refresh()
+        self.assertFalse(self.utxo_set.is_pending(tx.id))
+        self.assertEqual(self.utxo_set.amounts(), {'lovelace': 7_000_000, SHARDS: 100})
+
+    def test_chained_transaction(self):
+        parent = self.submit([self.shards], [(ADDRESS, value(1_800_000, shards=100))])
+        child = self.submit([output_utxo(parent, 0)], [(OTHER, value(1_600_000, shards=100))])
+        self.assertEqual(self.utxo_set.pending[str(child.id)]['parents'], [str(parent.id)])
+        self.assertEqual(self.utxo_set.pending_token_amount(parent.id, SHARDS), 0)  # Spent by the child
+        self.assertEqual(self.utxo_set.amounts(), {'lovelace': 5_000_000})
+
+        # Parent on chain, child not yet: the child stays pending
+        self.chain = [self.ada, output_utxo(parent, 0)]
+        self.utxo_set.refresh()
+        self.assertFalse(self.utxo_set.is_pending(parent.id))
+        self.assertTrue(self.utxo_set.is_pending(child.id))
+        self.assertEqual(self.utxo_set.amounts(), {'lovelace': 5_000_000})
+
+    def test_drop_cascades_to_chained_transactions(self):
+        parent = self.submit([self.shards], [(ADDRESS, value(1_800_000, shards=100))])
+        self.assertEqual(self.utxo_set.pending_token_amount(parent.id, SHARDS), 100)
+        child = self.submit([output_utxo(parent, 0)], [(ADDRESS, value(1_600_000, shards=100))])
+        other = self.submit([self.ada], [(ADDRESS, value(4_800_000))])
+
+        self.assertEqual(self.utxo_set.drop(parent.id), [str(parent.id), str(child.id)])
+        self.assertTrue(self.utxo_set.is_pending(other.id))
+        self.assertEqual(self.utxo_set.amounts(), {'lovelace': 6_800_000, SHARDS: 100})
+        self.assertEqual(self.utxo_set.drop(parent.id), [])
+
+    def test_conflicts(self):
+        pending = self.submit([self.ada], [(ADDRESS, value(4_800_000))])
+        self.assertEqual(self.utxo_set.conflicts(transaction([self.ada], [(OTHER, value(4_800_000))])),
+                         [str(pending.id)])
+        self.assertEqual(self.utxo_set.conflicts(transaction([self.shards], [(OTHER, value(1_800_000))])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Trade-cycle state machine for the Cardano DEX-CEX Arbitrage Bot
+
+Every arbitrage cycle is stored in the bot state as an explicit stage plus the
+data needed to continue from it (order ID, withdrawal ID, tx hash, ...). A
+stage change is checkpointed before the next stage starts, so after a restart
+each cycle resumes exactly where it stopped.
+
+Stages:
+    buy_cex_sell_dex: NEW -> ORDER_PLACED -> FILLED -> WITHDRAW_REQUESTED
+                      -> WITHDRAWN -> DEX_SUBMITTED -> DONE
+    buy_dex_sell_cex: NEW -> DEX_SUBMITTED -> DEX_CONFIRMED -> TRANSFER_SUBMITTED
+                      -> DEPOSITED -> DONE
+                      (NEW -> TRANSFER_SUBMITTED when the transfer is chained on the
+                      unconfirmed swap, see CHAIN_UNCONFIRMED_TX)
+    inventory_*:      NEW -> LEGS_SUBMITTED -> DONE (both legs from pre-funded inventory)
+    rebalance_*:      NEW -> TRANSFER_SUBMITTED or WITHDRAW_REQUESTED -> DONE
+    Any stage may end in FAILED.
+
+Flows:
+    A cycle's handlers are chosen by its 'flow', which defaults to its
+    'direction' (the transfer-based cycles above).
+
+Handlers:
+    Stage handlers are async callables `handler(cycle)` that make one attempt
+    to leave the stage and never wait for it: they return (next_stage, updates)
+    once the stage is finished, or None to be polled again on the next tick.
+    The driver polls all active cycles concurrently.
+
+Known Issues:
+    - A crash between an action (order, withdrawal, submit) and its checkpoint
+      leaves the cycle at the previous stage; NEW cycles that are too old are
+      failed rather than retried
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+
+NEW = 'NEW'
+ORDER_PLACED = 'ORDER_PLACED'
+FILLED = 'FILLED'
+WITHDRAW_REQUESTED = 'WITHDRAW_REQUESTED'
+WITHDRAWN = 'WITHDRAWN'
+DEX_SUBMITTED = 'DEX_SUBMITTED'
+DEX_CONFIRMED = 'DEX_CONFIRMED'
+TRANSFER_SUBMITTED = 'TRANSFER_SUBMITTED'
+DEPOSITED = 'DEPOSITED'
+LEGS_SUBMITTED = 'LEGS_SUBMITTED'
+DONE = 'DONE'
+FAILED = 'FAILED'
+
+TERMINAL_STAGES = (DONE, FAILED)
+
+
+def cycle_flow(cycle):
+    """Handler set of a cycle: its 'flow', or its direction for transfer-based cycles."""
+    return cycle.get('flow') or cycle.get('direction')
+
+
+def stage_age(cycle):
+    """Seconds the cycle has spent in its current stage."""
+    return time.time() - cycle.get('stage_started', 0)
+
+
+class CycleDriver:
+    """
+    Drives persisted trade cycles through their stages.
+
+    Args:
+        state: BotState (or SQLiteBotState) used to checkpoint cycles
+        handlers (dict): {flow: {stage: handler}}
+        poll_interval (float): Seconds between two passes over the active cycles
+        poll_intervals (dict): Longer minimum poll intervals for slow stages
+        retain_finished (float): Seconds DONE and FAILED cycles are kept in the state
+    """
+
+    def __init__(self, state, handlers, poll_interval=5, poll_intervals=None, retain_finished=86400):
+        self.state = state
+        self.handlers = handlers
+        self.poll_interval = poll_interval
+        self.poll_intervals = poll_intervals or {}
+        self.retain_finished = retain_finished
+        self._wake = None
+        self._running = set()
+        self._last_poll = {}
+        self._last_prune = 0
+
+    def create(self, direction, **details):
+        """Checkpoint a new cycle at stage NEW and wake the driver."""
+        cycle_id = f"cycle_{int(time.time() * 1000)}_{uuid.uuid4().hex[:6]}"
+        now = time.time()
+        cycle = dict(details, cycle_id=cycle_id, direction=direction, created=now, stage_started=now)
+        self.state.update_cycle(cycle_id, NEW, cycle)
+        logging.info(f"Started {cycle_flow(cycle)} cycle {cycle_id}")
+        self.wake()
+        return cycle_id
+
+    def active_cycles(self):
+        """Return {cycle_id: entry} for cycles that are not DONE or FAILED."""
+        return self.state.get_active_cycles()
+
+    def wake(self):
+        """Run the next pass immediately instead of after poll_interval."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def step(self, cycle_id, entry):
+        """Give one cycle's current stage a chance to finish."""
+        stage = entry['status']
+        cycle = entry['details']
+        handler = self.handlers.get(cycle_flow(cycle), {}).get(stage)
+        if handler is None:
+            logging.error(f"Cycle {cycle_id}: no handler for {cycle_flow(cycle)} stage {stage}")
+            self.checkpoint(cycle_id, FAILED, cycle, {'error': f"no handler for stage {stage}"})
+            return
+
+        self._last_poll[cycle_id] = time.time()
+        try:
+            result = await handler(cycle)
+        except Exception as e:
+            logging.error(f"Cycle {cycle_id} error in stage {stage}: {e}", exc_info=True)
+            return
+        if result is None:
+            return
+
+        next_stage, updates = result
+        self.checkpoint(cycle_id, next_stage, cycle, updates)
+        if next_stage not in TERMINAL_STAGES:
+            self.wake()  # Start the next stage without waiting for the poll interval
+
+    def checkpoint(self, cycle_id, stage, cycle, updates=None):
+        cycle = dict(cycle, **(updates or {}))
+        cycle['stage_started'] = time.time()
+        self.state.update_cycle(cycle_id, stage, cycle)
+        self._last_poll.pop(cycle_id, None)
+        self.state.flush()
+        log = logging.error if stage == FAILED else logging.info
+        log(f"Cycle {cycle_id} -> {stage}" + (f": {cycle['error']}" if stage == FAILED and cycle.get('error') else ""))
+
+    def _due(self, cycle_id, entry):
+        interval = self.poll_intervals.get(entry['status'], 0)
+        return time.time() - self._last_poll.get(cycle_id, 0) >= interval
+
+    def prune(self):
+        """Drop DONE and FAILED cycles older than retain_finished."""
+        now = time.time()
+        for cycle_id, entry in self.state.get_entries('trade_cycles').items():
+            if entry['status'] in TERMINAL_STAGES and now - entry['timestamp'] > self.retain_finished:
+                self.state.remove('trade_cycles', cycle_id)
+        self._last_prune = now
+
+    async def _step(self, cycle_id, entry):
+        try:
+            await self.step(cycle_id, entry)
+        finally:
+            self._running.discard(cycle_id)
+
+    async def run(self):
+        """Poll every active cycle; a slow stage only delays its own cycle."""
+        self._wake = asyncio.Event()
+        active = self.active_cycles()
+        if active:
+            logging.info(f"Resuming {len(active)} trade cycles: "
+                         + ", ".join(f"{k} at {v['status']}" for k, v in active.items()))
+        while True:
+            self._wake.clear()
+            if time.time() - self._last_prune > 3600:
+                self.prune()
+            for cycle_id, entry in self.active_cycles().items():
+                if cycle_id not in self._running and self._due(cycle_id, entry):
+                    self._running.add(cycle_id)
+                    asyncio.ensure_future(self._step(cycle_id, entry))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,78 @@
+"""
+Completed-transaction archive for the Cardano DEX-CEX Arbitrage Bot
+
+BotState keeps only the most recent completed transactions in memory (and in
+the state snapshot). Older ones are rolled out here, into gzip-compressed
+JSON-lines files partitioned by UTC date:
+
+    archive/completed_transactions/2024-05-01.jsonl.gz
+
+Each roll-out appends a new gzip member to the day's file, which gzip readers
+treat as one continuous stream, so archived files are never rewritten.
+
+Known Issues:
+    - A crash between archiving and trimming the in-memory history can archive
+      the same transactions twice
+"""
+
+import os
+import gzip
+import json
+import time
+import logging
+
+
+class TransactionArchive:
+    """
+    Date-partitioned archive of completed transactions.
+
+    Args:
+        directory (str): Directory holding the archive files
+    """
+
+    def __init__(self, directory='archive/completed_transactions'):
+        self.directory = directory
+
+    def _path(self, day):
+        return os.path.join(self.directory, f"{day}.jsonl.gz")
+
+    def archive(self, transactions):
+        """Append transactions to the files of their UTC dates."""
+        by_day = {}
+        for tx in transactions:
+            day = time.strftime('%Y-%m-%d', time.gmtime(tx.get('timestamp', 0)))
+            by_day.setdefault(day, []).append(tx)
+
+        os.makedirs(self.directory, exist_ok=True)
+        for day, day_transactions in by_day.items():
+            with gzip.open(self._path(day), 'at') as f:
+                for tx in day_transactions:
+                    f.write(json.dumps(tx) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        logging.info(f"Archived {len(transactions)} completed transactions")
+
+    def days(self):
+        """Archived dates, newest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((name[:-len('.jsonl.gz')] for name in names if name.endswith('.jsonl.gz')), reverse=True)
+
+    def read_day(self, day):
+        """Transactions archived for one date, in the order they were completed."""
+        transactions = []
+        try:
+            with gzip.open(self._path(day), 'rt') as f:
+                for line in f:
+                    if line.strip():
+                        transactions.append(json.loads(line))
+        except (EOFError, OSError) as e:
+            logging.error(f"Error reading transaction archive {day}: {e}")
+        return transactions
+
+    def iter_newest_first(self):
+        """Yield archived transactions from newest to oldest."""
+        for day in self.days():
+            yield from reversed(self.read_day(day))
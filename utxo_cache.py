@@ -0,0 +1,196 @@
+"""
+Local UTxO set for the bot's Cardano address
+
+Transaction building used to ask Blockfrost for the address UTxOs every time,
+and a second transaction built before the first was confirmed picked inputs
+the first had already spent. UtxoSet keeps the address UTxOs locally:
+
+    - The on-chain set is re-fetched at most every `refresh_interval` seconds
+    - Right after a transaction is submitted its inputs are marked spent and
+      its outputs to the address are added as pending UTxOs, so the next
+      transaction can be built immediately, even within the same block
+    - A submitted transaction stays in the overlay until the chain shows its
+      inputs spent, or until `pending_ttl` passes (the transaction was
+      dropped and its inputs become usable again)
+
+Chained transactions:
+    Pending outputs are spendable, so a transaction can be built on top of an
+    unconfirmed one (e.g. the Gleec deposit spending the SHARDS a DEX buy just
+    paid to the address). A transaction spending pending outputs depends on
+    the transactions that created them; when a transaction is dropped, every
+    transaction depending on it, directly or not, is dropped with it and the
+    inputs they spent from the chain become usable again.
+
+Transactions built elsewhere:
+    DexHunter builds swaps server-side from the on-chain UTxOs and cannot see
+    the overlay, so it may pick inputs a pending transaction already spends.
+    free_inputs() tells whether such inputs exist before a swap is started,
+    and conflicts() finds such a transaction before a swap is submitted.
+
+Methods may be called from executor threads (transaction building) and the
+event loop (submission), so state is guarded by a lock.
+"""
+
+import time
+import logging
+import threading
+
+from pycardano import TransactionInput, UTxO
+
+
+def _key(tx_input):
+    return (str(tx_input.transaction_id), tx_input.index)
+
+
+def _totals(utxos):
+    """Total {unit: quantity} of some UTxOs ('lovelace' for ADA)."""
+    totals = {'lovelace': 0}
+    for utxo in utxos:
+        totals['lovelace'] += utxo.output.amount.coin
+        for policy_id, assets in (utxo.output.amount.multi_asset or {}).items():
+            for asset_name, quantity in assets.items():
+                unit = f"{policy_id.payload.hex()}{asset_name.payload.hex()}"
+                totals[unit] = totals.get(unit, 0) + quantity
+    return totals
+
+
+def _token_amount(output, unit):
+    """Quantity of a token (policy ID + hex asset name) held by a transaction output."""
+    total = 0
+    for policy_id, assets in (output.amount.multi_asset or {}).items():
+        for asset_name, quantity in assets.items():
+            if f"{policy_id.payload.hex()}{asset_name.payload.hex()}" == unit:
+                total += quantity
+    return total
+
+
+class UtxoSet:
+    """
+    UTxOs of one address with an optimistic overlay of submitted transactions.
+
+    Args:
+        address (str): Bech32 address tracked
+        fetch (callable): Blocking callable returning the on-chain UTxOs of the address
+        refresh_interval (float): Seconds between two on-chain fetches
+        pending_ttl (float): Seconds before an unconfirmed submitted transaction is dropped
+    """
+
+    def __init__(self, address, fetch, refresh_interval=20, pending_ttl=600):
+        self.address = address
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.pending_ttl = pending_ttl
+        self.chain_utxos = {}
+        self.pending = {}  # tx_id -> {'inputs': [keys], 'outputs': {key: UTxO}, 'parents': [tx_ids], 'submitted': time}
+        self.last_refresh = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Re-fetch the on-chain UTxOs and retire settled or expired pending transactions."""
+        fetched = {_key(utxo.input): utxo for utxo in self.fetch()}
+        with self._lock:
+            self.chain_utxos = fetched
+            self.last_refresh = time.time()
+            now = time.time()
+            pending_outputs = {key for tx in self.pending.values() for key in tx['outputs']}
+            for tx_id, tx in list(self.pending.items()):
+                if tx_id not in self.pending:
+                    continue  # Dropped with an expired parent
+                if not any(key in fetched or key in pending_outputs for key in tx['inputs']):
+                    del self.pending[tx_id]  # Inputs spent on chain: settled
+                elif now - tx['submitted'] > self.pending_ttl:
+                    logging.warning(f"Transaction {tx_id} not settled after {self.pending_ttl}s, releasing its inputs")
+                    self._drop(tx_id)
+
+    def utxos(self):
+        """Current spendable UTxOs: on-chain minus spent by pending txs, plus pending outputs."""
+        if time.time() - self.last_refresh > self.refresh_interval:
+            self.refresh()
+        with self._lock:
+            spent = {key for tx in self.pending.values() for key in tx['inputs']}
+            view = {key: utxo for key, utxo in self.chain_utxos.items() if key not in spent}
+            for tx in self.pending.values():
+                for key, utxo in tx['outputs'].items():
+                    if key not in spent:
+                        view[key] = utxo
+            return list(view.values())
+
+    def amounts(self):
+        """Total {unit: quantity} of the current spendable UTxOs ('lovelace' for ADA)."""
+        return _totals(self.utxos())
+
+    def free_inputs(self):
+        """
+        Split the on-chain UTxOs (the ones DexHunter sees) by whether a pending transaction spends them.
+
+        Returns:
+            tuple: ({unit: quantity} of the on-chain UTxOs no pending transaction
+                   spends, number of on-chain UTxOs a pending transaction spends)
+        """
+        if time.time() - self.last_refresh > self.refresh_interval:
+            self.refresh()
+        with self._lock:
+            spent = {key for tx in self.pending.values() for key in tx['inputs']}
+            free = [utxo for key, utxo in self.chain_utxos.items() if key not in spent]
+            encumbered = len(self.chain_utxos) - len(free)
+        return _totals(free), encumbered
+
+    def apply_submitted(self, tx):
+        """Record a submitted pycardano Transaction: spend its inputs, add its outputs to the address."""
+        tx_id = tx.id
+        outputs = {}
+        for index, output in enumerate(tx.transaction_body.outputs):
+            if str(output.address) == self.address:
+                tx_input = TransactionInput(tx_id, index)
+                outputs[_key(tx_input)] = UTxO(tx_input, output)
+        inputs = [_key(tx_input) for tx_input in tx.transaction_body.inputs]
+        with self._lock:
+            parents = sorted({key[0] for key in inputs if key[0] in self.pending})
+            self.pending[str(tx_id)] = {
+                'inputs': inputs,
+                'outputs': outputs,
+                'parents': parents,
+                'submitted': time.time()
+            }
+        if parents:
+            logging.info(f"Transaction {tx_id} chained on unconfirmed {', '.join(parents)}")
+
+    def conflicts(self, tx):
+        """IDs of pending transactions spending any input of a transaction built elsewhere."""
+        inputs = {_key(tx_input) for tx_input in tx.transaction_body.inputs}
+        with self._lock:
+            return sorted(tx_id for tx_id, pending in self.pending.items() if inputs & set(pending['inputs']))
+
+    def is_pending(self, tx_id):
+        with self._lock:
+            return str(tx_id) in self.pending
+
+    def pending_token_amount(self, tx_id, unit):
+        """Quantity of a token a pending transaction pays to the address and is still unspent."""
+        with self._lock:
+            tx = self.pending.get(str(tx_id))
+            if tx is None:
+                return 0
+            spent = {key for other in self.pending.values() for key in other['inputs']}
+            return sum(_token_amount(utxo.output, unit) for key, utxo in tx['outputs'].items() if key not in spent)
+
+    def drop(self, tx_id):
+        """
+        Roll back a pending transaction that will never confirm.
+
+        Returns:
+            list: IDs of the dropped transaction and of every transaction chained on it
+        """
+        with self._lock:
+            return self._drop(str(tx_id))
+
+    def _drop(self, tx_id):
+        if tx_id not in self.pending:
+            return []
+        del self.pending[tx_id]
+        dropped = [tx_id]
+        for child_id in [k for k, tx in self.pending.items() if tx_id in tx['parents']]:
+            dropped.extend(self._drop(child_id))
+        if len(dropped) > 1:
+            logging.warning(f"Dropped transaction {tx_id} and the transactions chained on it: {', '.join(dropped[1:])}")
+        return dropped